@@ -0,0 +1,36 @@
+"""Message with found tasks builder."""
+
+from pybotx import BubbleMarkup, IncomingMessage, OutgoingMessage
+
+from app.bot import constants
+from app.schemas.tasks import TasksPage
+
+
+def build_search_results_message(
+    message: IncomingMessage, query: str, tasks_page: TasksPage, offset: int
+) -> OutgoingMessage:
+    bubbles = BubbleMarkup()
+
+    for task in tasks_page.tasks:
+        bubbles.add_button(
+            command="/expand-task",
+            label=task.title,
+            data={"task_id": task.id},
+        )
+
+    if tasks_page.has_more:
+        bubbles.add_button(
+            command="/поиск",
+            label="Показать ещё",
+            data={
+                "query": query,
+                "offset": offset + constants.SEARCH_RESULTS_PAGE_SIZE,
+            },
+        )
+
+    return OutgoingMessage(
+        bot_id=message.bot.id,
+        chat_id=message.chat.id,
+        body=f"**Найденные задачи** по запросу «{query}»:",
+        bubbles=bubbles,
+    )
@@ -59,6 +59,28 @@ async def help_handler(message: IncomingMessage, bot: Bot) -> None:
     await bot.answer_message(answer_body)
 
 
+@collector.command("/_debug:tasks-cache", visible=False)
+async def tasks_cache_stats(message: IncomingMessage, bot: Bot) -> None:
+    """Show tasks cache hits and misses of this worker."""
+
+    tasks_cache = bot.state.tasks_cache
+    await bot.answer_message(
+        f"hits: {tasks_cache.hits}, misses: {tasks_cache.misses}, "
+        f"hit ratio: {tasks_cache.hit_ratio:.2f}"
+    )
+
+
+@collector.command("/_debug:user-search-cache", visible=False)
+async def user_search_cache_stats(message: IncomingMessage, bot: Bot) -> None:
+    """Show user search cache hits and misses of this worker."""
+
+    user_search_cache = bot.state.user_search_cache
+    await bot.answer_message(
+        f"hits: {user_search_cache.hits}, misses: {user_search_cache.misses}, "
+        f"hit ratio: {user_search_cache.hit_ratio:.2f}"
+    )
+
+
 @collector.command("/_debug:git-commit-sha", visible=False)
 async def git_commit_sha(message: IncomingMessage, bot: Bot) -> None:
     """Show git commit SHA."""
@@ -1,23 +1,24 @@
 """Handler for task creation."""
 
 from enum import Enum, auto
-from pathlib import Path
 
 from pybotx import Bot, HandlerCollector, IncomingMessage
 from pybotx_fsm import FSMCollector
 
-from app.bot import constants
 from app.bot.answers.approve import get_task_approve_message
 from app.bot.answers.cancel import get_cancel_keyboard_button
 from app.bot.answers.skip import get_skip_button
 from app.bot.answers.status import get_status_message
 from app.bot.middlewares.cancel_creation import cancel_creation_middleware
 from app.bot.middlewares.db_session import db_session_middleware
+from app.db.file_blob.repo import FileBlobRepo
+from app.interactors.cancel_attachment import CancelAttachmentInteractor
 from app.interactors.create_task import CreateTaskInteractor
 from app.resources import strings
 from app.schemas.attachments import AttachmentInCreation
 from app.schemas.tasks import TaskInCreation
-from app.services.file_storage import FileStorage
+from app.services.file_storage import describe_content, save_content
+from app.settings import settings
 
 
 class CreateTaskStates(Enum):
@@ -29,7 +30,6 @@ class CreateTaskStates(Enum):
 
 
 collector = HandlerCollector()
-file_storage = FileStorage(Path(constants.FILE_STORAGE_PATH))
 fsm = FSMCollector(CreateTaskStates)
 
 
@@ -114,7 +114,7 @@ async def waiting_task_contact_handler(message: IncomingMessage, bot: Bot) -> No
 
 @fsm.on(
     CreateTaskStates.WAITING_TASK_ATTACHMENT,
-    middlewares=[cancel_creation_middleware],
+    middlewares=[db_session_middleware, cancel_creation_middleware],
 )
 async def waiting_task_attachment_handler(message: IncomingMessage, bot: Bot) -> None:
     task = message.state.fsm_storage.task
@@ -129,12 +129,21 @@ async def waiting_task_attachment_handler(message: IncomingMessage, bot: Bot) ->
             )
             return
 
-        async with message.file.open() as file:
-            file_storage_id = await file_storage.save(file)
-            filename = message.file.filename
+        saved_file = describe_content(
+            message.file.content, deduplicate=settings.FILE_STORAGE_DEDUPLICATION
+        )
+
+        # Upload is counted before file is written, so the cleaner won't remove
+        # the same file, if it was stored before and is being removed now
+        db_session = message.state.db_session
+        await FileBlobRepo(db_session).register(saved_file)
+        await db_session.commit()
 
-            attachment.file_storage_id = file_storage_id
-            attachment.filename = filename
+        # Content is already decoded from BotX request, so it's written as is
+        await save_content(bot.state.file_storage, message.file.content, saved_file)
+
+        attachment.file_storage_id = saved_file.uuid
+        attachment.filename = message.file.filename
 
     await message.state.fsm.change_state(
         CreateTaskStates.WAITING_TASK_APPROVE, task=task, attachment=attachment
@@ -155,7 +164,7 @@ async def waiting_task_approve_handler(message: IncomingMessage, bot: Bot) -> No
     db_session = message.state.db_session
 
     if message.body == strings.CONFIRM_TASK_COMMAND:
-        interactor = CreateTaskInteractor(db_session)
+        interactor = CreateTaskInteractor(db_session, bot.state.tasks_cache)
         task = await interactor.execute(task, attachment)
 
         await message.state.fsm.drop_state()
@@ -166,8 +175,10 @@ async def waiting_task_approve_handler(message: IncomingMessage, bot: Bot) -> No
             CreateTaskStates.WAITING_TASK_TITLE,
             task=TaskInCreation(user_huid=message.sender.huid),
         )
-        if attachment.file_storage_id:
-            await file_storage.remove(attachment.file_storage_id)
+        cancel_interactor = CancelAttachmentInteractor(
+            db_session, bot.state.file_storage_cleaner
+        )
+        await cancel_interactor.execute(attachment)
         await bot.answer_message(
             body=strings.INPUT_TASK_TITLE, keyboard=get_cancel_keyboard_button()
         )
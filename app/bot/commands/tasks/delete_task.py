@@ -1,17 +1,12 @@
 """Handler for task deletion."""
 
-from pathlib import Path
-
 from pybotx import Bot, BubbleMarkup, HandlerCollector, IncomingMessage
 
-from app.bot import constants
 from app.bot.answers.status import get_status_message
 from app.bot.middlewares.db_session import db_session_middleware
 from app.interactors.delete_task import DeleteTaskInteractor
-from app.services.file_storage import FileStorage
 
 collector = HandlerCollector()
-file_storage = FileStorage(Path(constants.FILE_STORAGE_PATH))
 
 
 @collector.command(
@@ -23,7 +18,9 @@ async def delete_task(message: IncomingMessage, bot: Bot) -> None:
     assert message.source_sync_id
 
     interactor = DeleteTaskInteractor(
-        db_session=message.state.db_session, file_storage=file_storage
+        db_session=message.state.db_session,
+        file_storage_cleaner=bot.state.file_storage_cleaner,
+        tasks_cache=bot.state.tasks_cache,
     )
     await interactor.execute(message.data["task_id"])
 
@@ -1,23 +1,19 @@
 """Handler for getting a task."""
 
+import os
 from enum import Enum, auto
-from pathlib import Path
 
-from pybotx import Bot, HandlerCollector, IncomingMessage, OutgoingAttachment
+from pybotx import Bot, HandlerCollector, IncomingMessage
 from pybotx_fsm import FSMCollector
 
-from app.bot import constants
-from app.bot.answers.file_attachment import (
-    build_file_attachment_message,
-    build_file_update_message,
-)
+from app.bot.answers.file_attachment import build_file_attachment_message
 from app.bot.answers.main_task import build_main_task_messages
 from app.bot.answers.success import build_success_message
-from app.bot.middlewares.db_session import db_session_middleware
+from app.bot.middlewares.db_session import db_session_middleware, release_db_connections
 from app.bot.widgets.tasks_list import TasksListWidget
 from app.db.task.repo import TaskRepo
 from app.resources import strings
-from app.services.file_storage import FileStorage
+from app.services.botx_attachments import edit_message_file
 
 
 class ChangeTaskDecriptionState(Enum):
@@ -26,7 +22,6 @@ class ChangeTaskDecriptionState(Enum):
 
 collector = HandlerCollector()
 fsm = FSMCollector(ChangeTaskDecriptionState)
-file_storage = FileStorage(Path(constants.FILE_STORAGE_PATH))
 
 
 @collector.command(
@@ -35,19 +30,25 @@ file_storage = FileStorage(Path(constants.FILE_STORAGE_PATH))
     middlewares=[db_session_middleware],
 )
 async def get_tasks(message: IncomingMessage, bot: Bot) -> None:  # noqa: WPS463
-    widget = TasksListWidget(message)
+    task_repo = TaskRepo(
+        message.state.db_session,
+        message.state.db_read_session,
+        tasks_cache=bot.state.tasks_cache,
+    )
+    widget = TasksListWidget(message, task_repo)
 
+    await widget.fetch_tasks()
     if not widget.is_updating:
-        task_repo = TaskRepo(message.state.db_session)
-        tasks = await task_repo.get_user_tasks(message.sender.huid)
+        tasks_num = await task_repo.count_user_tasks(message.sender.huid)
 
-        if not tasks:
-            await bot.answer_message("У вас нет задач")
-            return
+    await release_db_connections(message)
 
-        await bot.answer_message(body=strings.TASKS_NUM_TEMPLATE.format(num=len(tasks)))
+    if not widget.has_tasks:
+        await bot.answer_message("У вас нет задач")
+        return
 
-        widget.set_tasks(tasks)
+    if not widget.is_updating:
+        await bot.answer_message(body=strings.TASKS_NUM_TEMPLATE.format(num=tasks_num))
 
     await widget.send(bot)
 
@@ -60,9 +61,10 @@ async def get_tasks(message: IncomingMessage, bot: Bot) -> None:  # noqa: WPS463
 async def expand_task(message: IncomingMessage, bot: Bot) -> None:
     assert message.source_sync_id
 
-    task_repo = TaskRepo(message.state.db_session)
+    task_repo = TaskRepo(message.state.db_session, message.state.db_read_session)
 
     task = await task_repo.get_task(message.data["task_id"])
+    await release_db_connections(message)
 
     await bot.send(
         message=build_main_task_messages(message, task, bool(task.attachment))
@@ -72,16 +74,22 @@ async def expand_task(message: IncomingMessage, bot: Bot) -> None:
         outgoing_to_edit_message = build_file_attachment_message(message)
         sync_id = await bot.send(message=outgoing_to_edit_message)
 
+        limiter = bot.state.attachment_transfer_limiter
+        file_storage = bot.state.file_storage
+
         async with file_storage.file(task.attachment.file_storage_id) as file:
-            outgoing_attachment = await OutgoingAttachment.from_async_buffer(
-                file, task.attachment.filename
-            )
+            file_size = await file.seek(0, os.SEEK_END)
+            await file.seek(0)
 
-        await bot.edit(
-            message=build_file_update_message(
-                outgoing_to_edit_message, sync_id, outgoing_attachment
-            )
-        )
+            async with limiter.reserve(file_size):
+                await edit_message_file(
+                    bot,
+                    outgoing_to_edit_message.bot_id,
+                    sync_id,
+                    file,
+                    task.attachment.filename,
+                    file_size,
+                )
 
 
 @collector.command("/изменить", visible=False)
@@ -108,6 +116,7 @@ async def waiting_new_description_handler(message: IncomingMessage, bot: Bot) ->
 
     await task_repo.change_task_description(task_id, new_description)
     await db_session.commit()
+    await bot.state.tasks_cache.invalidate(message.sender.huid)
 
     await message.state.fsm.drop_state()
     await bot.send(message=build_success_message(message))
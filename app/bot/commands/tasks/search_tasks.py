@@ -0,0 +1,42 @@
+"""Handler for searching tasks."""
+
+from pybotx import Bot, HandlerCollector, IncomingMessage
+
+from app.bot import constants
+from app.bot.answers.search_results import build_search_results_message
+from app.bot.middlewares.db_session import db_session_middleware, release_db_connections
+from app.db.task.repo import TaskRepo
+from app.resources import strings
+
+collector = HandlerCollector()
+
+
+@collector.command(
+    "/поиск",
+    description="Найти задачи по тексту",
+    middlewares=[db_session_middleware],
+)
+async def search_tasks(message: IncomingMessage, bot: Bot) -> None:
+    query = message.data.get("query") or message.argument
+    offset = message.data.get("offset", 0)
+
+    if not query:
+        await bot.answer_message(strings.SEARCH_QUERY_MISSING)
+        return
+
+    task_repo = TaskRepo(message.state.db_session, message.state.db_read_session)
+    tasks_page = await task_repo.search_tasks(
+        message.sender.huid,
+        query,
+        limit=constants.SEARCH_RESULTS_PAGE_SIZE,
+        offset=offset,
+    )
+    await release_db_connections(message)
+
+    if not tasks_page.tasks:
+        await bot.answer_message(strings.NO_SEARCH_RESULTS)
+        return
+
+    await bot.send(
+        message=build_search_results_message(message, query, tasks_page, offset)
+    )
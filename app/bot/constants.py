@@ -3,3 +3,4 @@
 FILE_STORAGE_PATH = "./file_storage"
 MAX_PREVIEW_TEXT_LEN = 100
 TASKS_LIST_PAGE_SIZE = 2
+SEARCH_RESULTS_PAGE_SIZE = 10
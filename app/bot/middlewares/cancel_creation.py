@@ -3,6 +3,7 @@
 from pybotx import Bot, IncomingMessage, IncomingMessageHandlerFunc
 
 from app.bot.answers.status import get_status_message
+from app.interactors.cancel_attachment import CancelAttachmentInteractor
 from app.resources.strings import CANCEL_COMMAND, CANCEL_TITLE
 
 
@@ -10,6 +11,14 @@ async def cancel_creation_middleware(
     message: IncomingMessage, bot: Bot, call_next: IncomingMessageHandlerFunc
 ) -> None:
     if message.body == CANCEL_COMMAND:
+        # Attachment is uploaded only in states with DB session middleware
+        attachment = getattr(message.state.fsm_storage, "attachment", None)
+        if attachment:
+            interactor = CancelAttachmentInteractor(
+                message.state.db_session, bot.state.file_storage_cleaner
+            )
+            await interactor.execute(attachment)
+
         await message.state.fsm.drop_state()
         await bot.send(message=get_status_message(message, CANCEL_TITLE))
         return
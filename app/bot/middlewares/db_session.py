@@ -1,14 +1,91 @@
 """Middleware for creating db_session per-request."""
 
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
 from pybotx import Bot, IncomingMessage, IncomingMessageHandlerFunc
 
+from app.db.sqlalchemy import CONNECTION_HOLD_TIME_KEY, AsyncSession
+from app.logger import logger
+
 
 async def db_session_middleware(
     message: IncomingMessage, bot: Bot, call_next: IncomingMessageHandlerFunc
 ) -> None:
+    """Create sessions for handler.
+
+    Sessions check out a connection from the pool only on the first query and
+    return it after commit, so handlers should commit or call
+    `release_db_connections` before slow network I/O.
+    """
+
     session_factory = bot.state.db_session_factory
 
-    async with session_factory() as db_session:
-        message.state.db_session = db_session
+    with _logged_connection_hold_time(message):
+        async with session_factory() as db_session:
+            message.state.db_session = db_session
+
+            async with _open_read_session(message, bot, db_session) as read_session:
+                message.state.db_read_session = read_session
+
+                await call_next(message, bot)
+
+
+async def release_db_connections(message: IncomingMessage) -> None:
+    """Return connections of handler's sessions to the pool.
+
+    Sessions are still usable after that. Handler must not have uncommitted
+    changes, because they will be discarded.
+    """
+
+    await message.state.db_session.close()
+    if message.state.db_read_session is not message.state.db_session:
+        await message.state.db_read_session.close()
+
+
+@asynccontextmanager
+async def _open_read_session(
+    message: IncomingMessage, bot: Bot, db_session: AsyncSession
+) -> AsyncIterator[AsyncSession]:
+    """Open session to replica if it is configured.
+
+    Reads go to primary right after user's own write, because replica may lag.
+    Writes are marked by `TasksCache.invalidate` right after their commit.
+    """
+
+    replica_session_factory = bot.state.db_replica_session_factory
+
+    if replica_session_factory is None:
+        yield db_session
+        return
+
+    if await bot.state.tasks_cache.has_recent_write(message.sender.huid):
+        yield db_session
+        return
+
+    async with replica_session_factory() as replica_session:
+        yield replica_session
+
+
+@contextmanager
+def _logged_connection_hold_time(message: IncomingMessage) -> Iterator[None]:
+    try:
+        yield
+    finally:
+        _log_connection_hold_time(message)
+
+
+def _log_connection_hold_time(message: IncomingMessage) -> None:
+    sessions = {
+        getattr(message.state, "db_session", None),
+        getattr(message.state, "db_read_session", None),
+    }
+    hold_time = sum(
+        session.info.get(CONNECTION_HOLD_TIME_KEY, 0)
+        for session in sessions
+        if session is not None
+    )
 
-        await call_next(message, bot)
+    # Logged for every message, because long holds exhaust the pool in production
+    sync_id = message.sync_id
+    logger.info(f"DB connections hold time of {sync_id}: {hold_time:.3f}s")
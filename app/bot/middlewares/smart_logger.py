@@ -1,8 +1,14 @@
 """Middlewares to log all requests using smart logger wrapper."""
 
+from contextlib import contextmanager
+from typing import Iterator
+
 from pybotx import Bot, IncomingMessage, IncomingMessageHandlerFunc
+from pybotx_smart_logger import smart_log
 from pybotx_smart_logger.wrapper import wrap_smart_logger
 
+from app.db.query_stats import QueryStats, collect_query_stats
+from app.logger import logger
 from app.services.log_formatters import format_raw_command
 from app.settings import settings
 
@@ -15,4 +21,32 @@ async def smart_logger_middleware(
         context_func=lambda: format_raw_command(message.raw_command),
         debug=settings.DEBUG,
     ):
-        await call_next(message, bot)
+        with _logged_query_stats():
+            await call_next(message, bot)
+
+
+@contextmanager
+def _logged_query_stats() -> Iterator[None]:
+    with collect_query_stats() as query_stats:
+        try:
+            yield
+        finally:
+            _log_query_stats(query_stats)
+
+
+def _log_query_stats(query_stats: QueryStats) -> None:
+    if not query_stats.count:
+        return
+
+    smart_log(
+        f"DB queries: {query_stats.count}, "
+        f"total time: {query_stats.total_time:.3f}s, "
+        f"slowest ({query_stats.slowest_time:.3f}s): {query_stats.slowest_statement}"
+    )
+
+    for statement, count in query_stats.statements.items():
+        if count >= settings.SQL_REPEATED_QUERY_THRESHOLD:
+            logger.warning(
+                f"Statement executed {count} times in one handler, "
+                f"possible N+1 queries: {statement}"
+            )
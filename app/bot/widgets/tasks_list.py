@@ -1,6 +1,5 @@
 """Widget for displaying a task list."""
 
-from math import ceil
 from typing import List
 from uuid import UUID
 
@@ -16,23 +15,41 @@ from pybotx import (
 from pydantic import parse_obj_as
 
 from app.bot import constants
+from app.db.task.repo import TaskRepo
 from app.resources import strings
 from app.schemas.tasks import Task
 
 
 class TasksListWidget:
-    def __init__(self, message: IncomingMessage):
-        self.is_updating = "tasks" in message.metadata
+    def __init__(self, message: IncomingMessage, task_repo: TaskRepo):
+        self.is_updating = "task_ids" in message.metadata
 
         self._sync_ids = parse_obj_as(List[UUID], message.metadata.get("sync_ids", []))
         self._message = message
-        self._tasks = parse_obj_as(List[Task], message.metadata.get("tasks", []))
+        self._task_repo = task_repo
+        self._tasks: List[Task] = []
+        self._has_next_page = False
 
+        self._cursor = message.data.get("cursor")
+        self._backward = message.data.get("backward", False)
         self._current_task_index = message.data.get("current_task_index", 0)
         self._current_page = message.data.get("current_page", 0)
 
-    def set_tasks(self, tasks: List[Task]) -> None:  # noqa: WPS615
-        self._tasks = tasks
+    @property
+    def has_tasks(self) -> bool:
+        return bool(self._tasks)
+
+    async def fetch_tasks(self) -> None:
+        await self._fetch_page()
+
+        if not self._tasks and self._cursor is not None:
+            # Tasks of the requested page were deleted, so start from the beginning
+            self._cursor = None
+            self._backward = False
+            self._current_task_index = 0
+            self._current_page = 0
+
+            await self._fetch_page()
 
     async def send(self, bot: Bot) -> None:
         assert self._tasks, "You must fetch tasks first."
@@ -64,14 +81,23 @@ class TasksListWidget:
 
         await bot.send(message=last_message)
 
+    async def _fetch_page(self) -> None:
+        tasks_page = await self._task_repo.get_user_tasks_page(
+            self._message.sender.huid,
+            limit=constants.TASKS_LIST_PAGE_SIZE,
+            cursor=self._cursor,
+            backward=self._backward,
+        )
+
+        self._tasks = tasks_page.tasks
+        # Page fetched backward always has the page it was requested from after it
+        self._has_next_page = self._backward or tasks_page.has_more
+
     def _get_messages(self) -> List[OutgoingMessage]:
         messages = []
 
-        for idx in range(  # noqa: WPS352
-            self._current_task_index,
-            self._current_task_index + constants.TASKS_LIST_PAGE_SIZE,
-        ):
-            message = self._get_task_message(idx)
+        for page_idx in range(constants.TASKS_LIST_PAGE_SIZE):
+            message = self._get_task_message(page_idx)
             messages.append(message)
 
         return messages
@@ -85,7 +111,10 @@ class TasksListWidget:
             bubbles = BubbleMarkup()
             bubbles.add_row(self._get_control_buttons())
             last_message.bubbles = bubbles
-        last_message.metadata = {"tasks": self._tasks, "sync_ids": sync_ids}
+        last_message.metadata = {
+            "task_ids": [task.id for task in self._tasks],
+            "sync_ids": sync_ids,
+        }
 
         return last_message
 
@@ -102,6 +131,8 @@ class TasksListWidget:
                         )
                     ),
                     data={
+                        "cursor": self._tasks[0].id,
+                        "backward": True,
                         "current_task_index": (
                             self._current_task_index - constants.TASKS_LIST_PAGE_SIZE
                         ),
@@ -110,7 +141,7 @@ class TasksListWidget:
                 )
             )
 
-        if self._can_add_page():
+        if self._has_next_page:
             buttons.append(
                 Button(
                     command="/список",
@@ -120,6 +151,7 @@ class TasksListWidget:
                         )
                     ),
                     data={
+                        "cursor": self._tasks[-1].id,
                         "current_task_index": (
                             self._current_task_index + constants.TASKS_LIST_PAGE_SIZE
                         ),
@@ -130,25 +162,21 @@ class TasksListWidget:
 
         return buttons
 
-    def _get_task_message(self, idx: int) -> OutgoingMessage:
-        if idx > len(self._tasks) - 1:
+    def _get_task_message(self, page_idx: int) -> OutgoingMessage:
+        if page_idx > len(self._tasks) - 1:
             return OutgoingMessage(
                 bot_id=self._message.bot.id,
                 chat_id=self._message.chat.id,
                 body="У вас больше нет задач",
             )
 
-        task = self._tasks[idx]
+        task = self._tasks[page_idx]
 
         bubbles = BubbleMarkup()
         bubbles.add_button(
             command="/expand-task",
             label="Раскрыть задачу полностью",
-            data={
-                "task_id": task.id,
-                "tasks": self._tasks,
-                "current_task_index": idx,
-            },
+            data={"task_id": task.id},
         )
 
         if len(task.description) > constants.MAX_PREVIEW_TEXT_LEN:
@@ -180,9 +208,3 @@ class TasksListWidget:
             metadata=outgoing_message.metadata,
             sync_id=sync_id,
         )
-
-    def _can_add_page(self) -> bool:
-        return (
-            self._current_page
-            < ceil(len(self._tasks) / constants.TASKS_LIST_PAGE_SIZE) - 1  # noqa: W503
-        )
@@ -0,0 +1,346 @@
+"""Storages behind RedisRepo."""
+
+import asyncio
+import heapq
+import re
+from time import monotonic
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import aioredis
+
+if TYPE_CHECKING:
+    MessageQueue = asyncio.Queue[Optional[str]]
+else:
+    MessageQueue = asyncio.Queue
+
+# Value and monotonic time of expiration
+ExpiringValue = Tuple[bytes, Optional[float]]
+
+MEMORY_DSN_SCHEME = "memory://"
+
+KEY_NOT_FOUND_TTL = -2
+NO_EXPIRE_TTL = -1
+
+GLOB_SPECIAL_CHARS = re.compile(r"([*?\[\]\\])")
+
+# GETDEL is available only since Redis 6.2
+GET_AND_DELETE_SCRIPT = """
+local value = redis.call("GET", KEYS[1])
+if value then
+    redis.call("DEL", KEYS[1])
+end
+return value
+"""
+
+
+class BackendTransaction(Protocol):
+    def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        """Queue setting value with expiration in seconds."""
+
+    def delete(self, *keys: str) -> None:
+        """Queue deletion of keys."""
+
+    def publish(self, channel: str, message: str) -> None:
+        """Queue publishing message to channel."""
+
+    async def execute(self) -> None:
+        """Run all queued commands atomically."""
+
+
+class RedisBackend(Protocol):
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return value or `None` if key doesn't exist."""
+
+    async def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """Return values of keys in the same order, `None` for missing keys."""
+
+    async def set(
+        self,
+        key: str,
+        value: bytes,
+        expire: Optional[int] = None,
+        pexpire: Optional[int] = None,
+        only_if_missing: bool = False,
+    ) -> None:
+        """Set value with expiration in seconds or milliseconds."""
+
+    async def delete(self, *keys: str) -> None:
+        """Delete keys, missing keys are ignored."""
+
+    async def get_and_delete(self, key: str) -> Optional[bytes]:
+        """Delete key and return its value atomically."""
+
+    async def pttl(self, key: str) -> int:
+        """Return TTL in milliseconds, `NO_EXPIRE_TTL` or `KEY_NOT_FOUND_TTL`."""
+
+    async def strlen_many(self, keys: Sequence[str]) -> List[int]:
+        """Return sizes of values in bytes with one round trip, 0 for missing keys."""
+
+    def iter_keys(self, prefix: str) -> AsyncIterator[str]:
+        """Iterate over keys starting with `prefix` without blocking storage."""
+
+    def transaction(self) -> BackendTransaction:
+        """Start transaction, its commands run on `execute`."""
+
+    async def publish(self, channel: str, message: str) -> None:
+        """Send message to channel subscribers."""
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        """Return iterator of channel messages, it ends after `unsubscribe`."""
+
+    async def unsubscribe(self, channel: str) -> None:
+        """Stop receiving messages from channel."""
+
+    async def close(self) -> None:
+        """Close connections to storage."""
+
+
+async def connect_backend(dsn: str) -> RedisBackend:
+    if dsn.startswith(MEMORY_DSN_SCHEME):
+        return MemoryBackend()
+
+    return AioredisBackend(await aioredis.create_redis_pool(dsn))
+
+
+class AioredisBackend:
+    def __init__(self, redis: aioredis.Redis) -> None:
+        self.redis = redis
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.redis.get(key)
+
+    async def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return await self.redis.mget(*keys)
+
+    async def set(
+        self,
+        key: str,
+        value: bytes,
+        expire: Optional[int] = None,
+        pexpire: Optional[int] = None,
+        only_if_missing: bool = False,
+    ) -> None:
+        await self.redis.set(
+            key,
+            value,
+            expire=expire or 0,
+            pexpire=pexpire or 0,
+            exist=self.redis.SET_IF_NOT_EXIST if only_if_missing else None,
+        )
+
+    async def delete(self, *keys: str) -> None:
+        await self.redis.delete(*keys)
+
+    async def get_and_delete(self, key: str) -> Optional[bytes]:
+        return await self.redis.eval(GET_AND_DELETE_SCRIPT, keys=[key])
+
+    async def pttl(self, key: str) -> int:
+        return await self.redis.pttl(key)
+
+    async def strlen_many(self, keys: Sequence[str]) -> List[int]:
+        if not keys:
+            return []
+
+        pipeline = self.redis.pipeline()
+        for key in keys:
+            pipeline.strlen(key)
+
+        return await pipeline.execute()
+
+    async def iter_keys(self, prefix: str) -> AsyncIterator[str]:
+        escaped_prefix = GLOB_SPECIAL_CHARS.sub(r"\\\1", prefix)
+        async for key in self.redis.iscan(match=f"{escaped_prefix}*"):
+            yield key.decode()
+
+    def transaction(self) -> BackendTransaction:
+        return AioredisTransaction(self.redis.multi_exec())
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self.redis.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        redis_channels = await self.redis.subscribe(channel)
+        return redis_channels[0].iter(encoding="utf-8")
+
+    async def unsubscribe(self, channel: str) -> None:
+        await self.redis.unsubscribe(channel)
+
+    async def close(self) -> None:
+        self.redis.close()
+        await self.redis.wait_closed()
+
+
+class AioredisTransaction:
+    def __init__(self, multi_exec: aioredis.commands.MultiExec) -> None:
+        self._multi_exec = multi_exec
+
+    def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        self._multi_exec.set(key, value, expire=expire or 0)
+
+    def delete(self, *keys: str) -> None:
+        self._multi_exec.delete(*keys)
+
+    def publish(self, channel: str, message: str) -> None:
+        self._multi_exec.publish(channel, message)
+
+    async def execute(self) -> None:
+        await self._multi_exec.execute()
+
+
+class MemoryBackend:
+    def __init__(self) -> None:
+        """Create storage in process memory.
+
+        Commands don't await inside, so each of them and each transaction are
+        atomic for coroutines of the event loop. Expired keys are removed on
+        every command, so keys which are never read again don't pile up.
+        """
+
+        self._values: Dict[str, ExpiringValue] = {}
+        self._expirations: List[Tuple[float, str]] = []
+        self._subscribers: Dict[str, Set[MessageQueue]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.read_now(key)
+
+    async def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return [self.read_now(key) for key in keys]
+
+    async def set(
+        self,
+        key: str,
+        value: bytes,
+        expire: Optional[int] = None,
+        pexpire: Optional[int] = None,
+        only_if_missing: bool = False,
+    ) -> None:
+        if only_if_missing and self.read_now(key) is not None:
+            return
+
+        self.write_now(key, value, pexpire / 1000 if pexpire else expire)
+
+    async def delete(self, *keys: str) -> None:
+        self.delete_now(*keys)
+
+    async def get_and_delete(self, key: str) -> Optional[bytes]:
+        value = self.read_now(key)
+        self.delete_now(key)
+        return value
+
+    async def pttl(self, key: str) -> int:
+        self._remove_expired()
+
+        if key not in self._values:
+            return KEY_NOT_FOUND_TTL
+
+        _, expires_at = self._values[key]
+        if expires_at is None:
+            return NO_EXPIRE_TTL
+
+        return int((expires_at - monotonic()) * 1000)
+
+    async def strlen_many(self, keys: Sequence[str]) -> List[int]:
+        return [len(self.read_now(key) or b"") for key in keys]
+
+    async def iter_keys(self, prefix: str) -> AsyncIterator[str]:
+        self._remove_expired()
+
+        for key in list(self._values):
+            if key.startswith(prefix):
+                yield key
+
+    def transaction(self) -> BackendTransaction:
+        return MemoryTransaction(self)
+
+    async def publish(self, channel: str, message: str) -> None:
+        self.publish_now(channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        queue: MessageQueue = asyncio.Queue()
+        self._subscribers.setdefault(channel, set()).add(queue)
+        return _iterate_queue(queue)
+
+    async def unsubscribe(self, channel: str) -> None:
+        for queue in self._subscribers.pop(channel, set()):
+            queue.put_nowait(None)
+
+    async def close(self) -> None:
+        for channel in list(self._subscribers):
+            await self.unsubscribe(channel)
+
+        self._values.clear()
+        self._expirations.clear()
+
+    def read_now(self, key: str) -> Optional[bytes]:
+        self._remove_expired()
+
+        value, _ = self._values.get(key, (None, None))
+        return value
+
+    def write_now(self, key: str, value: bytes, expire: Optional[float]) -> None:
+        self._remove_expired()
+
+        expires_at = None
+        if expire:
+            expires_at = monotonic() + expire
+            heapq.heappush(self._expirations, (expires_at, key))
+
+        self._values[key] = (value, expires_at)
+
+    def delete_now(self, *keys: str) -> None:
+        for key in keys:
+            self._values.pop(key, None)
+
+    def publish_now(self, channel: str, message: str) -> None:
+        for queue in self._subscribers.get(channel, set()):
+            queue.put_nowait(message)
+
+    def _remove_expired(self) -> None:
+        now = monotonic()
+
+        while self._expirations and self._expirations[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expirations)
+
+            # Key could be set again with another expiration
+            _, current_expires_at = self._values.get(key, (None, None))
+            if current_expires_at == expires_at:
+                del self._values[key]  # noqa: WPS420
+
+
+class MemoryTransaction:
+    def __init__(self, backend: MemoryBackend) -> None:
+        self._backend = backend
+        self._commands: List[Callable[[], None]] = []
+
+    def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        self._commands.append(lambda: self._backend.write_now(key, value, expire))
+
+    def delete(self, *keys: str) -> None:
+        self._commands.append(lambda: self._backend.delete_now(*keys))
+
+    def publish(self, channel: str, message: str) -> None:
+        self._commands.append(lambda: self._backend.publish_now(channel, message))
+
+    async def execute(self) -> None:
+        for command in self._commands:
+            command()
+
+
+async def _iterate_queue(queue: MessageQueue) -> AsyncIterator[str]:
+    while True:
+        message = await queue.get()
+        if message is None:
+            return
+
+        yield message
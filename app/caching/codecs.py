@@ -0,0 +1,170 @@
+"""Codecs for values stored in redis."""
+
+import dataclasses
+import json
+import pickle  # noqa: S403
+from enum import Enum
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Protocol, Type
+from uuid import UUID
+
+PICKLE_MARKER = b"\x80"  # First byte of pickle protocol 2+ data
+
+TAG_KEY = "$"
+VALUE_KEY = "v"
+UUID_TAG = "uuid"
+TUPLE_TAG = "tuple"
+NAMESPACE_TAG = "namespace"
+
+
+class Codec(Protocol):
+    def dumps(self, value: Any) -> bytes:
+        ...  # noqa: WPS428
+
+    def loads(self, data: bytes) -> Any:
+        ...  # noqa: WPS428
+
+
+class PickleCodec:
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)  # noqa: S301
+
+
+class UnsupportedTypeError(TypeError):
+    """Error for raising when value can't be encoded with type tags."""
+
+
+class TaggedJSONCodec:
+    def __init__(
+        self, types: Iterable[Type[Any]], pickle_fallback: bool = False
+    ) -> None:
+        """Create JSON codec with explicit type tags.
+
+        Only registered dataclasses and enums, UUIDs, tuples, simple namespaces
+        and JSON types are supported. If `pickle_fallback` is set, other values
+        are pickled and pickled data (e.g. written before codec change) is loaded.
+        Otherwise they raise `UnsupportedTypeError`.
+
+        Values are encoded slower than with pickle, but loading them can't
+        execute code.
+        """
+
+        self._pickle_fallback = pickle_fallback
+        self._types_by_tag: Dict[str, Type[Any]] = {}
+        self._tags_by_type: Dict[Type[Any], str] = {}
+
+        for registered_type in types:
+            assert dataclasses.is_dataclass(registered_type) or issubclass(
+                registered_type, Enum
+            ), f"{registered_type} should be dataclass or enum"
+
+            tag = registered_type.__qualname__
+            assert tag not in self._types_by_tag, f"Duplicated type tag {tag}"
+            self._types_by_tag[tag] = registered_type
+            self._tags_by_type[registered_type] = tag
+
+    def dumps(self, value: Any) -> bytes:
+        try:
+            encoded_value = self._encode(value)
+        except UnsupportedTypeError:
+            if not self._pickle_fallback:
+                raise
+
+            return pickle.dumps(value)
+
+        return json.dumps(
+            encoded_value, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+
+    def loads(self, data: bytes) -> Any:
+        if data[:1] == PICKLE_MARKER:
+            if not self._pickle_fallback:
+                raise UnsupportedTypeError("Pickled data loading is disabled")
+
+            return pickle.loads(data)  # noqa: S301
+
+        return self._decode(json.loads(data))
+
+    def _encode(self, value: Any) -> Any:
+        tag = self._tags_by_type.get(type(value))
+        if tag is not None:
+            return self._encode_registered(value, tag)
+
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+
+        if isinstance(value, list):
+            return [self._encode(element) for element in value]
+
+        if isinstance(value, dict):
+            return self._encode_dict(value)
+
+        return self._encode_builtin(value)
+
+    def _encode_registered(self, value: Any, tag: str) -> Any:
+        if isinstance(value, Enum):
+            return {TAG_KEY: tag, VALUE_KEY: value.name}
+
+        return {
+            TAG_KEY: tag,
+            VALUE_KEY: {
+                field.name: self._encode(getattr(value, field.name))
+                for field in dataclasses.fields(value)
+            },
+        }
+
+    def _encode_dict(self, value: Dict[Any, Any]) -> Dict[str, Any]:
+        has_str_keys = all(isinstance(key, str) for key in value)
+        if TAG_KEY in value or not has_str_keys:
+            raise UnsupportedTypeError("Only dicts with str keys are supported")
+
+        return {key: self._encode(dict_value) for key, dict_value in value.items()}
+
+    def _encode_builtin(self, value: Any) -> Any:
+        if isinstance(value, UUID):
+            return {TAG_KEY: UUID_TAG, VALUE_KEY: value.hex}
+
+        if isinstance(value, tuple):
+            return {TAG_KEY: TUPLE_TAG, VALUE_KEY: self._encode(list(value))}
+
+        # FSM middleware keeps handler's storage in a simple namespace
+        if isinstance(value, SimpleNamespace):
+            namespace_dict = self._encode_dict(value.__dict__)
+            return {TAG_KEY: NAMESPACE_TAG, VALUE_KEY: namespace_dict}
+
+        value_type = type(value)
+        raise UnsupportedTypeError(f"Type {value_type} is not registered")
+
+    def _decode(self, raw_value: Any) -> Any:
+        if isinstance(raw_value, list):
+            return [self._decode(element) for element in raw_value]
+
+        if not isinstance(raw_value, dict):
+            return raw_value
+
+        tag = raw_value.get(TAG_KEY)
+        if tag is None:
+            return {
+                key: self._decode(dict_value) for key, dict_value in raw_value.items()
+            }
+
+        return self._decode_tagged(tag, self._decode(raw_value[VALUE_KEY]))
+
+    def _decode_tagged(self, tag: str, tagged_value: Any) -> Any:
+        if tag == UUID_TAG:
+            return UUID(tagged_value)
+
+        if tag == TUPLE_TAG:
+            return tuple(tagged_value)
+
+        if tag == NAMESPACE_TAG:
+            return SimpleNamespace(**tagged_value)
+
+        registered_type = self._types_by_tag[tag]
+        if issubclass(registered_type, Enum):
+            return registered_type[tagged_value]
+
+        return registered_type(**tagged_value)
@@ -0,0 +1,85 @@
+"""Storage of FSM states with bounded lifetime."""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Hashable, Iterable, Mapping, Optional, Type
+
+from app.caching.redis_repo import RedisRepo
+
+FSM_NAMESPACE = "fsm"
+
+# TTLs of states by their FSM states enum
+StateTTLs = Mapping[Type[Enum], int]
+
+
+@dataclass
+class FSMStatesReport:
+    count: int
+    size: int
+
+
+class FSMStateRepo:
+    def __init__(
+        self,
+        redis_repo: RedisRepo,
+        default_ttl: int,
+        state_ttls: Optional[StateTTLs] = None,
+    ) -> None:
+        """Create repository for FSM middleware.
+
+        States are stored in separate namespace of `redis_repo` and expire
+        after TTL of their FSM states enum (or `default_ttl`). TTL is refreshed
+        on every transition, so only abandoned flows expire.
+        """
+
+        self._redis_repo = redis_repo.namespace(FSM_NAMESPACE, expire=default_ttl)
+        self._default_ttl = default_ttl
+        self._state_ttls = state_ttls or {}
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        return await self._redis_repo.get(key, default)
+
+    async def set(
+        self, key: Hashable, value: Any, expire: Optional[int] = None
+    ) -> None:
+        if expire is None:
+            expire = self._get_ttl(value)
+
+        await self._redis_repo.set(key, value, expire)
+
+    async def delete(self, key: Hashable) -> None:
+        await self._redis_repo.delete(key)
+
+    async def rget(self, key: Hashable, default: Any = None) -> Any:
+        return await self._redis_repo.rget(key, default)
+
+    async def report(self) -> FSMStatesReport:
+        """Count live FSM states and their size in bytes."""
+
+        count, size = await self._redis_repo.count_values()
+        return FSMStatesReport(count=count, size=size)
+
+    def _get_ttl(self, value: Any) -> int:
+        state = _find_state(value)
+        if state is None:
+            return self._default_ttl
+
+        return self._state_ttls.get(type(state), self._default_ttl)
+
+
+def _find_state(value: Any) -> Optional[Enum]:
+    if isinstance(value, Enum):
+        return value
+
+    candidates: Iterable[Any]
+    if isinstance(value, Mapping):
+        candidates = value.values()
+    elif isinstance(value, (tuple, list)):
+        candidates = value
+    else:
+        candidates = getattr(value, "__dict__", {}).values()
+
+    return next(
+        (candidate for candidate in candidates if isinstance(candidate, Enum)),
+        None,
+    )
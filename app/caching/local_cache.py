@@ -0,0 +1,48 @@
+"""In-process cache tier."""
+
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Optional, Tuple
+
+
+class LocalCache:
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """Create LRU cache with `max_size` entries living at most `ttl` seconds."""
+
+        assert max_size > 0, "`max_size` should be positive"
+
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return pair of found flag and value."""
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expire_at, value = entry
+        if expire_at <= monotonic():
+            del self._entries[key]  # noqa: WPS420
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value for `ttl` seconds, but no longer than cache `ttl`."""
+
+        ttl = self._ttl if ttl is None else min(ttl, self._ttl)
+
+        self._entries[key] = (monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -2,81 +2,491 @@
 
 # flake8: noqa
 # TODO: Fix linter errors
+import asyncio
+import copy
 import hashlib
 import pickle
-from typing import Any, Hashable, Optional
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from uuid import UUID, uuid4
 
-import aioredis
 from starlette.datastructures import URL
 
+from app.caching.backends import RedisBackend, connect_backend
+from app.caching.codecs import Codec, PickleCodec
+from app.caching.local_cache import LocalCache
+from app.logger import logger
+
+KEY_DELIMITER = ":"
+LEGACY_KEY_DELIMITER = "_"
+HASHED_KEY_MARKER = "#"
+NAMESPACE_MARKER = "@"
+# Starts keys formatted from non-string values, so they can't equal plain strings
+FORMATTED_KEY_MARKER = "$"
+KEY_MARKERS = (HASHED_KEY_MARKER, NAMESPACE_MARKER, FORMATTED_KEY_MARKER)
+# Strings that look like formatted values of other types, e.g. `"1"` and `1`
+RESERVED_KEY_PARTS = frozenset(("None", "True", "False"))
+UUID_STR_LENGTH = 36
+UUID_STR_DASHES = 4
+# Sizes of scanned values are requested with one round trip per batch
+COUNT_VALUES_BATCH_SIZE = 1000
+
 
 class RedisRepo:
-    redis: aioredis.Redis
+    backend: RedisBackend
     dsn: str
     prefix: Optional[str]
     delimiter: str
     expire: Optional[int]
+    local_cache: Optional[LocalCache]
+    codec: Codec
 
     def __init__(
-        self, dsn: URL, prefix: Optional[str] = None, expire: Optional[int] = None
+        self,
+        dsn: URL,
+        prefix: Optional[str] = None,
+        expire: Optional[int] = None,
+        local_cache: Optional[LocalCache] = None,
+        codec: Optional[Codec] = None,
+        read_legacy_keys: bool = False,
     ) -> None:
-        """Init repository object."""
+        """Init repository object.
+
+        If `local_cache` is passed, values are also kept in process memory. Other
+        processes are notified about changed keys through pub/sub, so local
+        values may be stale only until notification is delivered and never
+        longer than local cache TTL.
+
+        Values are serialized with `codec`, pickle is used by default.
+
+        String keys are stored as is, e.g. `prefix:fsm:<host>:<bot_id>:...`.
+        UUIDs, ints and tuples of them and strings are formatted into readable
+        keys like `prefix:$tasks_cache_generation:<huid>`, other keys are hashed.
+        If `read_legacy_keys` is set, values missing under new keys are moved
+        from keys of the old `prefix_<md5>` format.
+
+        Values are stored in Redis or, for `memory://` DSN, in process memory.
+        """
 
         self.dsn = str(dsn)
         self.prefix = prefix
         self.expire = expire
-        self.delimiter = "_"
+        self.delimiter = KEY_DELIMITER
+        self.local_cache = local_cache
+        self.codec = codec or PickleCodec()
+        self.read_legacy_keys = read_legacy_keys
+
+        self._key_prefix = prefix + KEY_DELIMITER if prefix is not None else ""
+
+        self._instance_id = uuid4().hex
+        self._invalidation_listener: Optional["asyncio.Task[None]"] = None
+        # Shared by namespaces, so local cache is disabled for all of them at once
+        self._namespaces: List[RedisRepo] = []
 
     @classmethod
     async def init(
-        cls, dsn: URL, prefix: Optional[str] = None, expire: Optional[int] = None
+        cls,
+        dsn: URL,
+        prefix: Optional[str] = None,
+        expire: Optional[int] = None,
+        local_cache: Optional[LocalCache] = None,
+        codec: Optional[Codec] = None,
+        read_legacy_keys: bool = False,
     ) -> "RedisRepo":
         """Init repository object."""
 
-        repo = cls(dsn=dsn, prefix=prefix, expire=expire)
-        repo.redis = await aioredis.create_redis_pool(repo.dsn)
+        repo = cls(
+            dsn=dsn,
+            prefix=prefix,
+            expire=expire,
+            local_cache=local_cache,
+            codec=codec,
+            read_legacy_keys=read_legacy_keys,
+        )
+        repo.backend = await connect_backend(repo.dsn)
+
+        if repo.local_cache is not None:
+            messages = await repo.backend.subscribe(repo._invalidation_channel)
+            repo._invalidation_listener = asyncio.create_task(
+                repo._listen_invalidations(messages)
+            )
+
         return repo
 
     async def close(self) -> None:
         """Close connection to redis."""
 
-        self.redis.close()
-        await self.redis.wait_closed()
+        if self._invalidation_listener is not None:
+            self._invalidation_listener.cancel()
+            await self.backend.unsubscribe(self._invalidation_channel)
+
+        await self.backend.close()
+
+    def namespace(self, name: str, expire: Optional[int] = None) -> "RedisRepo":
+        """Get repository storing values under `prefix:@name:` keys.
+
+        Parent repository keys never start with the marker, so they can't collide
+        with namespace keys. Connection and local cache are shared, so only the
+        parent repository should be closed.
+        """
+
+        repo = copy.copy(self)
+        repo.expire = expire
+        repo._key_prefix = f"{self._key_prefix}{NAMESPACE_MARKER}{name}{KEY_DELIMITER}"
+        self._namespaces.append(repo)
+
+        return repo
+
+    async def count_values(self) -> Tuple[int, int]:
+        """Count values under repository keys and their total size in bytes.
+
+        All keys are scanned, so it should be used only for maintenance.
+        """
+
+        values_count = 0
+        values_size = 0
+        keys_batch: List[str] = []
+
+        async for redis_key in self.backend.iter_keys(self._key_prefix):
+            keys_batch.append(redis_key)
+            if len(keys_batch) < COUNT_VALUES_BATCH_SIZE:
+                continue
+
+            values_count += len(keys_batch)
+            values_size += sum(await self.backend.strlen_many(keys_batch))
+            keys_batch = []
+
+        values_count += len(keys_batch)
+        values_size += sum(await self.backend.strlen_many(keys_batch))
+
+        return values_count, values_size
+
+    def _key(self, arg: Hashable) -> str:
+        formatted_key = _format_key(arg)
+        if formatted_key is None:
+            formatted_key = HASHED_KEY_MARKER + _hash_key(arg)
+
+        return self._key_prefix + formatted_key
 
-    def __key(self, arg: Hashable) -> str:
+    def _legacy_key(self, arg: Hashable) -> str:
         if self.prefix is not None:
-            _prefix = self.prefix + self.delimiter
+            _prefix = self.prefix + LEGACY_KEY_DELIMITER
         else:
             _prefix = ""
 
-        return _prefix + hashlib.md5(pickle.dumps(arg)).hexdigest()
+        return _prefix + _hash_key(arg)
 
     async def get(self, key: Hashable, default: Any = None) -> Any:
         """Get value from redis."""
 
-        cached_data = await self.redis.get(self.__key(key))
+        redis_key = self._key(key)
+
+        if self.local_cache is not None:
+            is_found, cached_data = self.local_cache.get(redis_key)
+            if is_found:
+                return self.codec.loads(cached_data)
+
+        cached_data = await self.backend.get(redis_key)
+        if cached_data is None and self.read_legacy_keys:
+            cached_data = await self._move_legacy_value(
+                self._legacy_key(key), redis_key
+            )
+
         if cached_data is None:
             return default
-        else:
-            return pickle.loads(cached_data)
+
+        if self.local_cache is not None:
+            # Encoded data is kept, so callers can't change cached value in place
+            self.local_cache.set(redis_key, cached_data)
+
+        return self.codec.loads(cached_data)
 
     async def set(
-        self, key: Hashable, value: Any, expire: Optional[int] = None
+        self,
+        key: Hashable,
+        value: Any,
+        expire: Optional[int] = None,
+        only_if_missing: bool = False,
     ) -> None:
-        """Set value into redis."""
+        """Set value into redis.
+
+        If `only_if_missing` is set, value already stored under the key is kept.
+        """
 
         if expire is None:
             expire = self.expire
-        await self.redis.set(self.__key(key), pickle.dumps(value), expire=expire)
+
+        redis_key = self._key(key)
+        data = self.codec.dumps(value)
+        await self.backend.set(
+            redis_key, data, expire=expire, only_if_missing=only_if_missing
+        )
+
+        if self.local_cache is None:
+            return
+
+        # It's unknown which value won, so it is read from redis next time
+        if only_if_missing:
+            self.local_cache.delete(redis_key)
+        else:
+            self.local_cache.set(redis_key, data, ttl=expire)
+        await self._publish_invalidation(redis_key)
 
     async def delete(self, key: Hashable) -> None:
         """Remove value from redis."""
 
-        await self.redis.delete(self.__key(key))
+        redis_key = self._key(key)
+        if self.read_legacy_keys:
+            await self.backend.delete(redis_key, self._legacy_key(key))
+        else:
+            await self.backend.delete(redis_key)
+
+        if self.local_cache is not None:
+            self.local_cache.delete(redis_key)
+            await self._publish_invalidation(redis_key)
 
     async def rget(self, key: Hashable, default: Any = None) -> Any:
-        """Get value and remove it from redis."""
+        """Get value and remove it from redis atomically.
+
+        Value can be consumed only once, even by concurrent callers.
+        """
+
+        redis_key = self._key(key)
+        data = await self.backend.get_and_delete(redis_key)
+        if data is None and self.read_legacy_keys:
+            data = await self.backend.get_and_delete(self._legacy_key(key))
+
+        if data is None:
+            return default
+
+        if self.local_cache is not None:
+            self.local_cache.delete(redis_key)
+            await self._publish_invalidation(redis_key)
+
+        return self.codec.loads(data)
+
+    async def mget(self, keys: Sequence[Hashable], default: Any = None) -> List[Any]:
+        """Get values of several keys from redis in one request."""
+
+        redis_keys = [self._key(key) for key in keys]
+        datas: List[Optional[bytes]] = [None] * len(keys)
+        missing_indexes = []
+
+        for index, redis_key in enumerate(redis_keys):
+            if self.local_cache is not None:
+                is_found, cached_data = self.local_cache.get(redis_key)
+                if is_found:
+                    datas[index] = cached_data
+                    continue
+
+            missing_indexes.append(index)
+
+        if missing_indexes:
+            fetched_datas = await self.backend.mget(
+                [redis_keys[index] for index in missing_indexes]
+            )
+
+            for index, cached_data in zip(missing_indexes, fetched_datas):
+                if cached_data is None and self.read_legacy_keys:
+                    cached_data = await self._move_legacy_value(
+                        self._legacy_key(keys[index]), redis_keys[index]
+                    )
+
+                if cached_data is not None and self.local_cache is not None:
+                    self.local_cache.set(redis_keys[index], cached_data)
+
+                datas[index] = cached_data
+
+        return [
+            default if cached_data is None else self.codec.loads(cached_data)
+            for cached_data in datas
+        ]
+
+    async def mset(
+        self, values: Mapping[Hashable, Any], expire: Optional[int] = None
+    ) -> None:
+        """Set several values into redis in one request."""
+
+        async with self.transaction() as transaction:
+            for key, value in values.items():
+                transaction.set(key, value, expire)
+
+    async def delete_many(self, keys: Iterable[Hashable]) -> None:
+        """Remove several values from redis in one request."""
+
+        async with self.transaction() as transaction:
+            for key in keys:
+                transaction.delete(key)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["RedisTransaction"]:
+        """Queue writes and apply them atomically in one request on exit.
+
+        Nothing is written if the block raises an exception.
+        """
+
+        transaction = RedisTransaction(self)
+        yield transaction
+        await transaction.execute()
+
+    async def _move_legacy_value(
+        self, legacy_key: str, redis_key: str
+    ) -> Optional[bytes]:
+        data = await self.backend.get(legacy_key)
+        if data is None:
+            return None
+
+        ttl = await self.backend.pttl(legacy_key)
+        # Value set under new key meanwhile is newer and shouldn't be overwritten
+        await self.backend.set(
+            redis_key, data, pexpire=max(ttl, 0), only_if_missing=True
+        )
+        await self.backend.delete(legacy_key)
+
+        return data
+
+    @property
+    def _invalidation_channel(self) -> str:
+        return f"{self.prefix}{self.delimiter}local_cache_invalidation"
+
+    def _invalidation_message(self, redis_key: str) -> str:
+        return f"{self._instance_id}:{redis_key}"
+
+    async def _publish_invalidation(self, redis_key: str) -> None:
+        await self.backend.publish(
+            self._invalidation_channel, self._invalidation_message(redis_key)
+        )
+
+    async def _listen_invalidations(self, messages: AsyncIterator[str]) -> None:
+        assert self.local_cache is not None
+
+        async for message in messages:
+            instance_id, redis_key = message.split(":", 1)
+
+            if instance_id != self._instance_id:
+                self.local_cache.delete(redis_key)
+
+        # Notifications could be missed, so stale values shouldn't be used anymore
+        logger.warning("Local cache invalidation channel is closed")
+        self.local_cache.clear()
+
+        for repo in (self, *self._namespaces):
+            repo.local_cache = None
+
+
+class RedisTransaction:
+    def __init__(self, repo: RedisRepo) -> None:
+        self._repo = repo
+        self._backend_transaction = repo.backend.transaction()
+        self._is_empty = True
+        # Key, encoded value (None for deleted keys) and expire
+        self._local_changes: List[Tuple[str, Optional[bytes], Optional[int]]] = []
+
+    def set(self, key: Hashable, value: Any, expire: Optional[int] = None) -> None:
+        if expire is None:
+            expire = self._repo.expire
+
+        redis_key = self._repo._key(key)
+        data = self._repo.codec.dumps(value)
+        self._backend_transaction.set(redis_key, data, expire)
+        self._is_empty = False
+        self._add_local_change(redis_key, data, expire)
+
+    def delete(self, key: Hashable) -> None:
+        redis_key = self._repo._key(key)
+        if self._repo.read_legacy_keys:
+            self._backend_transaction.delete(redis_key, self._repo._legacy_key(key))
+        else:
+            self._backend_transaction.delete(redis_key)
+
+        self._is_empty = False
+        self._add_local_change(redis_key, None, None)
+
+    async def execute(self) -> None:
+        if self._is_empty:
+            return
+
+        await self._backend_transaction.execute()
+
+        local_cache = self._repo.local_cache
+        if local_cache is None:
+            return
+
+        for redis_key, data, expire in self._local_changes:
+            if data is None:
+                local_cache.delete(redis_key)
+            else:
+                local_cache.set(redis_key, data, ttl=expire)
+
+    def _add_local_change(
+        self, redis_key: str, data: Optional[bytes], expire: Optional[int]
+    ) -> None:
+        if self._repo.local_cache is None:
+            return
+
+        self._local_changes.append((redis_key, data, expire))
+        self._backend_transaction.publish(
+            self._repo._invalidation_channel,
+            self._repo._invalidation_message(redis_key),
+        )
+
+
+def _format_key(arg: Hashable) -> Optional[str]:
+    if isinstance(arg, str):
+        is_ambiguous = not arg or arg.startswith(KEY_MARKERS)
+        return None if is_ambiguous else arg
+
+    if not isinstance(arg, tuple):
+        formatted_part = _format_key_part(arg)
+        if formatted_part is None:
+            return None
+
+        return FORMATTED_KEY_MARKER + formatted_part
+
+    # One element tuple would get the same key as its element
+    if len(arg) < 2:
+        return None
+
+    formatted_parts = []
+    for part in arg:
+        formatted_part = _format_key_part(part)
+        if formatted_part is None:
+            return None
+
+        formatted_parts.append(formatted_part)
+
+    return FORMATTED_KEY_MARKER + KEY_DELIMITER.join(formatted_parts)
+
+
+def _format_key_part(part: Hashable) -> Optional[str]:
+    """Format key part, if it can't be confused with other parts."""
+
+    if isinstance(part, str):
+        is_ambiguous = (
+            not part
+            or KEY_DELIMITER in part
+            or part in RESERVED_KEY_PARTS
+            or part.lstrip("-").isdigit()
+            or (len(part) == UUID_STR_LENGTH and part.count("-") == UUID_STR_DASHES)
+        )
+        return None if is_ambiguous else part
+
+    part_type = type(part)
+    if part_type is UUID or part_type is int or part_type is bool or part is None:
+        return str(part)
+
+    return None
+
 
-        value = await self.get(key, default)
-        await self.delete(key)
-        return value
+def _hash_key(arg: Hashable) -> str:
+    return hashlib.md5(pickle.dumps(arg)).hexdigest()
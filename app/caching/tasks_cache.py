@@ -0,0 +1,110 @@
+"""Cache of user task lists."""
+
+from typing import Any, Awaitable, Callable, Hashable, Tuple, TypeVar
+from uuid import UUID, uuid4
+
+from app.caching.redis_repo import RedisRepo
+
+T = TypeVar("T")  # noqa: WPS111
+
+# Generation outlives entries cached under it, so they are not lost too early
+GENERATION_EXPIRE_FACTOR = 2
+
+
+class TasksCache:
+    def __init__(
+        self, redis_repo: RedisRepo, expire: int, recent_write_expire: int
+    ) -> None:
+        """Create per-user cache of task list pages and counters.
+
+        Keys contain user generation, which is replaced after every committed
+        write to user tasks. Entries cached before the write are never read again
+        and expire by `expire` seconds.
+
+        User is also marked as a recent writer for `recent_write_expire` seconds,
+        so their reads go to primary database instead of lagging replica. Values
+        fetched while the mark is set are not cached, because they could be
+        read from replica before the write reached it.
+        """
+
+        self.hits = 0
+        self.misses = 0
+
+        self._redis_repo = redis_repo
+        self._expire = expire
+        self._recent_write_expire = recent_write_expire
+        self._generation_expire = expire * GENERATION_EXPIRE_FACTOR
+
+    @property
+    def hit_ratio(self) -> float:
+        requests_num = self.hits + self.misses
+        return self.hits / requests_num if requests_num else 0
+
+    async def get_or_fetch(
+        self,
+        user_huid: UUID,
+        key: Tuple[Hashable, ...],
+        fetch: Callable[[], Awaitable[T]],
+    ) -> T:
+        # Generation is read before fetching, so data read before a concurrent
+        # write can only be stored under the old generation
+        generation = await self._get_generation(user_huid)
+        cache_key = ("tasks_cache", user_huid, generation, *key)
+
+        cached_value = await self._redis_repo.get(cache_key)
+        if cached_value is not None:
+            self.hits += 1
+            return cached_value
+
+        self.misses += 1
+
+        value = await fetch()
+        # Read source was chosen before the generation was read, so a write
+        # committed in between could be missing from replica data
+        if not await self.has_recent_write(user_huid):
+            await self._redis_repo.set(cache_key, value, expire=self._expire)
+
+        return value
+
+    async def invalidate(self, user_huid: UUID) -> None:
+        """Drop cached user tasks. Should be called after user tasks change commit."""
+
+        # Mark is set before generation is replaced, so reads which see the new
+        # generation also see the mark and don't cache possibly stale data
+        await self._redis_repo.set(
+            self._recent_write_key(user_huid),
+            value=True,
+            expire=self._recent_write_expire,
+        )
+        await self._redis_repo.set(
+            self._generation_key(user_huid),
+            uuid4(),
+            expire=self._generation_expire,
+        )
+
+    async def has_recent_write(self, user_huid: UUID) -> bool:
+        return bool(await self._redis_repo.get(self._recent_write_key(user_huid)))
+
+    async def _get_generation(self, user_huid: UUID) -> Any:
+        generation_key = self._generation_key(user_huid)
+
+        generation = await self._redis_repo.get(generation_key)
+        if generation is not None:
+            return generation
+
+        # Concurrent invalidation or another reader may set generation first
+        new_generation = uuid4()
+        await self._redis_repo.set(
+            generation_key,
+            new_generation,
+            expire=self._generation_expire,
+            only_if_missing=True,
+        )
+
+        return await self._redis_repo.get(generation_key, default=new_generation)
+
+    def _generation_key(self, user_huid: UUID) -> Tuple[str, UUID]:
+        return ("tasks_cache_generation", user_huid)
+
+    def _recent_write_key(self, user_huid: UUID) -> Tuple[str, UUID]:
+        return ("db_recent_write", user_huid)
@@ -0,0 +1,110 @@
+"""Cache of user search results on all cts."""
+
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from pybotx import Bot, BotAccount, UserFromSearch
+
+from app.caching.redis_repo import RedisRepo
+from app.services.botx_user_search import UserIsBotError, search_user_on_each_cts
+
+USER_NOT_FOUND = "not_found"
+USER_IS_BOT = "is_bot"
+
+SearchResult = Optional[Tuple[UserFromSearch, BotAccount]]
+
+
+class UserSearchCache:
+    def __init__(
+        self, redis_repo: RedisRepo, expire: int, negative_expire: int
+    ) -> None:
+        """Create cache of `search_user_on_each_cts` results by huid.
+
+        Found users are kept for `expire` seconds, "not found" and "is bot"
+        results for `negative_expire` seconds. Concurrent searches of the same
+        user in this worker share one request to BotX.
+        """
+
+        self.hits = 0
+        self.misses = 0
+
+        self._redis_repo = redis_repo
+        self._expire = expire
+        self._negative_expire = negative_expire
+        self._searches: Dict[UUID, "asyncio.Future[Any]"] = {}
+
+    @property
+    def hit_ratio(self) -> float:
+        requests_num = self.hits + self.misses
+        return self.hits / requests_num if requests_num else 0
+
+    async def search_user(self, bot: Bot, huid: UUID) -> SearchResult:
+        """Search user like `search_user_on_each_cts`, but with cache."""
+
+        cached_value = await self._redis_repo.get(self._key(huid))
+        if cached_value is not None and self._is_usable(bot, cached_value):
+            self.hits += 1
+            return self._unpack(bot, cached_value)
+
+        search = self._searches.get(huid)
+        if search is None:
+            self.misses += 1
+
+            search = asyncio.ensure_future(self._search_and_store(bot, huid))
+            self._searches[huid] = search
+            search.add_done_callback(lambda _: self._searches.pop(huid, None))
+        else:
+            self.hits += 1
+
+        # Cancelling one of waiters shouldn't cancel the search for others
+        cached_value = await asyncio.shield(search)
+        return self._unpack(bot, cached_value)
+
+    async def _search_and_store(self, bot: Bot, huid: UUID) -> Any:
+        try:
+            search_result = await search_user_on_each_cts(bot, huid)
+        except UserIsBotError:
+            cached_value: Any = USER_IS_BOT
+        else:
+            if search_result is None:
+                cached_value = USER_NOT_FOUND
+            else:
+                user, bot_account = search_result
+                cached_value = (user, bot_account.id)
+
+        expire = self._expire
+        if isinstance(cached_value, str):
+            expire = self._negative_expire
+
+        await self._redis_repo.set(self._key(huid), cached_value, expire=expire)
+
+        return cached_value
+
+    def _is_usable(self, bot: Bot, cached_value: Any) -> bool:
+        if isinstance(cached_value, str):
+            return True
+
+        # Bot account could be removed from credentials after caching
+        _, bot_id = cached_value
+        return _find_bot_account(bot, bot_id) is not None
+
+    def _unpack(self, bot: Bot, cached_value: Any) -> SearchResult:
+        if cached_value == USER_IS_BOT:
+            raise UserIsBotError
+
+        if cached_value == USER_NOT_FOUND:
+            return None
+
+        user, bot_id = cached_value
+        bot_account = _find_bot_account(bot, bot_id)
+        assert bot_account is not None
+
+        return user, bot_account
+
+    def _key(self, huid: UUID) -> Tuple[str, UUID]:
+        return ("user_search", huid)
+
+
+def _find_bot_account(bot: Bot, bot_id: UUID) -> Optional[BotAccount]:
+    return next((account for account in bot.bot_accounts if account.id == bot_id), None)
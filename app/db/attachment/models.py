@@ -2,7 +2,7 @@
 
 from uuid import UUID
 
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import relationship
 
@@ -11,6 +11,7 @@ from app.db.sqlalchemy import Base
 
 class AttachmentModel(Base):
     __tablename__ = "attachments"
+    __table_args__ = (Index("ix_attachments_task_id", "task_id", unique=True),)
 
     id: int = Column(Integer, primary_key=True)
     file_storage_id: UUID = Column(postgresql.UUID(as_uuid=True))
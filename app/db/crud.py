@@ -1,14 +1,35 @@
 """CRUD implementation."""
 
-from typing import Any, Dict, TypeVar
+from typing import Any, Dict, Iterator, List, Sequence, TypeVar
 
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import Column, any_, bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.inspection import inspect
 
 from app.db.sqlalchemy import AsyncSession
 
 T = TypeVar("T")  # noqa: WPS111
 
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def chunked(items: Sequence[T], chunk_size: int) -> Iterator[Sequence[T]]:
+    """Split items into chunks with `chunk_size` items at most."""
+    assert chunk_size > 0, "`chunk_size` should be positive"
+
+    yield from (
+        items[start : start + chunk_size]  # noqa: E203
+        for start in range(0, len(items), chunk_size)
+    )
+
+
+def table_columns(cls_model: Any) -> List[Column]:
+    """Return model columns except generated ones (e.g. search vectors).
+
+    Generated columns are derived from other columns, so they are not read back.
+    """
+    return [column for column in cls_model.__table__.columns if column.computed is None]
+
 
 class CRUD:
     """CRUD operations for models."""
@@ -18,39 +39,97 @@ class CRUD:
         self._cls_model = cls_model
 
     async def create(self, *, model_data: Dict[str, Any]) -> Any:
-        """Create object."""
+        """Create object and return its row."""
         query = insert(self._cls_model).values(**model_data)
 
-        res = await self._session.execute(query)
-        return res.inserted_primary_key
+        res = await self._session.execute(query.returning(*self._columns()))
+        return res.one()
 
     async def update(
         self,
         *,
         pkey_val: Any,
         model_data: Dict[str, Any],
-    ) -> None:
-        """Update object by primary key."""
+    ) -> Any:
+        """Update object by primary key.
+
+        Returns updated row or `None` if nothing was updated.
+        """
         primary_key = inspect(self._cls_model).primary_key[0]
         query = (
             update(self._cls_model)
             .where(primary_key == pkey_val)
             .values(**model_data)
-            .execution_options(synchronize_session="fetch")
+            .returning(*self._columns())
+            .execution_options(synchronize_session=False)
         )
 
-        await self._session.execute(query)
+        res = await self._session.execute(query)
+        return res.one_or_none()
+
+    async def delete(self, *, pkey_val: Any) -> Any:
+        """Delete object by primary key value.
 
-    async def delete(self, *, pkey_val: Any) -> None:
-        """Delete object by primary key value."""
-        primary_key = inspect(self._cls_model).primary_key[0].name
+        Returns deleted row or `None` if nothing was deleted.
+        """
+        primary_key = inspect(self._cls_model).primary_key[0]
         query = (
             delete(self._cls_model)
-            .where(getattr(self._cls_model, primary_key) == pkey_val)
-            .execution_options(synchronize_session="fetch")
+            .where(primary_key == pkey_val)
+            .returning(*self._columns())
+            .execution_options(synchronize_session=False)
         )
 
-        await self._session.execute(query)
+        res = await self._session.execute(query)
+        return res.one_or_none()
+
+    async def create_many(
+        self,
+        *,
+        models_data: Sequence[Dict[str, Any]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[Any]:
+        """Create objects with one multi-row insert per chunk and return their rows."""
+        query = insert(self._cls_model).returning(*self._columns())
+        rows = []
+
+        for chunk in chunked(models_data, chunk_size):
+            res = await self._session.execute(query.values(chunk))
+            rows.extend(res.all())
+
+        return rows
+
+    async def update_many(
+        self,
+        *,
+        pkey_vals: Sequence[Any],
+        model_data: Dict[str, Any],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """Update objects by primary keys and return number of updated rows."""
+        query = (
+            update(self._cls_model)
+            .where(self._pkey_in_array())
+            .values(**model_data)
+            .execution_options(synchronize_session=False)
+        )
+
+        return await self._execute_chunked(query, pkey_vals, chunk_size)
+
+    async def delete_many(
+        self,
+        *,
+        pkey_vals: Sequence[Any],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """Delete objects by primary keys and return number of deleted rows."""
+        query = (
+            delete(self._cls_model)
+            .where(self._pkey_in_array())
+            .execution_options(synchronize_session=False)
+        )
+
+        return await self._execute_chunked(query, pkey_vals, chunk_size)
 
     async def get(self, *, pkey_val: Any) -> Any:
         """Get object by primary key."""
@@ -96,3 +175,36 @@ class CRUD:
 
         rows = await self._session.execute(query)
         return rows.scalars().all()
+
+    async def count_by_field(self, *, field: str, field_value: Any) -> int:
+        """Return number of objects in db with condition field=val."""
+        query = (
+            select(func.count())
+            .select_from(self._cls_model)
+            .where(getattr(self._cls_model, field) == field_value)
+        )
+
+        rows = await self._session.execute(query)
+        return rows.scalar_one()
+
+    def _columns(self) -> List[Column]:
+        return table_columns(self._cls_model)
+
+    def _pkey_in_array(self) -> Any:
+        # `pkey = ANY(:pkey_vals)` keeps the same statement text for any chunk size,
+        # so it is prepared once instead of once per number of `IN` parameters
+        primary_key = inspect(self._cls_model).primary_key[0]
+        pkey_vals = bindparam("pkey_vals", type_=postgresql.ARRAY(primary_key.type))
+
+        return primary_key == any_(pkey_vals)
+
+    async def _execute_chunked(
+        self, query: Any, pkey_vals: Sequence[Any], chunk_size: int
+    ) -> int:
+        affected_rows = 0
+
+        for chunk in chunked(pkey_vals, chunk_size):
+            res = await self._session.execute(query, {"pkey_vals": list(chunk)})
+            affected_rows += res.rowcount
+
+        return affected_rows
@@ -0,0 +1,25 @@
+"""File blob database model declaration."""
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, func
+from sqlalchemy.dialects import postgresql
+
+from app.db.sqlalchemy import Base
+
+
+class FileBlobModel(Base):
+    __tablename__ = "file_blobs"
+
+    # Same as `file_storage_id` of attachments referencing the file
+    id: UUID = Column(postgresql.UUID(as_uuid=True), primary_key=True)
+    sha256: Optional[str] = Column(String, nullable=True)
+    size: Optional[int] = Column(BigInteger, nullable=True)
+    refcount: int = Column(Integer, nullable=False)
+    # Uploads waiting for task approval, their FSM states can expire unnoticed
+    pending_uploads: int = Column(Integer, nullable=False, server_default="0")
+    referenced_at: datetime = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -0,0 +1,173 @@
+"""File blob repo."""
+
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import Column, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import ColumnElement
+
+from app.db.file_blob.models import FileBlobModel
+from app.db.sqlalchemy import AsyncSession
+from app.services.file_storage import SavedFile
+
+
+class FileBlobRepo:
+    def __init__(self, session: AsyncSession):
+        """Create repo of reference counters of stored files.
+
+        Every attachment holds one reference, so the same content can be shared
+        by many attachments. Uploads waiting for task approval are counted
+        separately, because their FSM states can expire without cancellation.
+        """
+
+        self._session = session
+
+    async def register(self, saved_file: SavedFile) -> None:
+        """Count upload of file, which is waiting for task approval.
+
+        Should be committed before file is written to storage, so the cleaner
+        skips file which is uploaded again while it's being removed.
+        """
+
+        blobs_table = FileBlobModel.__table__
+        query = insert(FileBlobModel).values(
+            id=saved_file.uuid,
+            sha256=saved_file.sha256,
+            size=saved_file.size,
+            refcount=0,
+            pending_uploads=1,
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[blobs_table.c.id],
+            set_={
+                "pending_uploads": blobs_table.c.pending_uploads + 1,
+                "referenced_at": func.now(),
+            },
+        )
+
+        await self._session.execute(query)
+
+    async def acquire(self, file_storage_id: UUID) -> int:
+        """Attach uploaded file to task and return number of its references."""
+
+        blobs_table = FileBlobModel.__table__
+        # Files uploaded before references were counted have no rows
+        query = insert(FileBlobModel).values(
+            id=file_storage_id, refcount=1, pending_uploads=0
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[blobs_table.c.id],
+            set_={
+                "refcount": blobs_table.c.refcount + 1,
+                "pending_uploads": _decrement(blobs_table.c.pending_uploads),
+                "referenced_at": func.now(),
+            },
+        ).returning(blobs_table.c.refcount)
+
+        res = await self._session.execute(query)
+        return res.scalar_one()
+
+    async def release(self, file_storage_id: UUID) -> bool:
+        """Remove reference of deleted attachment to file.
+
+        Returns `True` if file is no longer referenced and should be removed by
+        caller after commit.
+        """
+
+        blobs_table = FileBlobModel.__table__
+        return await self._update_counters(
+            file_storage_id, refcount=_decrement(blobs_table.c.refcount)
+        )
+
+    async def release_pending(self, file_storage_id: UUID) -> bool:
+        """Remove upload of file, which won't be attached to task.
+
+        Returns `True` if file is no longer referenced and should be removed by
+        caller after commit.
+        """
+
+        blobs_table = FileBlobModel.__table__
+        return await self._update_counters(
+            file_storage_id,
+            pending_uploads=_decrement(blobs_table.c.pending_uploads),
+        )
+
+    async def lock_unreferenced(self, file_storage_ids: List[UUID]) -> List[UUID]:
+        """Lock rows of files without references until commit and return their ids.
+
+        Rows locked by uploads of the same files are skipped.
+        """
+
+        blobs_table = FileBlobModel.__table__
+        query = (
+            select(blobs_table.c.id)
+            .where(
+                blobs_table.c.id.in_(file_storage_ids),
+                blobs_table.c.refcount == 0,
+                blobs_table.c.pending_uploads == 0,
+            )
+            .with_for_update(skip_locked=True)
+        )
+
+        res = await self._session.execute(query)
+        return list(res.scalars())
+
+    async def lock_abandoned(
+        self, referenced_before: datetime, limit: int
+    ) -> List[UUID]:
+        """Lock rows of files, which aren't attached since `referenced_before`.
+
+        Uploads counted before that time are abandoned, even if they weren't
+        cancelled. Rows locked by uploads of the same files are skipped.
+        """
+
+        blobs_table = FileBlobModel.__table__
+        query = (
+            select(blobs_table.c.id)
+            .where(
+                blobs_table.c.refcount == 0,
+                blobs_table.c.referenced_at < referenced_before,
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        res = await self._session.execute(query)
+        return list(res.scalars())
+
+    async def delete(self, file_storage_ids: List[UUID]) -> None:
+        """Delete rows of removed files, which are locked by this transaction."""
+
+        blobs_table = FileBlobModel.__table__
+        await self._session.execute(
+            delete(FileBlobModel)
+            .where(blobs_table.c.id.in_(file_storage_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _update_counters(
+        self, file_storage_id: UUID, **counters: ColumnElement
+    ) -> bool:
+        blobs_table = FileBlobModel.__table__
+        query = (
+            update(FileBlobModel)
+            .where(blobs_table.c.id == file_storage_id)
+            .values(**counters)
+            .returning(blobs_table.c.refcount, blobs_table.c.pending_uploads)
+            .execution_options(synchronize_session=False)
+        )
+
+        res = await self._session.execute(query)
+        counters_row = res.one_or_none()
+
+        # Files uploaded before references were counted are kept
+        if counters_row is None:
+            return False
+
+        return counters_row.refcount == 0 and counters_row.pending_uploads == 0
+
+
+def _decrement(counter: Column) -> ColumnElement:
+    return func.greatest(counter - 1, 0)
@@ -0,0 +1,46 @@
+"""Add tasks and attachments indexes
+
+Revision ID: 5c2b8e41d7f3
+Revises: 3a61a93377ea
+Create Date: 2026-10-18 12:03:41.518204
+
+Doc: https://alembic.sqlalchemy.org/en/latest/tutorial.html#create-a-migration-script
+"""
+from alembic import op
+
+revision = "5c2b8e41d7f3"
+down_revision = "3a61a93377ea"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY can't be used inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_user_huid_id",
+            "tasks",
+            ["user_huid", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_attachments_task_id",
+            "attachments",
+            ["task_id"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_attachments_task_id",
+            table_name="attachments",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_tasks_user_huid_id",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
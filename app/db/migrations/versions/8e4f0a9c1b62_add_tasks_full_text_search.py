@@ -0,0 +1,58 @@
+"""Add tasks full text search
+
+Revision ID: 8e4f0a9c1b62
+Revises: 5c2b8e41d7f3
+Create Date: 2026-10-18 14:21:07.930415
+
+Doc: https://alembic.sqlalchemy.org/en/latest/tutorial.html#create-a-migration-script
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "8e4f0a9c1b62"
+down_revision = "5c2b8e41d7f3"
+branch_labels = None
+depends_on = None
+
+# Copy of `app.db.task.models.SEARCH_VECTOR_EXPRESSION` at the moment of migration
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(description, '')), 'B') || "
+    "to_tsvector("
+    "'simple'::regconfig, coalesce(title, '') || ' ' || coalesce(description, '')"
+    ")"
+)
+
+
+def upgrade():
+    op.add_column(
+        "tasks",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True,
+        ),
+    )
+
+    # CONCURRENTLY can't be used inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_search_vector",
+            "tasks",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tasks_search_vector",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
+
+    op.drop_column("tasks", "search_vector")
@@ -0,0 +1,46 @@
+"""Add file blobs table
+
+Revision ID: d71c5a3e9f04
+Revises: 8e4f0a9c1b62
+Create Date: 2026-10-18 16:42:19.305871
+
+Doc: https://alembic.sqlalchemy.org/en/latest/tutorial.html#create-a-migration-script
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "d71c5a3e9f04"
+down_revision = "8e4f0a9c1b62"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "file_blobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("sha256", sa.String(), nullable=True),
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column("refcount", sa.Integer(), nullable=False),
+        sa.Column("pending_uploads", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "referenced_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    # Files of existing attachments are counted, their hashes are unknown
+    op.execute(
+        "INSERT INTO file_blobs (id, refcount) "
+        "SELECT file_storage_id, count(*) FROM attachments "
+        "WHERE file_storage_id IS NOT NULL "
+        "GROUP BY file_storage_id"
+    )
+
+
+def downgrade():
+    op.drop_table("file_blobs")
@@ -0,0 +1,86 @@
+"""SQL queries instrumentation."""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.logger import logger
+from app.settings import settings
+
+# Key in `Connection.info`, which is kept while DBAPI connection is in the pool
+QUERY_START_TIME_KEY = "query_start_time"
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time: float = 0
+        self.slowest_time: float = 0
+        self.slowest_statement: Optional[str] = None
+        self.statements: Counter = Counter()
+
+    def add(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.statements[statement] += 1
+
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def collect_query_stats() -> Iterator[QueryStats]:
+    """Collect stats of all queries executed in current context."""
+
+    query_stats = QueryStats()
+    token = _query_stats.set(query_stats)
+
+    try:
+        yield query_stats
+    finally:
+        _query_stats.reset(token)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(
+    conn: Connection, cursor: Any, statement: str, *args: Any
+) -> None:
+    conn.info.setdefault(QUERY_START_TIME_KEY, []).append(perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection, cursor: Any, statement: str, *args: Any
+) -> None:
+    elapsed = perf_counter() - conn.info[QUERY_START_TIME_KEY].pop()
+
+    if elapsed > settings.SQL_SLOW_QUERY_THRESHOLD:
+        logger.warning(f"Slow SQL query ({elapsed:.3f}s): {statement}")
+
+    query_stats = _query_stats.get()
+    if query_stats is not None:
+        query_stats.add(statement, elapsed)
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # Failed query has no `after_cursor_execute`, so its start time is dropped here
+    if context.connection is None or context.cursor is None:
+        return
+
+    query_start_times = context.connection.info.get(QUERY_START_TIME_KEY)
+    if query_start_times:
+        query_start_times.pop()
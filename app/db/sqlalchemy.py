@@ -1,14 +1,23 @@
 """SQLAlchemy helpers."""
 
+import asyncio
+from time import monotonic
 from typing import Callable
 
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import Session, SessionTransaction, declarative_base, sessionmaker
 
+from app.db.query_stats import instrument_engine
 from app.settings import settings
 
 AsyncSessionFactory = Callable[..., AsyncSession]
 
+# Keys in `session.info`
+CONNECTION_CHECKOUT_AT_KEY = "connection_checkout_at"
+CONNECTION_HOLD_TIME_KEY = "connection_hold_time"
+
 
 def make_url_async(url: str) -> str:
     """Add +asyncpg to url scheme."""
@@ -23,17 +32,65 @@ def make_url_sync(url: str) -> str:
 Base = declarative_base()
 
 
-async def build_db_session_factory() -> AsyncSessionFactory:
+def build_db_engine(dsn: str) -> AsyncEngine:
+    url = make_url(make_url_async(dsn)).update_query_dict(
+        # SQLAlchemy own cache of asyncpg prepared statements
+        {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)}
+    )
+
     engine = create_async_engine(
-        make_url_async(settings.POSTGRES_DSN),
+        url,
         echo=settings.SQL_DEBUG,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
     )
+    instrument_engine(engine)
+
+    return engine
+
+
+@event.listens_for(Session, "after_begin")
+def mark_connection_checkout(
+    session: Session, transaction: SessionTransaction, connection: Connection
+) -> None:
+    # Session acquires connection lazily, on first query in transaction
+    session.info.setdefault(CONNECTION_CHECKOUT_AT_KEY, monotonic())
+
 
-    await verify_db_connection(engine)
+@event.listens_for(Session, "after_transaction_end")
+def count_connection_hold_time(
+    session: Session, transaction: SessionTransaction
+) -> None:
+    # Connection is released when root transaction ends (commit, rollback or close)
+    if transaction.parent is not None:
+        return
 
+    checkout_at = session.info.pop(CONNECTION_CHECKOUT_AT_KEY, None)
+    if checkout_at is None:
+        return
+
+    hold_time = session.info.get(CONNECTION_HOLD_TIME_KEY, 0)
+    session.info[CONNECTION_HOLD_TIME_KEY] = hold_time + monotonic() - checkout_at
+
+
+def build_db_session_factory(engine: AsyncEngine) -> AsyncSessionFactory:
     return sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
 
 
-async def verify_db_connection(engine: AsyncEngine) -> None:
-    connection = await engine.connect()
-    await connection.close()
+async def warm_up_db_pool(engine: AsyncEngine, connections_num: int) -> None:
+    """Open connections to put them into the pool and verify database is available.
+
+    At least one connection is opened, but no more than the pool can keep.
+    """
+    connections_num = max(1, min(connections_num, settings.DB_POOL_SIZE))
+
+    connections = await asyncio.gather(
+        *(engine.connect() for _ in range(connections_num))  # noqa: WPS335
+    )
+
+    for connection in connections:
+        await connection.close()
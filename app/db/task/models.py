@@ -3,15 +3,28 @@
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Computed, Index, Integer, String
 from sqlalchemy.dialects import postgresql
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from app.db.sqlalchemy import Base
 
+# Russian stems rank higher, simple config keeps words as is for names and codes
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(description, '')), 'B') || "
+    "to_tsvector("
+    "'simple'::regconfig, coalesce(title, '') || ' ' || coalesce(description, '')"
+    ")"
+)
+
 
 class TaskModel(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_user_huid_id", "user_huid", "id"),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
     user_huid: UUID = Column(postgresql.UUID(as_uuid=True))
@@ -20,6 +33,9 @@ class TaskModel(Base):
     mentioned_colleague_id: Optional[UUID] = Column(
         postgresql.UUID(as_uuid=True), nullable=True
     )
+    search_vector: str = deferred(
+        Column(postgresql.TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True))
+    )
 
     attachment = relationship(
         "AttachmentModel",
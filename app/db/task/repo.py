@@ -1,68 +1,323 @@
 """Task repo."""
 
-from typing import List
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
 
-from app.db.crud import CRUD
+from sqlalchemy import delete, func, insert, literal, literal_column, select
+from sqlalchemy.sql import Select
+
+from app.caching.tasks_cache import TasksCache
+from app.db.attachment.models import AttachmentModel
+from app.db.crud import CRUD, table_columns
 from app.db.sqlalchemy import AsyncSession
 from app.db.task.models import TaskModel
-from app.schemas.attachments import Attachment
-from app.schemas.tasks import Task, TaskInCreation
+from app.schemas.attachments import Attachment, AttachmentInCreation
+from app.schemas.tasks import Task, TaskInCreation, TasksPage
+
+# Same configs are used in `tasks.search_vector` generated column
+RUSSIAN_TS_CONFIG = literal_column("'russian'::regconfig")
+SIMPLE_TS_CONFIG = literal_column("'simple'::regconfig")
 
 
 class TaskRepo:
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        read_session: Optional[AsyncSession] = None,
+        tasks_cache: Optional[TasksCache] = None,
+    ):
+        """Create task repo.
+
+        Read-only queries go to `read_session` (e.g. replica) if it is passed.
+        Task list pages and counters are cached in `tasks_cache` if it is passed,
+        callers should invalidate it after committing changes of user tasks.
+        """
+
+        self._session = session
+        self._tasks_cache = tasks_cache
+        self._read_session = read_session or session
         self._crud = CRUD(session=session, cls_model=TaskModel)
+        self._read_crud = CRUD(session=self._read_session, cls_model=TaskModel)
 
-    async def create_task(self, task_in_creation: TaskInCreation) -> Task:
-        model_data = {
-            "user_huid": task_in_creation.user_huid,
-            "title": task_in_creation.title,
-            "description": task_in_creation.description,
-            "mentioned_colleague_id": task_in_creation.mentioned_colleague_id,
-        }
-        row = await self._crud.create(model_data=model_data)
+    async def create_task(
+        self,
+        task_in_creation: TaskInCreation,
+        attachment_in_creation: Optional[AttachmentInCreation] = None,
+    ) -> Task:
+        model_data = self._to_model_data(task_in_creation)
 
-        task_in_db = await self._crud.get(pkey_val=row.id)
+        if attachment_in_creation is None or not attachment_in_creation.file_storage_id:
+            row = await self._crud.create(model_data=model_data)
+            return self._row_to_domain(row, attachment=None)
 
-        return self._to_domain(task_in_db)
+        return await self._create_task_with_attachment(
+            model_data, attachment_in_creation
+        )
+
+    async def create_tasks(
+        self, tasks_in_creation: Sequence[TaskInCreation]
+    ) -> List[Task]:
+        rows = await self._crud.create_many(
+            models_data=[
+                self._to_model_data(task_in_creation)
+                for task_in_creation in tasks_in_creation
+            ]
+        )
+
+        return [self._row_to_domain(row, attachment=None) for row in rows]
 
     async def get_user_tasks(self, user_huid: UUID) -> List[Task]:
-        tasks_in_db = await self._crud.get_by_field_id_asc(
-            field="user_huid", field_value=user_huid
+        tasks_table = TaskModel.__table__
+        query = (
+            self._select_tasks()
+            .where(tasks_table.c.user_huid == user_huid)
+            .order_by(tasks_table.c.id)
+        )
+
+        return await self._fetch_tasks(query)
+
+    async def get_user_tasks_page(
+        self,
+        user_huid: UUID,
+        limit: int,
+        cursor: Optional[int] = None,
+        backward: bool = False,
+    ) -> TasksPage:
+        fetch_page = partial(
+            self._fetch_user_tasks_page, user_huid, limit, cursor, backward
+        )
+        if self._tasks_cache is None:
+            return await fetch_page()
+
+        return await self._tasks_cache.get_or_fetch(
+            user_huid, ("page", limit, cursor, backward), fetch_page
         )
 
-        return [self._to_domain(task) for task in tasks_in_db]
+    async def search_tasks(
+        self, user_huid: UUID, query: str, limit: int, offset: int = 0
+    ) -> TasksPage:
+        """Find user tasks by words in title and description, best matches first."""
+
+        search_query = self._search_tasks_query(user_huid, query)
+        # One extra row is fetched to find out if there are more tasks after the page
+        search_query = search_query.limit(limit + 1).offset(offset)
+        tasks = await self._fetch_tasks(search_query)
+
+        return TasksPage(tasks=tasks[:limit], has_more=len(tasks) > limit)
+
+    async def count_user_tasks(self, user_huid: UUID) -> int:
+        count_tasks = partial(
+            self._read_crud.count_by_field, field="user_huid", field_value=user_huid
+        )
+        if self._tasks_cache is None:
+            return await count_tasks()
+
+        return await self._tasks_cache.get_or_fetch(user_huid, ("count",), count_tasks)
 
     async def get_task(self, task_id: int) -> Task:
-        task_in_db = await self._crud.get(pkey_val=task_id)
-        return self._to_domain(task_in_db)
+        query = self._select_tasks().where(TaskModel.__table__.c.id == task_id)
+
+        res = await self._read_session.execute(query)
+        return self._joined_row_to_domain(res.one())
+
+    async def delete_task(self, task_id: int) -> Optional[Task]:
+        """Delete task and return it or `None` if task doesn't exist.
+
+        Attachment row is removed by cascade, its file should be removed by caller.
+        """
+
+        # WITH task AS (DELETE ... RETURNING ...)
+        # SELECT ... FROM task LEFT JOIN attachments ...
+        # Outer select still sees attachment, because cascade runs after statement
+        attachments_table = AttachmentModel.__table__
+        task_cte = (
+            delete(TaskModel)
+            .where(TaskModel.id == task_id)
+            .returning(*table_columns(TaskModel))
+            .cte("deleted_task")
+        )
+        query = select(
+            task_cte,
+            attachments_table.c.id.label("attachment_id"),
+            attachments_table.c.file_storage_id,
+            attachments_table.c.filename,
+        ).select_from(
+            task_cte.outerjoin(
+                attachments_table, attachments_table.c.task_id == task_cte.c.id
+            )
+        )
+
+        res = await self._session.execute(query)
+        row = res.one_or_none()
+
+        return self._joined_row_to_domain(row) if row else None
 
-    async def delete_task(self, task_id: int) -> None:
-        await self._crud.delete(pkey_val=task_id)
+    async def delete_tasks(self, task_ids: Sequence[int]) -> int:
+        return await self._crud.delete_many(pkey_vals=task_ids)
 
-    async def change_task_description(self, task_id: int, description: str) -> None:
-        await self._crud.update(
+    async def change_task_description(self, task_id: int, description: str) -> bool:
+        row = await self._crud.update(
             pkey_val=task_id, model_data={"description": description}
         )
+        return row is not None
 
-    def _to_domain(self, task_in_db: TaskModel) -> Task:
+    async def _create_task_with_attachment(
+        self,
+        model_data: Dict[str, Any],
+        attachment_in_creation: AttachmentInCreation,
+    ) -> Task:
+        # Task and attachment are inserted with one statement:
+        # WITH task AS (INSERT ... RETURNING ...),
+        #      attachment AS (INSERT ... SELECT ..., task.id FROM task RETURNING ...)
+        # SELECT ... FROM task JOIN attachment ...
+        attachments_table = AttachmentModel.__table__
+        task_cte = (
+            insert(TaskModel)
+            .values(**model_data)
+            .returning(*table_columns(TaskModel))
+            .cte("new_task")
+        )
+        attachment_cte = (
+            insert(AttachmentModel)
+            .from_select(
+                ["file_storage_id", "filename", "task_id"],
+                select(
+                    literal(
+                        attachment_in_creation.file_storage_id,
+                        attachments_table.c.file_storage_id.type,
+                    ),
+                    literal(
+                        attachment_in_creation.filename,
+                        attachments_table.c.filename.type,
+                    ),
+                    task_cte.c.id,
+                ),
+            )
+            .returning(*attachments_table.columns)
+            .cte("new_attachment")
+        )
+        query = select(
+            task_cte,
+            attachment_cte.c.id.label("attachment_id"),
+            attachment_cte.c.file_storage_id,
+            attachment_cte.c.filename,
+        ).select_from(
+            task_cte.join(attachment_cte, attachment_cte.c.task_id == task_cte.c.id)
+        )
 
-        if task_in_db.attachment:
-            attachment = Attachment(
-                id=task_in_db.attachment.id,
-                file_storage_id=task_in_db.attachment.file_storage_id,
-                filename=task_in_db.attachment.filename,
-                task_id=task_in_db.id,
+        res = await self._session.execute(query)
+        return self._joined_row_to_domain(res.one())
+
+    async def _fetch_user_tasks_page(
+        self,
+        user_huid: UUID,
+        limit: int,
+        cursor: Optional[int],
+        backward: bool,
+    ) -> TasksPage:
+        query = self._user_tasks_page_query(user_huid, limit, cursor, backward)
+        tasks = await self._fetch_tasks(query)
+
+        has_more = len(tasks) > limit
+        tasks = tasks[:limit]
+        if backward:
+            tasks.reverse()
+
+        return TasksPage(tasks=tasks, has_more=has_more)
+
+    def _user_tasks_page_query(
+        self,
+        user_huid: UUID,
+        limit: int,
+        cursor: Optional[int],
+        backward: bool,
+    ) -> Select:
+        tasks_table = TaskModel.__table__
+        query = self._select_tasks().where(tasks_table.c.user_huid == user_huid)
+
+        if cursor is not None:
+            query = query.where(
+                tasks_table.c.id < cursor if backward else tasks_table.c.id > cursor
             )
-        else:
-            attachment = None
 
+        order_by = tasks_table.c.id.desc() if backward else tasks_table.c.id
+        # One extra row is fetched to find out if there are more tasks after the page
+        return query.order_by(order_by).limit(limit + 1)
+
+    def _search_tasks_query(self, user_huid: UUID, query: str) -> Select:
+        tasks_table = TaskModel.__table__
+        ts_query = func.tsquery_or(
+            func.websearch_to_tsquery(RUSSIAN_TS_CONFIG, query),
+            func.websearch_to_tsquery(SIMPLE_TS_CONFIG, query),
+        )
+        rank = func.ts_rank_cd(tasks_table.c.search_vector, ts_query)
+
+        return (
+            self._select_tasks()
+            .where(
+                tasks_table.c.user_huid == user_huid,
+                tasks_table.c.search_vector.op("@@")(ts_query),
+            )
+            .order_by(rank.desc(), tasks_table.c.id.desc())
+        )
+
+    def _select_tasks(self) -> Select:
+        """Select tasks with attachments using Core, without ORM entities overhead.
+
+        Rows should be mapped with `_joined_row_to_domain`.
+        """
+
+        tasks_table = TaskModel.__table__
+        attachments_table = AttachmentModel.__table__
+
+        return select(
+            *table_columns(TaskModel),
+            attachments_table.c.id.label("attachment_id"),
+            attachments_table.c.file_storage_id,
+            attachments_table.c.filename,
+        ).select_from(
+            tasks_table.outerjoin(
+                attachments_table, attachments_table.c.task_id == tasks_table.c.id
+            )
+        )
+
+    async def _fetch_tasks(self, query: Select) -> List[Task]:
+        res = await self._read_session.execute(query)
+        return [self._joined_row_to_domain(row) for row in res]
+
+    def _to_model_data(self, task_in_creation: TaskInCreation) -> Dict[str, Any]:
+        return {
+            "user_huid": task_in_creation.user_huid,
+            "title": task_in_creation.title,
+            "description": task_in_creation.description,
+            "mentioned_colleague_id": task_in_creation.mentioned_colleague_id,
+        }
+
+    def _row_to_domain(self, task_row: Any, attachment: Optional[Attachment]) -> Task:
         return Task(
-            id=task_in_db.id,
-            user_huid=task_in_db.user_huid,
-            title=task_in_db.title,
-            description=task_in_db.description,
-            mentioned_colleague_id=task_in_db.mentioned_colleague_id,
+            id=task_row.id,
+            user_huid=task_row.user_huid,
+            title=task_row.title,
+            description=task_row.description,
+            mentioned_colleague_id=task_row.mentioned_colleague_id,
             attachment=attachment,
         )
+
+    def _joined_row_to_domain(self, task_row: Any) -> Task:
+        """Map row with task columns and joined attachment columns.
+
+        Attachment columns are `attachment_id`, `file_storage_id` and `filename`.
+        """
+
+        if task_row.attachment_id is not None:
+            attachment = Attachment(
+                id=task_row.attachment_id,
+                file_storage_id=task_row.file_storage_id,
+                filename=task_row.filename,
+                task_id=task_row.id,
+            )
+        else:
+            attachment = None
+
+        return self._row_to_domain(task_row, attachment=attachment)
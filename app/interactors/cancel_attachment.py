@@ -0,0 +1,29 @@
+"""Interactor for cancellation of attachment upload."""
+
+from app.db.file_blob.repo import FileBlobRepo
+from app.db.sqlalchemy import AsyncSession
+from app.schemas.attachments import AttachmentInCreation
+from app.services.file_storage_cleaner import FileStorageCleaner
+
+
+class CancelAttachmentInteractor:
+    def __init__(
+        self, db_session: AsyncSession, file_storage_cleaner: FileStorageCleaner
+    ) -> None:
+        self._db_session = db_session
+        self._file_storage_cleaner = file_storage_cleaner
+
+    async def execute(self, attachment: AttachmentInCreation) -> None:
+        if not attachment.file_storage_id:
+            return
+
+        file_blob_repo = FileBlobRepo(self._db_session)
+
+        is_file_unreferenced = await file_blob_repo.release_pending(
+            attachment.file_storage_id
+        )
+        await self._db_session.commit()
+
+        # File is removed only after commit, so a failed commit keeps it in place
+        if is_file_unreferenced:
+            self._file_storage_cleaner.schedule_removal(attachment.file_storage_id)
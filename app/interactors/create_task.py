@@ -1,6 +1,7 @@
 """Interactor for task creation."""
 
-from app.db.attachment.repo import AttachmentRepo
+from app.caching.tasks_cache import TasksCache
+from app.db.file_blob.repo import FileBlobRepo
 from app.db.sqlalchemy import AsyncSession
 from app.db.task.repo import TaskRepo
 from app.schemas.attachments import AttachmentInCreation
@@ -8,23 +9,25 @@ from app.schemas.tasks import Task, TaskInCreation
 
 
 class CreateTaskInteractor:
-    def __init__(self, db_session: AsyncSession) -> None:
+    def __init__(self, db_session: AsyncSession, tasks_cache: TasksCache) -> None:
         self._db_session = db_session
+        self._tasks_cache = tasks_cache
 
     async def execute(
         self,
         task_in_creation: TaskInCreation,
         attachment_in_creation: AttachmentInCreation,
     ) -> Task:
-        attachment_repo = AttachmentRepo(self._db_session)
         task_repo = TaskRepo(self._db_session)
 
-        task = await task_repo.create_task(task_in_creation)
-        attachment_in_creation.task_id = task.id
+        file_blob_repo = FileBlobRepo(self._db_session)
+
+        task = await task_repo.create_task(task_in_creation, attachment_in_creation)
 
         if attachment_in_creation.file_storage_id:
-            await attachment_repo.create_attachment(attachment_in_creation)
+            await file_blob_repo.acquire(attachment_in_creation.file_storage_id)
 
         await self._db_session.commit()
+        await self._tasks_cache.invalidate(task.user_huid)
 
         return task
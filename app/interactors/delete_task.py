@@ -1,22 +1,43 @@
 """Interactor for task deletion."""
 
+from app.caching.tasks_cache import TasksCache
+from app.db.file_blob.repo import FileBlobRepo
 from app.db.sqlalchemy import AsyncSession
 from app.db.task.repo import TaskRepo
-from app.services.file_storage import FileStorage
+from app.services.file_storage_cleaner import FileStorageCleaner
 
 
 class DeleteTaskInteractor:
-    def __init__(self, db_session: AsyncSession, file_storage: FileStorage) -> None:
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        file_storage_cleaner: FileStorageCleaner,
+        tasks_cache: TasksCache,
+    ) -> None:
         self._db_session = db_session
-        self._file_storage = file_storage
+        self._file_storage_cleaner = file_storage_cleaner
+        self._tasks_cache = tasks_cache
 
     async def execute(self, task_id: int) -> None:
         task_repo = TaskRepo(self._db_session)
 
-        task = await task_repo.get_task(task_id)
-        await task_repo.delete_task(task_id)
+        file_blob_repo = FileBlobRepo(self._db_session)
 
-        if task.attachment:
-            await self._file_storage.remove(task.attachment.file_storage_id)
+        task = await task_repo.delete_task(task_id)
+
+        is_file_unreferenced = False
+        if task and task.attachment:
+            is_file_unreferenced = await file_blob_repo.release(
+                task.attachment.file_storage_id
+            )
 
         await self._db_session.commit()
+
+        if not task:
+            return
+
+        await self._tasks_cache.invalidate(task.user_huid)
+
+        # File is removed only after commit, so a failed commit keeps it in place
+        if task.attachment and is_file_unreferenced:
+            self._file_storage_cleaner.schedule_removal(task.attachment.file_storage_id)
@@ -1,28 +1,146 @@
 """Application with configuration for events, routers and middleware."""
 
 from functools import partial
+from pathlib import Path
 
+import httpx
 from fastapi import FastAPI
-from pybotx import Bot
+from pybotx import Bot, UserFromSearch, UserKinds
+from pybotx_fsm.fsm import FSMStateData
 
 from app.api.routers import router
+from app.bot import constants
 from app.bot.bot import get_bot
+from app.bot.commands.tasks.create_task import CreateTaskStates
+from app.bot.commands.tasks.get_tasks import ChangeTaskDecriptionState
+from app.caching.codecs import Codec, PickleCodec, TaggedJSONCodec
+from app.caching.fsm_states import FSMStateRepo
+from app.caching.local_cache import LocalCache
 from app.caching.redis_repo import RedisRepo
-from app.db.sqlalchemy import build_db_session_factory
+from app.caching.tasks_cache import TasksCache
+from app.caching.user_search_cache import UserSearchCache
+from app.db.sqlalchemy import build_db_engine, build_db_session_factory, warm_up_db_pool
 from app.resources import strings
+from app.schemas.attachments import Attachment, AttachmentInCreation
+from app.schemas.tasks import Task, TaskInCreation, TasksPage
+from app.services.attachment_transfers import AttachmentTransferLimiter
+from app.services.file_storage import FileStorage, FileStorageBackend
+from app.services.file_storage_cleaner import FileStorageCleaner
+from app.services.s3_file_storage import S3FileStorage
+from app.services.s3_signing import S3Credentials
 from app.settings import settings
 
 
+def build_redis_codec() -> Codec:
+    if settings.REDIS_CODEC == "json":
+        return TaggedJSONCodec(
+            types=[
+                # FSM states
+                FSMStateData,
+                TaskInCreation,
+                AttachmentInCreation,
+                CreateTaskStates,
+                ChangeTaskDecriptionState,
+                # Tasks cache pages
+                TasksPage,
+                Task,
+                Attachment,
+                # User search cache results
+                UserFromSearch,
+                UserKinds,
+            ],
+            pickle_fallback=settings.REDIS_PICKLE_FALLBACK,
+        )
+
+    return PickleCodec()
+
+
+def build_file_storage() -> FileStorageBackend:
+    if settings.FILE_STORAGE_BACKEND == "s3":
+        return S3FileStorage(
+            httpx.AsyncClient(timeout=settings.S3_TIMEOUT),
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            bucket=settings.S3_BUCKET,
+            credentials=S3Credentials(
+                access_key_id=settings.S3_ACCESS_KEY_ID,
+                secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+                region=settings.S3_REGION,
+            ),
+            part_size=settings.S3_MULTIPART_PART_SIZE,
+        )
+
+    return FileStorage(Path(constants.FILE_STORAGE_PATH))
+
+
 async def startup(bot: Bot) -> None:
     # -- Bot --
     await bot.startup()
 
     # -- Database --
-    bot.state.db_session_factory = await build_db_session_factory()
+    bot.state.db_engine = build_db_engine(settings.POSTGRES_DSN)
+    await warm_up_db_pool(bot.state.db_engine, settings.DB_POOL_WARM_UP_SIZE)
+    bot.state.db_session_factory = build_db_session_factory(bot.state.db_engine)
+
+    bot.state.db_replica_engine = None
+    bot.state.db_replica_session_factory = None
+    if settings.POSTGRES_REPLICA_DSN:
+        bot.state.db_replica_engine = build_db_engine(settings.POSTGRES_REPLICA_DSN)
+        await warm_up_db_pool(
+            bot.state.db_replica_engine, settings.DB_POOL_WARM_UP_SIZE
+        )
+        bot.state.db_replica_session_factory = build_db_session_factory(
+            bot.state.db_replica_engine
+        )
+
+    # -- File storage --
+    bot.state.file_storage = build_file_storage()
+    bot.state.file_storage_cleaner = FileStorageCleaner(
+        bot.state.file_storage,
+        bot.state.db_session_factory,
+        # Uploads are kept while creation of task with them can be approved
+        abandoned_ttl=settings.FSM_STATE_TTLS.get(
+            CreateTaskStates.__name__, settings.FSM_STATE_TTL
+        ),
+        sweep_interval=settings.FILE_STORAGE_SWEEP_INTERVAL,
+    )
+    bot.state.file_storage_cleaner.start()
+    bot.state.attachment_transfer_limiter = AttachmentTransferLimiter(
+        memory_budget=settings.ATTACHMENT_TRANSFERS_MEMORY_BUDGET,
+        max_concurrency=settings.ATTACHMENT_TRANSFERS_MAX_CONCURRENCY,
+    )
 
     # -- Redis --
+    local_cache = None
+    if settings.REDIS_LOCAL_CACHE_SIZE:
+        local_cache = LocalCache(
+            max_size=settings.REDIS_LOCAL_CACHE_SIZE, ttl=settings.REDIS_LOCAL_CACHE_TTL
+        )
+
     bot.state.redis_repo = await RedisRepo.init(
-        dsn=settings.REDIS_DSN, prefix=strings.BOT_PROJECT_NAME
+        dsn=settings.REDIS_DSN,
+        prefix=strings.BOT_PROJECT_NAME,
+        local_cache=local_cache,
+        codec=build_redis_codec(),
+        read_legacy_keys=settings.REDIS_READ_LEGACY_KEYS,
+    )
+    bot.state.tasks_cache = TasksCache(
+        bot.state.redis_repo,
+        expire=settings.TASKS_CACHE_TTL,
+        recent_write_expire=settings.DB_READ_YOUR_WRITES_TTL,
+    )
+    bot.state.user_search_cache = UserSearchCache(
+        bot.state.redis_repo,
+        expire=settings.USER_SEARCH_CACHE_TTL,
+        negative_expire=settings.USER_SEARCH_NEGATIVE_CACHE_TTL,
+    )
+    bot.state.fsm_state_repo = FSMStateRepo(
+        bot.state.redis_repo,
+        default_ttl=settings.FSM_STATE_TTL,
+        state_ttls={
+            states: settings.FSM_STATE_TTLS[states.__name__]
+            for states in (CreateTaskStates, ChangeTaskDecriptionState)
+            if states.__name__ in settings.FSM_STATE_TTLS
+        },
     )
 
 
@@ -30,6 +148,16 @@ async def shutdown(bot: Bot) -> None:
     # -- Bot --
     await bot.shutdown()
 
+    # -- File storage --
+    # Cleaner uses database to remove scheduled files
+    await bot.state.file_storage_cleaner.stop()
+    await bot.state.file_storage.close()
+
+    # -- Database --
+    await bot.state.db_engine.dispose()
+    if bot.state.db_replica_engine:
+        await bot.state.db_replica_engine.dispose()
+
     # -- Redis --
     await bot.state.redis_repo.close()
 
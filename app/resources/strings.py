@@ -56,8 +56,10 @@ HELP_COMMAND_DESCRIPTION = "Показать список команд"
 HELP_LABEL = "/help"
 INCORRECT_CONTACT = "Вы некорректно отметили коллегу. Пожалуйста, укажите **только одного** пользователя **через @@**"
 LIST_TASKS_LABEL = "Показать список задач"
+NO_SEARCH_RESULTS = "Задачи не найдены."
 NEXT_PAGE_LABEL_TEMPLATE = lookup.get_template("forward.txt.mako")
 PREV_PAGE_LABEL_TEMPLATE = lookup.get_template("back.txt.mako")
+SEARCH_QUERY_MISSING = "Укажите текст для поиска, например: `/поиск отчёт`"
 SKIP_COMMAND = "SKIP"
 TASK_APPROVE_TEMPLATE = lookup.get_template("task_approve.txt.mako")
 TASK_STATUS_TEMPLATE = lookup.get_template("status.txt.mako")
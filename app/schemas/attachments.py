@@ -7,6 +7,8 @@ from uuid import UUID
 
 @dataclass
 class Attachment:
+    __slots__ = ("id", "file_storage_id", "filename", "task_id")
+
     id: int
     file_storage_id: UUID
     filename: str
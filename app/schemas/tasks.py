@@ -1,7 +1,7 @@
 """Task domains."""
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from app.schemas.attachments import Attachment
@@ -9,6 +9,16 @@ from app.schemas.attachments import Attachment
 
 @dataclass
 class Task:
+    # Slots make tasks cheaper to create and store, they are read in big lists
+    __slots__ = (
+        "id",
+        "user_huid",
+        "title",
+        "description",
+        "mentioned_colleague_id",
+        "attachment",
+    )
+
     id: int
     user_huid: UUID
     title: str
@@ -23,3 +33,9 @@ class TaskInCreation:
     title: Optional[str] = None
     description: Optional[str] = None
     mentioned_colleague_id: Optional[UUID] = None
+
+
+@dataclass
+class TasksPage:
+    tasks: List[Task]
+    has_more: bool
@@ -0,0 +1,96 @@
+"""Limits for attachments sent to BotX."""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Deque, Tuple
+
+from app.services.botx_attachments import STREAM_CHUNK_SIZE
+
+if TYPE_CHECKING:
+    Waiter = asyncio.Future[None]
+else:
+    Waiter = asyncio.Future
+
+# File is sent by chunks: read chunk, its base64 and base64 of previous chunk,
+# which is still held by HTTP client, are in memory at the same time
+# (measured peak is about 4.5 chunk sizes)
+TRANSFER_MEMORY_FACTOR = 5
+
+
+class AttachmentTransferLimiter:
+    def __init__(self, memory_budget: int, max_concurrency: int) -> None:
+        """Create limiter of in-flight attachment transfers of this process.
+
+        `memory_budget` is the number of bytes all transfers may use together.
+        Transfers wait until there is a free slot and enough memory, in order
+        of arrival, so small transfers can't starve a big one. Transfers which
+        need more than the whole budget are sent one at a time, when no other
+        transfers are in flight.
+        """
+
+        self._memory_budget = memory_budget
+        self._available_memory = memory_budget
+        self._max_concurrency = max_concurrency
+        self._transfers_num = 0
+        self._waiters: Deque[Tuple[Waiter, int]] = deque()
+
+    @asynccontextmanager
+    async def reserve(self, file_size: int) -> AsyncIterator[None]:
+        """Wait for memory to send file of `file_size` bytes."""
+
+        transfer_memory = min(file_size, STREAM_CHUNK_SIZE) * TRANSFER_MEMORY_FACTOR
+        # Oversized transfer reserves the whole budget, so it runs exclusively
+        required_memory = min(transfer_memory, self._memory_budget)
+
+        if self._waiters or not self._can_start(required_memory):
+            await self._wait_turn(required_memory)
+        else:
+            self._start(required_memory)
+
+        try:
+            yield
+        finally:
+            self._finish(required_memory)
+
+    async def _wait_turn(self, required_memory: int) -> None:
+        waiter: Waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((waiter, required_memory))
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Memory could be reserved for the waiter right before cancellation
+            if waiter.done() and not waiter.cancelled():
+                self._finish(required_memory)
+            else:
+                waiter.cancel()
+                self._start_waiters()
+            raise
+
+    def _can_start(self, required_memory: int) -> bool:
+        has_free_slot = self._transfers_num < self._max_concurrency
+        return has_free_slot and self._available_memory >= required_memory
+
+    def _start(self, required_memory: int) -> None:
+        self._transfers_num += 1
+        self._available_memory -= required_memory
+
+    def _finish(self, required_memory: int) -> None:
+        self._transfers_num -= 1
+        self._available_memory += required_memory
+        self._start_waiters()
+
+    def _start_waiters(self) -> None:
+        while self._waiters:
+            waiter, required_memory = self._waiters[0]
+            if waiter.cancelled():
+                self._waiters.popleft()
+                continue
+
+            if not self._can_start(required_memory):
+                return
+
+            self._waiters.popleft()
+            self._start(required_memory)
+            waiter.set_result(None)
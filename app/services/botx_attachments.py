@@ -0,0 +1,119 @@
+"""Sending of attachments to BotX without reading files whole."""
+
+import base64
+import json
+from typing import AsyncIterator, Tuple
+from uuid import UUID, uuid4
+
+from pybotx import Bot
+from pybotx.client.events_api.edit_event import (
+    BotXAPIEditEventRequestPayload,
+    BotXAPIEditEventResponsePayload,
+    EditEventMethod,
+)
+from pybotx.missing import Undefined
+from pybotx.models.attachments import DEFAULT_MIMETYPE, EXTENSIONS_TO_MIMETYPES
+
+from app.services.file_storage import AsyncBufferReadable
+
+EDIT_EVENT_PATH = "/api/v3/botx/events/edit_event"
+
+# Multiple of 3, so base64 of chunks joins into base64 of the whole file
+STREAM_CHUNK_SIZE = 786432  # 768 KiB
+BASE64_GROUP_SIZE = 3
+BASE64_GROUP_LENGTH = 4
+
+
+class StreamingEditEventMethod(EditEventMethod):
+    async def execute_with_file(
+        self,
+        payload: BotXAPIEditEventRequestPayload,
+        file: AsyncBufferReadable,
+        filename: str,
+        file_size: int,
+    ) -> None:
+        body_start, body_end = _split_request_body(payload, filename)
+        encoded_file_length = -(-file_size // BASE64_GROUP_SIZE) * BASE64_GROUP_LENGTH
+        content_length = len(body_start) + encoded_file_length + len(body_end)
+
+        response = await self._botx_method_call(
+            "POST",
+            self._build_url(EDIT_EVENT_PATH),
+            content=_iterate_request_body(body_start, file, body_end),
+            headers={
+                "Content-Type": "application/json",
+                "Content-Length": str(content_length),
+            },
+        )
+
+        self._verify_and_extract_api_model(BotXAPIEditEventResponsePayload, response)
+
+
+async def edit_message_file(
+    bot: Bot,
+    bot_id: UUID,
+    sync_id: UUID,
+    file: AsyncBufferReadable,
+    filename: str,
+    file_size: int,
+) -> None:
+    """Attach file to sent message, like `Bot.edit` with empty body does.
+
+    pybotx holds file content, its base64 and JSON request body in memory at
+    the same time. Here the body is encoded chunk by chunk while it is sent,
+    so memory doesn't depend on the file size.
+    """
+
+    method = StreamingEditEventMethod(
+        bot_id,
+        bot._httpx_client,  # noqa: WPS437
+        bot._bot_accounts_storage,  # noqa: WPS437
+    )
+    payload = BotXAPIEditEventRequestPayload.from_domain(
+        sync_id=sync_id,
+        body="",
+        metadata=Undefined,
+        bubbles=Undefined,
+        keyboard=Undefined,
+        file=Undefined,
+        markup_auto_adjust=Undefined,
+    )
+
+    await method.execute_with_file(payload, file, filename, file_size)
+
+
+def _split_request_body(
+    payload: BotXAPIEditEventRequestPayload, filename: str
+) -> Tuple[bytes, bytes]:
+    mimetype = EXTENSIONS_TO_MIMETYPES.get(filename.split(".")[-1], DEFAULT_MIMETYPE)
+    placeholder = uuid4().hex
+
+    request_body = payload.jsonable_dict()
+    request_body["file"] = {
+        "file_name": filename,
+        "data": f"data:{mimetype};base64,{placeholder}",
+    }
+
+    # Serialized the same way as httpx does for `json` argument
+    encoded_body = json.dumps(request_body).encode()
+    placeholder_start = encoded_body.index(placeholder.encode())
+    placeholder_end = placeholder_start + len(placeholder)
+
+    return encoded_body[:placeholder_start], encoded_body[placeholder_end:]
+
+
+async def _iterate_request_body(
+    body_start: bytes, file: AsyncBufferReadable, body_end: bytes
+) -> AsyncIterator[bytes]:
+    yield body_start
+
+    # Reads may return any number of bytes, the rest is encoded with next chunk
+    not_encoded = b""
+    while chunk := await file.read(STREAM_CHUNK_SIZE):
+        if not_encoded:
+            chunk = not_encoded + chunk
+        encoded_size = len(chunk) - len(chunk) % BASE64_GROUP_SIZE
+        not_encoded = chunk[encoded_size:]
+        yield base64.b64encode(memoryview(chunk)[:encoded_size])
+
+    yield base64.b64encode(not_encoded) + body_end
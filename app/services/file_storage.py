@@ -1,14 +1,28 @@
 """Storage for saving and reading files."""
 
+import asyncio
+import hashlib
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
 from pathlib import Path
-from typing import AsyncIterator, Optional, Protocol
+from typing import (
+    AsyncContextManager,
+    AsyncIterable,
+    AsyncIterator,
+    Iterator,
+    Optional,
+    Protocol,
+    Tuple,
+)
 from uuid import UUID, uuid4
 
 import aiofiles
 from aiofiles import os as aio_os
-from aiofiles.tempfile.temptypes import AsyncSpooledTemporaryFile
+
+CHUNK_SIZE = 1024 * 1024
+TEMP_FILE_SUFFIX = ".tmp"
+UUID_HEX_LENGTH = 32
 
 
 class AsyncBufferBase(Protocol):
@@ -16,16 +30,112 @@ class AsyncBufferBase(Protocol):
         ...  # noqa: WPS428
 
 
-class AsyncBufferReadable(AsyncBufferBase):
+class AsyncBufferReadable(AsyncBufferBase, Protocol):
     async def read(self, bytes_to_read: Optional[int] = None) -> bytes:
         ...  # noqa: WPS428
 
 
+@dataclass
+class SavedFile:
+    uuid: UUID
+    size: int
+    sha256: str
+
+
+class FileDigest:
+    def __init__(self, sha256: Optional[str] = None) -> None:
+        """Create counter of size and sha256 of file, which is being streamed.
+
+        Hash isn't computed again if `sha256` of content is already known.
+        """
+
+        self.size = 0
+        self._sha256 = sha256
+        self._hash = hashlib.sha256()
+
+    def update(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self._sha256 is None:
+            self._hash.update(chunk)
+
+    def saved_file(self, file_uuid: UUID) -> SavedFile:
+        return SavedFile(
+            uuid=file_uuid,
+            size=self.size,
+            sha256=self._sha256 or self._hash.hexdigest(),
+        )
+
+
+async def iterate_chunks(
+    content: bytes, chunk_size: int = CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Split content into chunks without copying it."""
+
+    content_view = memoryview(content)
+    for chunk_start in range(0, len(content_view), chunk_size):
+        yield content_view[chunk_start : chunk_start + chunk_size]  # noqa: E203
+
+
+def get_content_uuid(content_hash: str) -> UUID:
+    """Get UUID of deduplicated file from hex sha256 of its content."""
+
+    return UUID(hex=content_hash[:UUID_HEX_LENGTH])
+
+
+class FileStorageBackend(Protocol):
+    def file(self, file_uuid: UUID) -> AsyncContextManager[AsyncBufferReadable]:
+        ...  # noqa: WPS428
+
+    async def exists(self, file_uuid: UUID) -> bool:
+        ...  # noqa: WPS428
+
+    async def save(
+        self,
+        chunks: AsyncIterable[bytes],
+        file_uuid: Optional[UUID] = None,
+        sha256: Optional[str] = None,
+    ) -> SavedFile:
+        ...  # noqa: WPS428
+
+    async def remove(self, file_uuid: UUID) -> None:
+        ...  # noqa: WPS428
+
+    async def close(self) -> None:
+        ...  # noqa: WPS428
+
+
+def describe_content(content: bytes, deduplicate: bool) -> SavedFile:
+    """Get UUID, size and hash of file in memory, before it is saved.
+
+    With `deduplicate` UUID is taken from hash of content, so the same content
+    is stored once.
+    """
+
+    content_hash = hashlib.sha256(content).hexdigest()
+    file_uuid = get_content_uuid(content_hash) if deduplicate else uuid4()
+
+    return SavedFile(uuid=file_uuid, size=len(content), sha256=content_hash)
+
+
+async def save_content(
+    file_storage: FileStorageBackend, content: bytes, saved_file: SavedFile
+) -> None:
+    """Save file from content in memory, if it isn't stored yet."""
+
+    if not await file_storage.exists(saved_file.uuid):
+        await file_storage.save(
+            iterate_chunks(content), saved_file.uuid, sha256=saved_file.sha256
+        )
+
+
 class FileStorage:
     def __init__(self, storage_path: Path) -> None:
         """Create new file storage.
 
-        `storage_path` should be path to existing directory.
+        `storage_path` should be path to existing directory. Files are stored
+        in `ab/cd/<uuid>` subdirectories, where `abcd` are first hex digits of
+        UUID. Files saved before in the flat `<uuid>` layout are still read
+        until they are moved by `app.services.file_storage_migration`.
         """
 
         assert storage_path.exists(), "`storage_path` dir should exists"
@@ -36,34 +146,122 @@ class FileStorage:
     async def file(self, file_uuid: UUID) -> AsyncIterator[AsyncBufferReadable]:
         """Get file object in storage by its UUID."""
 
-        file_path = self._get_path_to_file(file_uuid)
+        for file_path in self._get_candidate_paths(file_uuid):
+            try:
+                fo = await aiofiles.open(file_path, "rb")
+            except FileNotFoundError:
+                continue
+
+            try:
+                yield fo
+            finally:
+                await fo.close()
+
+            return
 
-        assert file_path.exists(), f"File with uuid {file_uuid} not exists"
+        raise FileNotFoundError(f"File with uuid {file_uuid} not exists")
 
-        async with aiofiles.open(file_path, "rb") as fo:
-            yield fo
+    async def exists(self, file_uuid: UUID) -> bool:
+        for file_path in self._get_candidate_paths(file_uuid):
+            if await aio_os.path.exists(file_path):
+                return True
 
-    async def save(self, file: AsyncSpooledTemporaryFile) -> UUID:
-        """Save file to storage using its file object.
+        return False
 
-        Returns file UUID.
+    async def save(
+        self,
+        chunks: AsyncIterable[bytes],
+        file_uuid: Optional[UUID] = None,
+        sha256: Optional[str] = None,
+    ) -> SavedFile:
+        """Save file to storage from stream of its chunks.
+
+        File is written to temporary file next to its place and renamed when
+        complete, so readers never see partially written files. Size and hash
+        are computed while writing, unless `sha256` is passed. New UUID is
+        generated if `file_uuid` isn't passed.
         """
 
-        file_uuid = uuid4()
+        file_uuid = file_uuid or uuid4()
         file_path = self._get_path_to_file(file_uuid)
+        # Same deduplicated file can be written by several handlers at once
+        temp_file_path = file_path.with_name(
+            f"{file_path.name}.{uuid4().hex}{TEMP_FILE_SUFFIX}"
+        )
+        await aio_os.makedirs(file_path.parent, exist_ok=True)
+
+        file_digest = FileDigest(sha256)
+
+        try:
+            await _write_file(temp_file_path, chunks, file_digest)
+        except (Exception, asyncio.CancelledError):
+            with suppress(FileNotFoundError):
+                await aio_os.remove(temp_file_path)
 
-        async with aiofiles.open(file_path, "wb") as target_fo:
-            async for chunk in file:
-                await target_fo.write(chunk)
+            raise
 
-        return file_uuid
+        await aio_os.rename(temp_file_path, file_path)
+
+        return file_digest.saved_file(file_uuid)
 
     async def remove(self, file_uuid: UUID) -> None:
-        file_path = self._get_path_to_file(file_uuid)
+        for file_path in self._get_candidate_paths(file_uuid):
+            try:
+                await aio_os.remove(file_path)
+            except FileNotFoundError:
+                continue
+
+            return
+
+        raise FileNotFoundError(f"File with uuid {file_uuid} not exists")
+
+    async def close(self) -> None:
+        """Local storage has nothing to close."""
+
+    def iter_unsharded_files(self) -> Iterator[UUID]:
+        """Iterate over UUIDs of files stored in the flat layout."""
+
+        with os.scandir(self._storage_path) as entries:
+            for entry in entries:
+                try:
+                    file_uuid = UUID(entry.name)
+                except ValueError:
+                    continue
 
-        assert file_path.exists(), f"File with uuid {file_uuid} not exists"
+                if entry.is_file():
+                    yield file_uuid
 
-        await aio_os.remove(file_path)
+    async def move_to_sharded_layout(self, file_uuid: UUID) -> None:
+        file_path = self._get_path_to_file(file_uuid)
+        await aio_os.makedirs(file_path.parent, exist_ok=True)
+
+        # Rename is atomic, so readers see the file under one of the paths
+        await aio_os.rename(self._get_flat_path_to_file(file_uuid), file_path)
 
     def _get_path_to_file(self, file_uuid: UUID) -> Path:
+        file_uuid_hex = file_uuid.hex
+        return self._storage_path.joinpath(
+            file_uuid_hex[:2], file_uuid_hex[2:4], str(file_uuid)
+        )
+
+    def _get_flat_path_to_file(self, file_uuid: UUID) -> Path:
         return self._storage_path.joinpath(str(file_uuid))
+
+    def _get_candidate_paths(self, file_uuid: UUID) -> Tuple[Path, ...]:
+        sharded_path = self._get_path_to_file(file_uuid)
+
+        # File could be moved to sharded path after it wasn't found there
+        return (
+            sharded_path,
+            self._get_flat_path_to_file(file_uuid),
+            sharded_path,
+        )
+
+
+async def _write_file(
+    file_path: Path, chunks: AsyncIterable[bytes], file_digest: FileDigest
+) -> None:
+    async with aiofiles.open(file_path, "wb") as target_fo:
+        async for chunk in chunks:
+            await target_fo.write(chunk)
+            file_digest.update(chunk)
@@ -0,0 +1,131 @@
+"""Background removal of files from storage."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List
+from uuid import UUID
+
+from app.db.file_blob.repo import FileBlobRepo
+from app.db.sqlalchemy import AsyncSessionFactory
+from app.logger import logger
+from app.services.file_storage import FileStorageBackend
+
+
+class FileStorageCleaner:
+    def __init__(
+        self,
+        file_storage: FileStorageBackend,
+        db_session_factory: AsyncSessionFactory,
+        abandoned_ttl: int,
+        sweep_interval: float,
+        batch_size: int = 100,
+    ) -> None:
+        """Create cleaner which removes files after they are no longer referenced.
+
+        Removals are queued, so callers can schedule them right after DB commit
+        without waiting for disk I/O. Every `sweep_interval` seconds cleaner
+        also removes files, which aren't attached to tasks for `abandoned_ttl`
+        seconds, e.g. uploads of task creations which were never finished.
+        """
+
+        self._file_storage = file_storage
+        self._db_session_factory = db_session_factory
+        self._abandoned_ttl = timedelta(seconds=abandoned_ttl)
+        self._sweep_interval = sweep_interval
+        self._batch_size = batch_size
+        self._queue: "asyncio.Queue[UUID]" = asyncio.Queue()
+        self._workers: List["asyncio.Task[None]"] = []
+
+    def start(self) -> None:
+        assert not self._workers, "Cleaner is already started"
+
+        self._workers = [
+            asyncio.create_task(self._run()),
+            asyncio.create_task(self._sweep_periodically()),
+        ]
+
+    async def stop(self) -> None:
+        """Remove all scheduled files and stop background workers."""
+
+        await self._queue.join()
+
+        for worker in self._workers:
+            worker.cancel()
+
+        self._workers = []
+
+    def schedule_removal(self, file_uuid: UUID) -> None:
+        self._queue.put_nowait(file_uuid)
+
+    async def sweep(self) -> None:
+        """Remove files of abandoned uploads and files, which removal failed."""
+
+        is_batch_full = True
+        while is_batch_full:
+            referenced_before = datetime.now(timezone.utc) - self._abandoned_ttl
+
+            async with self._db_session_factory() as db_session:
+                file_blob_repo = FileBlobRepo(db_session)
+                file_uuids = await file_blob_repo.lock_abandoned(
+                    referenced_before, self._batch_size
+                )
+                removed_uuids = await self._remove_locked_files(
+                    file_blob_repo, file_uuids
+                )
+                await db_session.commit()
+
+            # Files, which failed to be removed, are left for the next sweep
+            is_batch_full = len(removed_uuids) == self._batch_size
+
+    async def _run(self) -> None:
+        while True:  # noqa: WPS457
+            batch = [await self._queue.get()]
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._remove_unreferenced(batch)
+            except Exception:
+                logger.exception("Failed to remove unreferenced files")
+
+            for _ in batch:  # noqa: WPS122
+                self._queue.task_done()
+
+    async def _sweep_periodically(self) -> None:
+        while True:  # noqa: WPS457
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Failed to remove abandoned files")
+
+            await asyncio.sleep(self._sweep_interval)
+
+    async def _remove_unreferenced(self, file_uuids: List[UUID]) -> None:
+        async with self._db_session_factory() as db_session:
+            file_blob_repo = FileBlobRepo(db_session)
+            # Files, which were uploaded again after removal was scheduled, are kept
+            locked_uuids = await file_blob_repo.lock_unreferenced(file_uuids)
+            await self._remove_locked_files(file_blob_repo, locked_uuids)
+            await db_session.commit()
+
+    async def _remove_locked_files(
+        self, file_blob_repo: FileBlobRepo, file_uuids: List[UUID]
+    ) -> List[UUID]:
+        results = await asyncio.gather(
+            *(self._file_storage.remove(file_uuid) for file_uuid in file_uuids),
+            return_exceptions=True,
+        )
+
+        removed_uuids = []
+        for file_uuid, result in zip(file_uuids, results):
+            # Upload could fail before its file was written
+            if result is None or isinstance(result, FileNotFoundError):
+                removed_uuids.append(file_uuid)
+            else:
+                logger.opt(exception=result).warning(
+                    f"Failed to remove file {file_uuid} from storage"
+                )
+
+        await file_blob_repo.delete(removed_uuids)
+
+        return removed_uuids
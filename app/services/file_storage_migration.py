@@ -0,0 +1,85 @@
+"""Migration of files from the flat layout of file storage to subdirectories.
+
+Run with `python -m app.services.file_storage_migration`. Files are moved one
+by one with atomic renames, so the bot can keep serving them, and migration can
+be stopped at any moment and started again to continue.
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+from typing import List
+from uuid import UUID
+
+from app.bot import constants
+from app.logger import logger
+from app.services.file_storage import FileStorage
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PAUSE = 0.1
+
+
+async def migrate_file_storage(
+    file_storage: FileStorage,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pause: float = DEFAULT_PAUSE,
+) -> int:
+    """Move flat files to sharded layout.
+
+    Pauses for `pause` seconds after every `batch_size` files to limit disk load.
+    Returns number of moved files.
+    """
+
+    moved_count = 0
+    batch: List[UUID] = []
+
+    for file_uuid in file_storage.iter_unsharded_files():
+        batch.append(file_uuid)
+        if len(batch) < batch_size:
+            continue
+
+        moved_count += await _move_batch(file_storage, batch)
+        batch = []
+
+        logger.info(f"Moved {moved_count} files to sharded layout")
+        await asyncio.sleep(pause)
+
+    moved_count += await _move_batch(file_storage, batch)
+    logger.info(f"File storage migration finished, moved {moved_count} files")
+
+    return moved_count
+
+
+async def _move_batch(file_storage: FileStorage, file_uuids: List[UUID]) -> int:
+    results = await asyncio.gather(
+        *(file_storage.move_to_sharded_layout(file_uuid) for file_uuid in file_uuids),
+        return_exceptions=True,
+    )
+
+    moved_count = 0
+    for file_uuid, result in zip(file_uuids, results):
+        # File could be removed by the bot after it was listed
+        if isinstance(result, FileNotFoundError):
+            continue
+
+        if isinstance(result, Exception):
+            logger.opt(exception=result).warning(f"Failed to move file {file_uuid}")
+            continue
+
+        moved_count += 1
+
+    return moved_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=DEFAULT_PAUSE)
+    args = parser.parse_args()
+
+    file_storage = FileStorage(Path(constants.FILE_STORAGE_PATH))
+    asyncio.run(migrate_file_storage(file_storage, args.batch_size, args.pause))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Report of live FSM states number and their total size.
+
+Run with `python -m app.services.fsm_states_report`. All keys of the bot in
+Redis are scanned, so it should be used only for maintenance.
+"""
+
+import asyncio
+
+from app.caching.fsm_states import FSMStateRepo
+from app.caching.redis_repo import RedisRepo
+from app.logger import logger
+from app.resources import strings
+from app.settings import settings
+
+
+async def report_fsm_states() -> None:
+    redis_repo = await RedisRepo.init(
+        dsn=settings.REDIS_DSN, prefix=strings.BOT_PROJECT_NAME
+    )
+    fsm_state_repo = FSMStateRepo(redis_repo, default_ttl=settings.FSM_STATE_TTL)
+
+    report = await fsm_state_repo.report()
+    await redis_repo.close()
+
+    logger.info(f"FSM states: {report.count}, bytes: {report.size}")
+
+
+def main() -> None:
+    asyncio.run(report_fsm_states())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""File storage in S3-compatible object storage."""
+
+import asyncio
+import hashlib
+import os
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional
+from uuid import UUID, uuid4
+from xml.etree import ElementTree  # noqa: S405
+
+import httpx
+
+from app.services.file_storage import AsyncBufferReadable, FileDigest, SavedFile
+from app.services.s3_signing import S3Credentials, sign_request
+
+# S3 requires all parts of multipart upload except the last one to be 5 MiB or more
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+
+class S3Error(Exception):
+    """Error for raising when object storage rejects request."""
+
+
+@dataclass
+class MultipartUpload:
+    key: str
+    upload_id: Optional[str] = None
+    etags: List[str] = field(default_factory=list)
+
+
+class S3ObjectReader(AsyncBufferReadable):
+    def __init__(self, file_storage: "S3FileStorage", key: str, size: int) -> None:
+        """Create reader of object, which downloads only requested byte ranges."""
+
+        self._file_storage = file_storage
+        self._key = key
+        self._size = size
+        self._position = 0
+
+    async def seek(self, cursor: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            cursor += self._position
+        elif whence == os.SEEK_END:
+            cursor += self._size
+
+        self._position = max(cursor, 0)
+        return self._position
+
+    async def tell(self) -> int:
+        return self._position
+
+    async def read(self, bytes_to_read: Optional[int] = None) -> bytes:
+        if self._position >= self._size or bytes_to_read == 0:
+            return b""
+
+        range_end = ""
+        if bytes_to_read is not None and bytes_to_read > 0:
+            range_end = str(self._position + bytes_to_read - 1)
+
+        content = await self._file_storage.read_range(
+            self._key, f"bytes={self._position}-{range_end}"
+        )
+        self._position += len(content)
+
+        return content
+
+
+class S3FileStorage:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        endpoint_url: str,
+        bucket: str,
+        credentials: S3Credentials,
+        part_size: int = DEFAULT_PART_SIZE,
+    ) -> None:
+        """Create storage of files in `bucket` of S3-compatible storage.
+
+        Files are shared by all bot replicas. Files larger than `part_size` are
+        uploaded with multipart upload, so only one part is kept in memory.
+        Buckets are addressed by path, which is supported by MinIO and AWS.
+        """
+
+        assert part_size >= MIN_PART_SIZE, "`part_size` should be at least 5 MiB"
+
+        self._client = client
+        base_url = endpoint_url.rstrip("/")
+        self._bucket_url = f"{base_url}/{bucket}"
+        self._credentials = credentials
+        self._part_size = part_size
+
+    @asynccontextmanager
+    async def file(self, file_uuid: UUID) -> AsyncIterator[S3ObjectReader]:
+        key = str(file_uuid)
+
+        response = await self._request("HEAD", key)
+        if response.status_code == HTTPStatus.NOT_FOUND:
+            raise FileNotFoundError(f"File with uuid {file_uuid} not exists")
+
+        _raise_for_status(response)
+
+        yield S3ObjectReader(self, key, int(response.headers["content-length"]))
+
+    async def exists(self, file_uuid: UUID) -> bool:
+        response = await self._request("HEAD", str(file_uuid))
+        if response.status_code == HTTPStatus.NOT_FOUND:
+            return False
+
+        _raise_for_status(response)
+        return True
+
+    async def save(
+        self,
+        chunks: AsyncIterable[bytes],
+        file_uuid: Optional[UUID] = None,
+        sha256: Optional[str] = None,
+    ) -> SavedFile:
+        """Save file to storage from stream of its chunks.
+
+        Objects appear in storage only when upload is complete, so readers
+        never see partially written files. Hash isn't computed again if
+        `sha256` is passed.
+        """
+
+        file_uuid = file_uuid or uuid4()
+        file_digest = FileDigest(sha256)
+        upload = MultipartUpload(key=str(file_uuid))
+
+        try:
+            await self._upload(upload, chunks, file_digest)
+        except (Exception, asyncio.CancelledError):
+            await self._abort_upload(upload)
+            raise
+
+        return file_digest.saved_file(file_uuid)
+
+    async def remove(self, file_uuid: UUID) -> None:
+        # S3 doesn't report if deleted object existed
+        response = await self._request("DELETE", str(file_uuid))
+        _raise_for_status(response)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def read_range(self, key: str, bytes_range: str) -> bytes:
+        response = await self._request("GET", key, headers={"Range": bytes_range})
+        _raise_for_status(response)
+
+        return response.content
+
+    async def _upload(
+        self,
+        upload: MultipartUpload,
+        chunks: AsyncIterable[bytes],
+        file_digest: FileDigest,
+    ) -> None:
+        part = bytearray()
+        async for chunk in chunks:
+            part += chunk
+            file_digest.update(chunk)
+
+            if len(part) >= self._part_size:
+                await self._upload_part(upload, part)
+                part = bytearray()
+
+        # Small files are uploaded with one request
+        if upload.upload_id is None:
+            response = await self._request("PUT", upload.key, content=bytes(part))
+            _raise_for_status(response)
+            return
+
+        if part:
+            await self._upload_part(upload, part)
+
+        await self._complete_multipart_upload(upload)
+
+    async def _upload_part(self, upload: MultipartUpload, part: bytearray) -> None:
+        if upload.upload_id is None:
+            response = await self._request("POST", upload.key, params={"uploads": ""})
+            _raise_for_status(response)
+            upload.upload_id = _find_xml_text(response.content, "UploadId")
+
+        response = await self._request(
+            "PUT",
+            upload.key,
+            params={
+                "partNumber": str(len(upload.etags) + 1),
+                "uploadId": upload.upload_id,
+            },
+            content=bytes(part),
+        )
+        _raise_for_status(response)
+
+        upload.etags.append(response.headers["etag"])
+
+    async def _abort_upload(self, upload: MultipartUpload) -> None:
+        if upload.upload_id is None:
+            return
+
+        # Original error is more useful than error of abort
+        with suppress(httpx.HTTPError, S3Error):
+            response = await self._request(
+                "DELETE", upload.key, params={"uploadId": upload.upload_id}
+            )
+            _raise_for_status(response)
+
+    async def _complete_multipart_upload(self, upload: MultipartUpload) -> None:
+        assert upload.upload_id, "Upload should be started"
+
+        parts = "".join(
+            f"<Part><PartNumber>{part_number}</PartNumber><ETag>{etag}</ETag></Part>"
+            for part_number, etag in enumerate(upload.etags, start=1)
+        )
+        response = await self._request(
+            "POST",
+            upload.key,
+            params={"uploadId": upload.upload_id},
+            content=(
+                f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>"
+            ).encode(),
+        )
+        _raise_for_status(response)
+
+        # Completion can fail after response status is already sent
+        if _parse_xml(response.content).tag.endswith("Error"):
+            raise S3Error(response.text)
+
+    async def _request(
+        self,
+        method: str,
+        key: str,
+        params: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        content: bytes = b"",
+    ) -> httpx.Response:
+        request = self._client.build_request(
+            method,
+            f"{self._bucket_url}/{key}",
+            params=params,
+            headers=headers,
+            content=content,
+        )
+        sign_request(request, self._credentials, hashlib.sha256(content).hexdigest())
+
+        return await self._client.send(request)
+
+
+def _raise_for_status(response: httpx.Response) -> None:
+    if response.is_error:
+        raise S3Error(f"{response.status_code}: {response.text}")
+
+
+def _parse_xml(content: bytes) -> ElementTree.Element:
+    # Responses come from storage configured by bot admin
+    return ElementTree.fromstring(content)  # noqa: S314
+
+
+def _find_xml_text(content: bytes, tag: str) -> str:
+    # Tags are in S3 namespace, but some compatible storages omit it
+    for element in _parse_xml(content).iter():
+        if element.tag.rpartition("}")[2] == tag:
+            return element.text or ""
+
+    raise S3Error(f"No {tag} in response: {content!r}")
@@ -0,0 +1,125 @@
+"""AWS Signature Version 4 of requests to S3-compatible object storage."""
+
+import hashlib
+import hmac
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, quote
+
+import httpx
+
+SIGNING_ALGORITHM = "AWS4-HMAC-SHA256"
+SIGNING_SERVICE = "s3"
+SIGNED_HEADERS = frozenset(("host", "range", "content-type"))
+
+
+@dataclass
+class S3Credentials:
+    access_key_id: str
+    secret_access_key: str
+    region: str
+
+
+def sign_request(
+    request: httpx.Request,
+    credentials: S3Credentials,
+    payload_hash: str,
+    now: Optional[datetime] = None,
+) -> None:
+    """Add AWS Signature Version 4 headers to request."""
+
+    amz_date = _format_amz_date(now or datetime.now(timezone.utc))
+    scope = "/".join(
+        (amz_date[:8], credentials.region, SIGNING_SERVICE, "aws4_request")
+    )
+
+    request.headers["x-amz-date"] = amz_date
+    request.headers["x-amz-content-sha256"] = payload_hash
+
+    signed_headers = _get_signed_headers(request)
+    canonical_request = _get_canonical_request(request, signed_headers, payload_hash)
+    string_to_sign = "\n".join(
+        (
+            SIGNING_ALGORITHM,
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        )
+    )
+
+    signature = hmac.new(
+        _get_signing_key(credentials, scope), string_to_sign.encode(), hashlib.sha256
+    ).hexdigest()
+
+    credential = f"{credentials.access_key_id}/{scope}"
+    signed_header_names = ";".join(signed_headers)
+    request.headers["Authorization"] = (
+        f"{SIGNING_ALGORITHM} Credential={credential}, "
+        f"SignedHeaders={signed_header_names}, Signature={signature}"
+    )
+
+
+def get_query_params(url: httpx.URL) -> List[Tuple[str, str]]:
+    # `httpx.URL.params` drops params without value, like `?uploads`
+    return parse_qsl(url.query.decode(), keep_blank_values=True)
+
+
+def _format_amz_date(now: datetime) -> str:
+    # Basic format of ISO 8601, e.g. `20130524T000000Z`
+    utc_now = now.astimezone(timezone.utc).replace(microsecond=0, tzinfo=None)
+    basic_date = utc_now.isoformat().replace("-", "").replace(":", "")
+
+    return f"{basic_date}Z"
+
+
+def _get_signed_headers(request: httpx.Request) -> List[str]:
+    return sorted(
+        header.lower()
+        for header in request.headers.keys()
+        if _is_signed_header(header.lower())
+    )
+
+
+def _is_signed_header(header: str) -> bool:
+    # Other headers (e.g. `connection`) can be changed by proxies on the way
+    return header in SIGNED_HEADERS or header.startswith("x-amz-")
+
+
+def _get_canonical_request(
+    request: httpx.Request, signed_headers: List[str], payload_hash: str
+) -> str:
+    header_lines = [
+        ":".join((header, request.headers[header].strip())) for header in signed_headers
+    ]
+    query_params = [
+        "=".join((_quote(name), _quote(param_value)))
+        for name, param_value in sorted(get_query_params(request.url))
+    ]
+
+    # Block of header lines ends with empty line
+    return "\n".join(
+        (
+            request.method,
+            quote(request.url.path, safe="/-_.~"),
+            "&".join(query_params),
+            *header_lines,
+            "",
+            ";".join(signed_headers),
+            payload_hash,
+        )
+    )
+
+
+def _get_signing_key(credentials: S3Credentials, scope: str) -> bytes:
+    signing_key = f"AWS4{credentials.secret_access_key}".encode()
+    for scope_part in scope.split("/"):
+        signing_key = hmac.new(
+            signing_key, scope_part.encode(), hashlib.sha256
+        ).digest()
+
+    return signing_key
+
+
+def _quote(query_value: str) -> str:
+    return quote(query_value, safe="-_.~")
@@ -1,11 +1,14 @@
 """Application settings."""
 
-from typing import Any, List
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from pybotx import BotAccountWithSecret
 from pydantic import BaseSettings
 
+DEFAULT_ATTACHMENT_TRANSFERS_MEMORY_BUDGET = 536870912  # 512 MiB
+DEFAULT_S3_MULTIPART_PART_SIZE = 8388608  # 8 MiB
+
 
 class AppSettings(BaseSettings):
     class Config:  # noqa: WPS431
@@ -47,10 +50,63 @@ class AppSettings(BaseSettings):
 
     # database
     POSTGRES_DSN: str
+    POSTGRES_REPLICA_DSN: Optional[str] = None
+    # Seconds during which user's reads go to primary after the user's own write
+    DB_READ_YOUR_WRITES_TTL: int = 10
     SQL_DEBUG: bool = False
+    # Queries slower than this number of seconds are logged
+    SQL_SLOW_QUERY_THRESHOLD: float = 0.5
+    # Statement repeated this number of times in one handler is likely an N+1 query
+    SQL_REPEATED_QUERY_THRESHOLD: int = 5
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_WARM_UP_SIZE: int = 1
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # attachments
+    # Bytes of memory shared by all attachment transfers to BotX of the process
+    ATTACHMENT_TRANSFERS_MEMORY_BUDGET: int = DEFAULT_ATTACHMENT_TRANSFERS_MEMORY_BUDGET
+    ATTACHMENT_TRANSFERS_MAX_CONCURRENCY: int = 4
+
+    # file storage
+    # "local" or "s3", files in S3 are available to all bot replicas
+    FILE_STORAGE_BACKEND: str = "local"
+    # Store identical files once, shared by attachments of all tasks
+    FILE_STORAGE_DEDUPLICATION: bool = True
+    # Seconds between removals of uploads, which weren't attached to tasks
+    FILE_STORAGE_SWEEP_INTERVAL: int = 3600
+    S3_ENDPOINT_URL: str = ""
+    S3_BUCKET: str = ""
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_REGION: str = "us-east-1"
+    # Seconds to wait for each request to storage, e.g. upload of one part
+    S3_TIMEOUT: float = 60
+    # Larger files are uploaded in parts of this size, S3 requires at least 5 MiB
+    S3_MULTIPART_PART_SIZE: int = DEFAULT_S3_MULTIPART_PART_SIZE
 
     # redis
     REDIS_DSN: str
+    # In-process cache in front of Redis, disabled if size is 0
+    REDIS_LOCAL_CACHE_SIZE: int = 0
+    REDIS_LOCAL_CACHE_TTL: float = 5
+    # "pickle" or "json", JSON codec doesn't execute code from loaded values
+    REDIS_CODEC: str = "pickle"
+    # Enable only while values pickled before the switch to JSON codec expire
+    REDIS_PICKLE_FALLBACK: bool = False
+    # Move values from old hashed keys on read, enabled while keys are migrated
+    REDIS_READ_LEGACY_KEYS: bool = False
+    TASKS_CACHE_TTL: int = 300
+    USER_SEARCH_CACHE_TTL: int = 3600
+    # "Not found" and "is bot" results are cached for shorter time
+    USER_SEARCH_NEGATIVE_CACHE_TTL: int = 60
+    # Abandoned FSM flows expire after this number of seconds without transitions
+    FSM_STATE_TTL: int = 86400
+    # TTLs of specific FSMs by their states enum name
+    FSM_STATE_TTLS: Dict[str, int] = {}
 
 
 settings = AppSettings()
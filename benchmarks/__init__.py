@@ -0,0 +1 @@
+"""Benchmarks for hot paths. Run them with `python -m benchmarks.<name>`."""
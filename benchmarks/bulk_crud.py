@@ -0,0 +1,67 @@
+"""Compare per-row and bulk task creation/deletion throughput.
+
+Database should be migrated with `alembic upgrade head` before running.
+"""
+
+import asyncio
+from time import perf_counter
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+from app.db.sqlalchemy import build_db_engine, build_db_session_factory
+from app.db.task.repo import TaskRepo
+from app.schemas.tasks import TaskInCreation
+from app.settings import settings
+
+ROWS_NUM = 10_000
+
+
+async def measure(label: str, func: Callable[[], Awaitable[None]]) -> None:
+    start = perf_counter()
+    await func()
+    elapsed = perf_counter() - start
+
+    print(f"{label:<20} {elapsed:8.3f}s {ROWS_NUM / elapsed:10.0f} rows/s")
+
+
+async def main() -> None:
+    engine = build_db_engine(settings.POSTGRES_DSN)
+    session_factory = build_db_session_factory(engine)
+    user_huid = uuid4()
+    tasks_in_creation = [
+        TaskInCreation(user_huid=user_huid, title=f"Task {num}", description="Text")
+        for num in range(ROWS_NUM)
+    ]
+
+    async with session_factory() as db_session:
+        task_repo = TaskRepo(db_session)
+        task_ids = []
+
+        async def create_per_row() -> None:  # noqa: WPS430
+            for task_in_creation in tasks_in_creation:
+                task = await task_repo.create_task(task_in_creation)
+                task_ids.append(task.id)
+
+        async def delete_per_row() -> None:  # noqa: WPS430
+            for task_id in task_ids:
+                await task_repo.delete_task(task_id)
+
+        async def create_bulk() -> None:  # noqa: WPS430
+            tasks = await task_repo.create_tasks(tasks_in_creation)
+            task_ids[:] = [task.id for task in tasks]
+
+        async def delete_bulk() -> None:  # noqa: WPS430
+            await task_repo.delete_tasks(task_ids)
+
+        await measure("create per-row", create_per_row)
+        await measure("delete per-row", delete_per_row)
+        await measure("create bulk", create_bulk)
+        await measure("delete bulk", delete_bulk)
+
+        await db_session.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Latency of FSM storage access during task creation, with and without local cache.
+
+Each step of task creation reads FSM state and writes the next one, like
+pybotx-fsm does for handlers in `app/bot/commands/tasks/create_task.py`.
+"""
+
+import asyncio
+from statistics import quantiles
+from time import perf_counter
+from types import SimpleNamespace
+from typing import List, Optional
+from uuid import uuid4
+
+from pybotx_fsm.fsm import FSMStateData
+from pybotx_fsm.templates import KEY_TEMPLATE
+
+from app.bot.commands.tasks.create_task import CreateTaskStates
+from app.caching.fsm_states import FSMStateRepo
+from app.caching.local_cache import LocalCache
+from app.caching.redis_repo import RedisRepo
+from app.schemas.attachments import AttachmentInCreation
+from app.schemas.tasks import TaskInCreation
+from app.settings import settings
+
+FLOWS_NUM = 1000
+STEPS = list(CreateTaskStates)
+
+
+async def run_flows(fsm_state_repo: FSMStateRepo) -> List[float]:
+    timings = []
+
+    for _ in range(FLOWS_NUM):  # noqa: WPS122
+        user_huid = uuid4()
+        fsm_key = KEY_TEMPLATE.format(
+            host="cts.example.com",
+            bot_id=uuid4(),
+            chat_id=uuid4(),
+            user_huid=user_huid,
+        )
+        task = TaskInCreation(user_huid=user_huid)
+        await fsm_state_repo.set(
+            fsm_key, FSMStateData(STEPS[0], SimpleNamespace(task=task))
+        )
+
+        for step_num, step in enumerate(STEPS):
+            start = perf_counter()
+
+            state_data = await fsm_state_repo.get(fsm_key)
+            storage = state_data.storage
+            storage.task.title = f"{step.name} " * 10
+            if step == CreateTaskStates.WAITING_TASK_ATTACHMENT:
+                storage.attachment = AttachmentInCreation(
+                    file_storage_id=uuid4(), filename="report.pdf"
+                )
+            next_step = STEPS[min(step_num + 1, len(STEPS) - 1)]
+            await fsm_state_repo.set(fsm_key, FSMStateData(next_step, storage))
+
+            timings.append(perf_counter() - start)
+
+        await fsm_state_repo.delete(fsm_key)
+
+    return timings
+
+
+async def measure(label: str, local_cache: Optional[LocalCache]) -> None:
+    redis_repo = await RedisRepo.init(
+        dsn=settings.REDIS_DSN, prefix="benchmark", local_cache=local_cache
+    )
+
+    fsm_state_repo = FSMStateRepo(redis_repo, default_ttl=settings.FSM_STATE_TTL)
+
+    try:
+        timings = await run_flows(fsm_state_repo)
+    finally:
+        await redis_repo.close()
+
+    percentiles = quantiles(timings, n=100)
+    print(
+        f"{label:<12} p50: {percentiles[49] * 1000:.3f}ms "
+        f"p99: {percentiles[98] * 1000:.3f}ms per step"
+    )
+
+
+async def main() -> None:
+    await measure("redis", None)
+    await measure("redis + lru", LocalCache(max_size=10_000, ttl=60))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
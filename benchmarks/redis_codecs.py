@@ -0,0 +1,92 @@
+"""Encode/decode time and stored size of FSM states for RedisRepo codecs.
+
+States are the ones FSM middleware stores for handlers in
+`app/bot/commands/tasks/create_task.py` on each step of task creation.
+"""
+
+from time import perf_counter
+from types import SimpleNamespace
+from typing import List
+from uuid import uuid4
+
+from pybotx_fsm.fsm import FSMStateData
+
+from app.bot.commands.tasks.create_task import CreateTaskStates
+from app.caching.codecs import Codec, PickleCodec, TaggedJSONCodec
+from app.schemas.attachments import AttachmentInCreation
+from app.schemas.tasks import TaskInCreation
+
+ROUNDS_NUM = 10_000
+
+
+def build_states() -> List[FSMStateData]:
+    task = TaskInCreation(user_huid=uuid4())
+    attachment = AttachmentInCreation(file_storage_id=uuid4(), filename="report.pdf")
+    states = [
+        FSMStateData(CreateTaskStates.WAITING_TASK_TITLE, SimpleNamespace(task=task))
+    ]
+
+    task = TaskInCreation(user_huid=task.user_huid, title="Подготовить отчёт")
+    states.append(
+        FSMStateData(CreateTaskStates.WAITING_TASK_TEXT, SimpleNamespace(task=task))
+    )
+
+    task = TaskInCreation(
+        user_huid=task.user_huid,
+        title=task.title,
+        description="Квартальный отчёт по продажам " * 10,
+        mentioned_colleague_id=uuid4(),
+    )
+    states.append(
+        FSMStateData(
+            CreateTaskStates.WAITING_TASK_ATTACHMENT, SimpleNamespace(task=task)
+        )
+    )
+    states.append(
+        FSMStateData(
+            CreateTaskStates.WAITING_TASK_APPROVE,
+            SimpleNamespace(task=task, attachment=attachment),
+        )
+    )
+
+    return states
+
+
+def measure(label: str, codec: Codec, states: List[FSMStateData]) -> None:
+    encoded_states = [codec.dumps(state) for state in states]
+    assert [codec.loads(data) for data in encoded_states] == states
+
+    start = perf_counter()
+    for _ in range(ROUNDS_NUM):  # noqa: WPS122
+        for state in states:
+            codec.dumps(state)
+    encode_time = perf_counter() - start
+
+    start = perf_counter()
+    for _ in range(ROUNDS_NUM):  # noqa: WPS122
+        for data in encoded_states:
+            codec.loads(data)
+    decode_time = perf_counter() - start
+
+    operations_num = ROUNDS_NUM * len(states)
+    sizes = ", ".join(str(len(data)) for data in encoded_states)
+    print(
+        f"{label:<12} encode: {encode_time / operations_num * 1e6:.2f}us "
+        f"decode: {decode_time / operations_num * 1e6:.2f}us bytes: {sizes}"
+    )
+
+
+def main() -> None:
+    states = build_states()
+    measure("pickle", PickleCodec(), states)
+    measure(
+        "tagged json",
+        TaggedJSONCodec(
+            types=[FSMStateData, TaskInCreation, AttachmentInCreation, CreateTaskStates]
+        ),
+        states,
+    )
+
+
+if __name__ == "__main__":
+    main()
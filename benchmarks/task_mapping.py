@@ -0,0 +1,116 @@
+"""Compare ORM and Core read paths of user tasks: time and memory per row.
+
+Database should be migrated with `alembic upgrade head` before running.
+"""
+
+import asyncio
+import tracemalloc
+from time import perf_counter
+from typing import Awaitable, Callable, List
+from uuid import UUID, uuid4
+
+from app.db.crud import CRUD
+from app.db.sqlalchemy import (
+    AsyncSessionFactory,
+    build_db_engine,
+    build_db_session_factory,
+)
+from app.db.task.models import TaskModel
+from app.db.task.repo import TaskRepo
+from app.schemas.attachments import Attachment
+from app.schemas.tasks import Task, TaskInCreation
+from app.settings import settings
+
+ROWS_NUM = 10_000
+ROUNDS_NUM = 5
+
+
+async def read_with_orm(session_factory: AsyncSessionFactory, user_huid: UUID) -> int:
+    """Read path used before: ORM entities copied into domain objects."""
+
+    async with session_factory() as db_session:
+        crud = CRUD(session=db_session, cls_model=TaskModel)
+        tasks_in_db = await crud.get_by_field_id_asc(
+            field="user_huid", field_value=user_huid
+        )
+
+        tasks: List[Task] = []
+        for task_in_db in tasks_in_db:
+            attachment = None
+            if task_in_db.attachment:
+                attachment = Attachment(
+                    id=task_in_db.attachment.id,
+                    file_storage_id=task_in_db.attachment.file_storage_id,
+                    filename=task_in_db.attachment.filename,
+                    task_id=task_in_db.id,
+                )
+
+            tasks.append(
+                Task(
+                    id=task_in_db.id,
+                    user_huid=task_in_db.user_huid,
+                    title=task_in_db.title,
+                    description=task_in_db.description,
+                    mentioned_colleague_id=task_in_db.mentioned_colleague_id,
+                    attachment=attachment,
+                )
+            )
+
+        return len(tasks)
+
+
+async def read_with_core(session_factory: AsyncSessionFactory, user_huid: UUID) -> int:
+    async with session_factory() as db_session:
+        tasks = await TaskRepo(db_session).get_user_tasks(user_huid)
+        return len(tasks)
+
+
+async def measure(label: str, read: Callable[[], Awaitable[int]]) -> None:
+    await read()  # warm up caches
+
+    start = perf_counter()
+    for _ in range(ROUNDS_NUM):  # noqa: WPS122
+        await read()
+    elapsed = (perf_counter() - start) / ROUNDS_NUM
+
+    tracemalloc.start()
+    await read()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<6} {elapsed * 1e6 / ROWS_NUM:8.2f} us/row "
+        f"{peak_memory / ROWS_NUM:8.0f} bytes/row peak"
+    )
+
+
+async def main() -> None:
+    engine = build_db_engine(settings.POSTGRES_DSN)
+    session_factory = build_db_session_factory(engine)
+    user_huid = uuid4()
+
+    async with session_factory() as db_session:
+        task_repo = TaskRepo(db_session)
+        tasks = await task_repo.create_tasks(
+            [
+                TaskInCreation(
+                    user_huid=user_huid, title=f"Task {num}", description="Text" * 20
+                )
+                for num in range(ROWS_NUM)
+            ]
+        )
+        await db_session.commit()
+
+    try:
+        await measure("ORM", lambda: read_with_orm(session_factory, user_huid))
+        await measure("Core", lambda: read_with_core(session_factory, user_huid))
+    finally:
+        async with session_factory() as db_session:
+            await TaskRepo(db_session).delete_tasks([task.id for task in tasks])
+            await db_session.commit()
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+import pickle
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from pybotx_fsm.fsm import FSMStateData
+
+from app.bot.commands.tasks.create_task import CreateTaskStates
+from app.caching.codecs import PICKLE_MARKER, TaggedJSONCodec, UnsupportedTypeError
+from app.schemas.attachments import AttachmentInCreation
+from app.schemas.tasks import TaskInCreation
+
+
+def test_tagged_json_codec_round_trip() -> None:
+    # - Arrange -
+    codec = TaggedJSONCodec(
+        types=[TaskInCreation, AttachmentInCreation, CreateTaskStates]
+    )
+    value = {
+        "state": CreateTaskStates.WAITING_TASK_TITLE,
+        "task": TaskInCreation(user_huid=uuid4(), title="Отчёт"),
+        "attachment": AttachmentInCreation(file_storage_id=uuid4()),
+        "sync_ids": (uuid4(), None),
+    }
+
+    # - Act -
+    data = codec.dumps(value)
+
+    # - Assert -
+    assert codec.loads(data) == value
+
+
+def test_tagged_json_codec_encodes_fsm_state_without_pickle() -> None:
+    # - Arrange -
+    codec = TaggedJSONCodec(
+        types=[FSMStateData, TaskInCreation, AttachmentInCreation, CreateTaskStates]
+    )
+    value = FSMStateData(
+        CreateTaskStates.WAITING_TASK_APPROVE,
+        SimpleNamespace(
+            task=TaskInCreation(user_huid=uuid4(), title="Отчёт"),
+            attachment=AttachmentInCreation(file_storage_id=uuid4()),
+        ),
+    )
+
+    # - Act -
+    data = codec.dumps(value)
+
+    # - Assert -
+    assert not data.startswith(PICKLE_MARKER)
+    assert codec.loads(data) == value
+
+
+def test_tagged_json_codec_rejects_unregistered_type() -> None:
+    # - Arrange -
+    codec = TaggedJSONCodec(types=[])
+
+    # - Act -
+    with pytest.raises(UnsupportedTypeError):
+        codec.dumps(TaskInCreation())
+
+    # - Assert -
+    with pytest.raises(UnsupportedTypeError):
+        codec.loads(pickle.dumps("value"))
+
+
+def test_tagged_json_codec_falls_back_to_pickle() -> None:
+    # - Arrange -
+    codec = TaggedJSONCodec(types=[], pickle_fallback=True)
+    value = {1, 2, 3}
+
+    # - Act -
+    data = codec.dumps(value)
+
+    # - Assert -
+    assert codec.loads(data) == value
+    assert codec.loads(pickle.dumps(TaskInCreation())) == TaskInCreation()
@@ -0,0 +1,77 @@
+from uuid import UUID, uuid4
+
+from pybotx_fsm.templates import KEY_TEMPLATE
+
+from app.bot.commands.tasks.create_task import CreateTaskStates
+from app.bot.commands.tasks.get_tasks import ChangeTaskDecriptionState
+from app.caching.fsm_states import FSMStateRepo
+from app.caching.redis_repo import RedisRepo
+from app.schemas.tasks import TaskInCreation
+
+
+def build_fsm_key(user_huid: UUID) -> str:
+    return KEY_TEMPLATE.format(
+        host="cts.example.com",
+        bot_id=uuid4(),
+        chat_id=uuid4(),
+        user_huid=user_huid,
+    )
+
+
+async def test_fsm_state_repo_expires_states_by_fsm(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    fsm_state_repo = FSMStateRepo(
+        redis_repo,
+        default_ttl=100,
+        state_ttls={ChangeTaskDecriptionState: 10},
+    )
+    create_key = build_fsm_key(user_huid)
+    change_key = build_fsm_key(user_huid)
+    key_prefix = f"{redis_repo.prefix}:@fsm"
+
+    # - Act -
+    await fsm_state_repo.set(
+        create_key,
+        {
+            "state": CreateTaskStates.WAITING_TASK_TITLE,
+            "task": TaskInCreation(user_huid=user_huid),
+        },
+    )
+    await fsm_state_repo.set(
+        change_key,
+        {"state": ChangeTaskDecriptionState.WAITING_NEW_DESCRIPTION},
+    )
+
+    # - Assert -
+    create_ttl = await redis_repo.backend.pttl(f"{key_prefix}:{create_key}")
+    change_ttl = await redis_repo.backend.pttl(f"{key_prefix}:{change_key}")
+    assert 10_000 < create_ttl <= 100_000
+    assert 0 < change_ttl <= 10_000
+
+    await fsm_state_repo.delete(create_key)
+    await fsm_state_repo.delete(change_key)
+
+
+async def test_fsm_state_repo_reports_live_states(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    fsm_state_repo = FSMStateRepo(redis_repo, default_ttl=100)
+    fsm_key = build_fsm_key(user_huid)
+    initial_report = await fsm_state_repo.report()
+
+    # - Act -
+    await fsm_state_repo.set(fsm_key, {"state": CreateTaskStates.WAITING_TASK_TITLE})
+    await redis_repo.set(("not_fsm", user_huid), "value")
+    report = await fsm_state_repo.report()
+
+    # - Assert -
+    assert report.count == initial_report.count + 1
+    assert report.size > initial_report.size
+
+    await fsm_state_repo.delete(fsm_key)
+    await redis_repo.delete(("not_fsm", user_huid))
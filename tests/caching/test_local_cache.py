@@ -0,0 +1,28 @@
+from app.caching.local_cache import LocalCache
+
+
+def test_local_cache_evicts_least_recently_used_entry() -> None:
+    # - Arrange -
+    local_cache = LocalCache(max_size=2, ttl=60)
+    local_cache.set("first", 1)
+    local_cache.set("second", 2)
+
+    # - Act -
+    local_cache.get("first")
+    local_cache.set("third", 3)
+
+    # - Assert -
+    assert local_cache.get("first") == (True, 1)
+    assert local_cache.get("second") == (False, None)
+    assert local_cache.get("third") == (True, 3)
+
+
+def test_local_cache_expires_entries() -> None:
+    # - Arrange -
+    local_cache = LocalCache(max_size=2, ttl=60)
+
+    # - Act -
+    local_cache.set("key", "value", ttl=0)
+
+    # - Assert -
+    assert local_cache.get("key") == (False, None)
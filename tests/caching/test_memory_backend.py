@@ -0,0 +1,131 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.caching.backends import KEY_NOT_FOUND_TTL, NO_EXPIRE_TTL, MemoryBackend
+from app.caching.local_cache import LocalCache
+from app.caching.redis_repo import RedisRepo
+
+
+async def test_memory_backend_expires_values() -> None:
+    # - Arrange -
+    backend = MemoryBackend()
+
+    # - Act -
+    await backend.set("persistent", b"1")
+    await backend.set("expiring", b"2", pexpire=10)
+    await asyncio.sleep(0.02)
+
+    # - Assert -
+    assert await backend.mget(["persistent", "expiring"]) == [b"1", None]
+    assert await backend.pttl("persistent") == NO_EXPIRE_TTL
+    assert await backend.pttl("expiring") == KEY_NOT_FOUND_TTL
+
+
+async def test_memory_backend_keeps_new_expiration_of_set_again_key() -> None:
+    # - Arrange -
+    backend = MemoryBackend()
+    await backend.set("key", b"old", pexpire=10)
+
+    # - Act -
+    await backend.set("key", b"new", expire=60)
+    await asyncio.sleep(0.02)
+
+    # - Assert -
+    assert await backend.get("key") == b"new"
+
+
+async def test_memory_backend_sets_only_missing_values() -> None:
+    # - Arrange -
+    backend = MemoryBackend()
+    await backend.set("key", b"old")
+
+    # - Act -
+    await backend.set("key", b"new", only_if_missing=True)
+
+    # - Assert -
+    assert await backend.get_and_delete("key") == b"old"
+    assert await backend.get("key") is None
+
+
+async def test_redis_repo_works_in_memory() -> None:
+    # - Arrange -
+    redis_repo = await RedisRepo.init(
+        dsn="memory://",
+        prefix="test",
+        local_cache=LocalCache(max_size=10, ttl=60),
+    )
+
+    # - Act -
+    await redis_repo.mset({("first", 1): "value", ("second", 2): [1, 2]})
+    values = await redis_repo.mget([("first", 1), ("second", 2)])
+    consumed_value = await redis_repo.rget(("first", 1))
+
+    # - Assert -
+    assert values == ["value", [1, 2]]
+    assert consumed_value == "value"
+    assert await redis_repo.get(("first", 1)) is None
+
+    await redis_repo.close()
+
+
+async def test_redis_repo_disables_local_cache_of_namespaces() -> None:
+    # - Arrange -
+    redis_repo = await RedisRepo.init(
+        dsn="memory://",
+        prefix="test",
+        local_cache=LocalCache(max_size=10, ttl=60),
+    )
+    namespace_repo = redis_repo.namespace("fsm")
+
+    # - Act -
+    await redis_repo.backend.unsubscribe("test:local_cache_invalidation")
+    await asyncio.sleep(0)
+
+    # - Assert -
+    assert redis_repo.local_cache is None
+    assert namespace_repo.local_cache is None
+
+    await redis_repo.close()
+
+
+async def test_redis_repo_evicts_local_values_of_other_instances(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    # Both instances work with the same storage, like processes with one Redis
+    backend = MemoryBackend()
+    monkeypatch.setattr(
+        "app.caching.redis_repo.connect_backend", AsyncMock(return_value=backend)
+    )
+    writer_repo, reader_repo = [
+        await RedisRepo.init(
+            dsn="memory://",
+            prefix="test",
+            local_cache=LocalCache(max_size=10, ttl=60),
+        )
+        for _ in range(2)
+    ]
+
+    await writer_repo.set("key", "old")
+    await reader_repo.get("key")
+    assert reader_repo.local_cache is not None
+    is_cached, _ = reader_repo.local_cache.get("test:key")
+
+    # - Act -
+    await writer_repo.set("key", "new")
+    await asyncio.sleep(0)
+    updated_value = await reader_repo.get("key")
+
+    await writer_repo.delete("key")
+    await asyncio.sleep(0)
+    deleted_value = await reader_repo.get("key")
+
+    # - Assert -
+    assert is_cached
+    assert updated_value == "new"
+    assert deleted_value is None
+
+    await reader_repo.close()
+    await writer_repo.close()
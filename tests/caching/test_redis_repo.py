@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import pickle
+from uuid import UUID, uuid4
+
+import pytest
+from pybotx_fsm.templates import KEY_TEMPLATE
+
+from app.caching.redis_repo import RedisRepo
+
+
+async def test_redis_repo_formats_readable_keys(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    key = ("tasks_cache_generation", user_huid)
+
+    # - Act -
+    await redis_repo.set(key, "value")
+
+    # - Assert -
+    readable_key = f"{redis_repo.prefix}:$tasks_cache_generation:{user_huid}"
+    assert pickle.loads(await redis_repo.backend.get(readable_key)) == "value"
+
+    await redis_repo.delete(key)
+
+
+async def test_redis_repo_stores_string_keys_as_is(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    fsm_key = KEY_TEMPLATE.format(
+        host="cts.example.com",
+        bot_id=uuid4(),
+        chat_id=uuid4(),
+        user_huid=user_huid,
+    )
+    tuple_key = tuple(fsm_key.split(":"))
+
+    # - Act -
+    await redis_repo.set(fsm_key, "string")
+    await redis_repo.set(tuple_key, "tuple")
+
+    # - Assert -
+    stored_data = await redis_repo.backend.get(f"{redis_repo.prefix}:{fsm_key}")
+    assert pickle.loads(stored_data) == "string"
+    assert await redis_repo.get(fsm_key) == "string"
+    assert await redis_repo.get(tuple_key) == "tuple"
+
+    await redis_repo.delete(fsm_key)
+    await redis_repo.delete(tuple_key)
+
+
+async def test_redis_repo_keeps_keys_of_different_types_apart(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    int_key = ("count", user_huid, 1)
+    str_key = ("count", user_huid, "1")
+    float_key = ("count", user_huid, 1.0)  # noqa: WPS358
+    plain_key = f"$count:{user_huid}:1"
+
+    # - Act -
+    await redis_repo.set(int_key, "int")
+    await redis_repo.set(str_key, "str")
+    await redis_repo.set(float_key, "float")
+    await redis_repo.set(plain_key, "plain")
+
+    # - Assert -
+    assert await redis_repo.get(int_key) == "int"
+    assert await redis_repo.get(str_key) == "str"
+    assert await redis_repo.get(float_key) == "float"
+    assert await redis_repo.get(plain_key) == "plain"
+
+    for key in (int_key, str_key, float_key, plain_key):
+        await redis_repo.delete(key)
+
+
+async def test_redis_repo_moves_values_from_legacy_keys(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    key = ("db_recent_write", user_huid)
+    key_hash = hashlib.md5(pickle.dumps(key)).hexdigest()  # noqa: S303
+    legacy_key = f"{redis_repo.prefix}_{key_hash}"
+    await redis_repo.backend.set(legacy_key, pickle.dumps(True), expire=60)
+    redis_repo.read_legacy_keys = True
+
+    # - Act -
+    value = await redis_repo.get(key)
+
+    # - Assert -
+    assert value is True
+    assert await redis_repo.backend.get(legacy_key) is None
+    assert await redis_repo.get(key) is True
+
+    await redis_repo.delete(key)
+    redis_repo.read_legacy_keys = False
+
+
+async def test_redis_repo_sets_and_gets_many_values(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    keys = [("widget", user_huid), ("fsm", user_huid), ("missing", user_huid)]
+
+    # - Act -
+    await redis_repo.mset({keys[0]: [1, 2], keys[1]: "state"})
+    values = await redis_repo.mget(keys, default="default")
+
+    await redis_repo.delete_many(keys)
+    deleted_values = await redis_repo.mget(keys)
+
+    # - Assert -
+    assert values == [[1, 2], "state", "default"]
+    assert deleted_values == [None, None, None]
+
+
+async def test_redis_repo_transaction_writes_nothing_on_error(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    key = ("widget", user_huid)
+
+    # - Act -
+    with pytest.raises(RuntimeError):
+        async with redis_repo.transaction() as transaction:
+            transaction.set(key, "value")
+            raise RuntimeError
+
+    # - Assert -
+    assert await redis_repo.get(key) is None
+
+
+async def test_redis_repo_rget_returns_value_only_once(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    key = ("widget", user_huid)
+    await redis_repo.set(key, "value")
+
+    # - Act -
+    values = await asyncio.gather(*(redis_repo.rget(key) for _ in range(10)))
+
+    # - Assert -
+    assert values.count("value") == 1
+    assert values.count(None) == 9
+
+
+async def test_redis_repo_keeps_namespace_keys_apart(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    namespace_repo = redis_repo.namespace("fsm")
+
+    # - Act -
+    await redis_repo.set(("fsm", user_huid), "root")
+    await redis_repo.set(f"@fsm:{user_huid}", "root string")
+    await namespace_repo.set(user_huid, "namespace")
+    await namespace_repo.set(str(user_huid), "namespace string")
+
+    # - Assert -
+    assert await redis_repo.get(("fsm", user_huid)) == "root"
+    assert await redis_repo.get(f"@fsm:{user_huid}") == "root string"
+    assert await namespace_repo.get(user_huid) == "namespace"
+    assert await namespace_repo.get(str(user_huid)) == "namespace string"
+
+    await redis_repo.delete(("fsm", user_huid))
+    await redis_repo.delete(f"@fsm:{user_huid}")
+    await namespace_repo.delete(user_huid)
+    await namespace_repo.delete(str(user_huid))
+
+
+async def test_redis_repo_set_only_if_missing_keeps_stored_value(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    key = ("widget", user_huid)
+    await redis_repo.set(key, "stored")
+
+    # - Act -
+    await redis_repo.set(key, "new", only_if_missing=True)
+
+    # - Assert -
+    assert await redis_repo.get(key) == "stored"
@@ -0,0 +1,116 @@
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.caching.redis_repo import RedisRepo
+from app.caching.tasks_cache import TasksCache
+from app.main import build_redis_codec
+from app.schemas.attachments import Attachment
+from app.schemas.tasks import Task, TasksPage
+from app.settings import settings
+
+
+async def test_tasks_cache_fetches_again_after_invalidation(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    tasks_cache = TasksCache(redis_repo, expire=60, recent_write_expire=10)
+    fetch = AsyncMock(side_effect=[1, 2])
+
+    # - Act -
+    first_value = await tasks_cache.get_or_fetch(user_huid, ("count",), fetch)
+    cached_value = await tasks_cache.get_or_fetch(user_huid, ("count",), fetch)
+
+    await tasks_cache.invalidate(user_huid)
+    fresh_value = await tasks_cache.get_or_fetch(user_huid, ("count",), fetch)
+
+    # - Assert -
+    assert (first_value, cached_value, fresh_value) == (1, 1, 2)
+    assert (tasks_cache.hits, tasks_cache.misses) == (1, 2)
+
+
+async def test_tasks_cache_does_not_store_values_fetched_after_write(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    tasks_cache = TasksCache(redis_repo, expire=60, recent_write_expire=10)
+    fetch = AsyncMock(side_effect=[1, 2])
+
+    # - Act -
+    await tasks_cache.invalidate(user_huid)
+    first_value = await tasks_cache.get_or_fetch(user_huid, ("count",), fetch)
+    second_value = await tasks_cache.get_or_fetch(user_huid, ("count",), fetch)
+
+    # - Assert -
+    assert (first_value, second_value) == (1, 2)
+    assert (tasks_cache.hits, tasks_cache.misses) == (0, 2)
+
+
+async def test_tasks_cache_generation_outlives_cached_values(
+    redis_repo: RedisRepo,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    tasks_cache = TasksCache(redis_repo, expire=60, recent_write_expire=10)
+    generation_key = redis_repo._key(("tasks_cache_generation", user_huid))
+
+    # - Act -
+    await tasks_cache.get_or_fetch(user_huid, ("count",), AsyncMock(return_value=1))
+    lazy_generation_ttl = await redis_repo.backend.pttl(generation_key)
+
+    await tasks_cache.invalidate(user_huid)
+    generation_ttl = await redis_repo.backend.pttl(generation_key)
+
+    # - Assert -
+    assert 60000 < lazy_generation_ttl <= 120000
+    assert 60000 < generation_ttl <= 120000
+
+
+async def test_tasks_cache_round_trips_pages_with_json_codec(
+    monkeypatch: pytest.MonkeyPatch,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    monkeypatch.setattr(settings, "REDIS_CODEC", "json")
+    monkeypatch.setattr(settings, "REDIS_PICKLE_FALLBACK", False)
+    redis_repo = await RedisRepo.init(dsn="memory://", codec=build_redis_codec())
+    tasks_cache = TasksCache(redis_repo, expire=60, recent_write_expire=10)
+
+    page = TasksPage(
+        tasks=[
+            Task(
+                id=1,
+                user_huid=user_huid,
+                title="Отчёт",
+                description="Квартальный отчёт",
+                mentioned_colleague_id=uuid4(),
+                attachment=Attachment(
+                    id=1, file_storage_id=uuid4(), filename="report.pdf", task_id=1
+                ),
+            ),
+            Task(
+                id=2,
+                user_huid=user_huid,
+                title="Звонок",
+                description="Позвонить клиенту",
+                mentioned_colleague_id=None,
+                attachment=None,
+            ),
+        ],
+        has_more=True,
+    )
+    fetch = AsyncMock(return_value=page)
+
+    # - Act -
+    await tasks_cache.get_or_fetch(user_huid, ("page",), fetch)
+    cached_page = await tasks_cache.get_or_fetch(user_huid, ("page",), fetch)
+
+    # - Assert -
+    assert cached_page == page
+    assert cached_page is not page
+    assert tasks_cache.hits == 1
+
+    await redis_repo.close()
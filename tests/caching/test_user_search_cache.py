@@ -0,0 +1,107 @@
+import asyncio
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from pybotx import Bot, UserFromSearch, UserKinds, UserNotFoundError
+
+from app.caching.redis_repo import RedisRepo
+from app.caching.user_search_cache import UserSearchCache
+from app.main import build_redis_codec
+from app.services.botx_user_search import UserIsBotError
+from app.settings import settings
+
+
+def build_user(username: str) -> UserFromSearch:
+    return UserFromSearch(
+        huid=uuid4(),
+        ad_login=None,
+        ad_domain=None,
+        username=username,
+        company=None,
+        company_position=None,
+        department=None,
+        emails=[],
+        other_id=None,
+        user_kind=UserKinds.CTS_USER,
+    )
+
+
+async def test_user_search_cache_shares_concurrent_searches(
+    bot: Bot,
+    redis_repo: RedisRepo,
+) -> None:
+    # - Arrange -
+    user = build_user("Test User")
+    user_search_cache = UserSearchCache(redis_repo, expire=60, negative_expire=10)
+
+    async def search_user_by_huid(**kwargs: object) -> UserFromSearch:
+        await asyncio.sleep(0.01)
+        return user
+
+    bot.search_user_by_huid = AsyncMock(side_effect=search_user_by_huid)  # type: ignore
+
+    # - Act -
+    search_results = await asyncio.gather(
+        *(user_search_cache.search_user(bot, user.huid) for _ in range(5))
+    )
+    cached_result = await user_search_cache.search_user(bot, user.huid)
+
+    # - Assert -
+    assert bot.search_user_by_huid.await_count == 1
+    assert all(search_result == cached_result for search_result in search_results)
+    assert cached_result == (user, list(bot.bot_accounts)[0])
+    assert user_search_cache.hit_ratio == 5 / 6
+
+
+async def test_user_search_cache_caches_negative_results(
+    bot: Bot,
+    redis_repo: RedisRepo,
+) -> None:
+    # - Arrange -
+    missing_huid = uuid4()
+    bot_user = build_user("Test Bot")
+    user_search_cache = UserSearchCache(redis_repo, expire=60, negative_expire=10)
+
+    bot.search_user_by_huid = AsyncMock(  # type: ignore
+        side_effect=[UserNotFoundError("not found"), bot_user]
+    )
+
+    # - Act -
+    not_found_results = [
+        await user_search_cache.search_user(bot, missing_huid) for _ in range(2)
+    ]
+    for _ in range(2):
+        with pytest.raises(UserIsBotError):
+            await user_search_cache.search_user(bot, bot_user.huid)
+
+    # - Assert -
+    assert not_found_results == [None, None]
+    assert bot.search_user_by_huid.await_count == 2
+    assert (user_search_cache.hits, user_search_cache.misses) == (2, 2)
+
+
+async def test_user_search_cache_round_trips_users_with_json_codec(
+    bot: Bot,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    monkeypatch.setattr(settings, "REDIS_CODEC", "json")
+    monkeypatch.setattr(settings, "REDIS_PICKLE_FALLBACK", False)
+    redis_repo = await RedisRepo.init(dsn="memory://", codec=build_redis_codec())
+    user_search_cache = UserSearchCache(redis_repo, expire=60, negative_expire=10)
+
+    user = build_user("Test User")
+    user.emails = ["test.user@example.com"]
+    bot.search_user_by_huid = AsyncMock(return_value=user)  # type: ignore
+
+    # - Act -
+    search_result = await user_search_cache.search_user(bot, user.huid)
+    cached_result = await user_search_cache.search_user(bot, user.huid)
+
+    # - Assert -
+    assert cached_result == search_result == (user, list(bot.bot_accounts)[0])
+    assert bot.search_user_by_huid.await_count == 1
+    assert user_search_cache.hits == 1
+
+    await redis_repo.close()
@@ -57,7 +57,7 @@ async def fsm_session(
     incoming_message_factory: Callable[..., IncomingMessage],
 ) -> AsyncGenerator[FSM, None]:
     message = incoming_message_factory()
-    fsm_session = FSM(bot.state.redis_repo, message)
+    fsm_session = FSM(bot.state.fsm_state_repo, message)
 
     async with lifespan_wrapper(bot):
         yield fsm_session
@@ -0,0 +1,67 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.bot.bot import get_bot
+from app.db.sqlalchemy import build_db_engine, warm_up_db_pool
+from app.main import shutdown, startup
+from app.settings import settings
+
+
+def test_db_engine_uses_pool_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    # - Arrange -
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_POOL_MAX_OVERFLOW", 7)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 2.5)
+    monkeypatch.setattr(settings, "DB_POOL_RECYCLE", 600)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", True)
+    monkeypatch.setattr(settings, "DB_STATEMENT_CACHE_SIZE", 0)
+
+    # - Act -
+    engine = build_db_engine("postgres://user:password@db/bot")
+
+    # - Assert -
+    pool = engine.pool
+    assert (pool.size(), pool.timeout()) == (3, 2.5)
+    assert pool._max_overflow == 7  # noqa: WPS437
+    assert pool._recycle == 600  # noqa: WPS437
+    assert pool._pre_ping  # noqa: WPS437
+    assert engine.url.query["prepared_statement_cache_size"] == "0"
+
+
+@pytest.mark.parametrize(
+    "warm_up_size, opened_connections_num",
+    [(0, 1), (3, 3), (100, settings.DB_POOL_SIZE)],
+)
+async def test_warm_up_db_pool_opens_connections(
+    warm_up_size: int, opened_connections_num: int
+) -> None:
+    # - Arrange -
+    connection = AsyncMock()
+    engine = MagicMock()
+    engine.connect = AsyncMock(return_value=connection)
+
+    # - Act -
+    await warm_up_db_pool(engine, warm_up_size)
+
+    # - Assert -
+    assert engine.connect.await_count == opened_connections_num
+    assert connection.close.await_count == opened_connections_num
+
+
+async def test_db_pool_is_warmed_up_on_startup_and_disposed_on_shutdown(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # - Arrange -
+    bot = get_bot()
+    monkeypatch.setattr(bot, "startup", AsyncMock())
+    monkeypatch.setattr(bot, "shutdown", AsyncMock())
+
+    # - Act -
+    await startup(bot)
+    warmed_up_connections_num = bot.state.db_engine.pool.checkedin()
+    await shutdown(bot)
+
+    # - Assert -
+    assert warmed_up_connections_num >= 1
+    assert bot.state.db_engine.pool.checkedin() == 0
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from typing import Any, Callable, List
+from uuid import UUID, uuid4
+
+import pytest
+from pybotx import Bot, IncomingMessage, IncomingMessageHandlerFunc
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bot.commands.tasks.get_tasks import expand_task, get_tasks
+from app.bot.commands.tasks.search_tasks import search_tasks
+from app.bot.middlewares.db_session import db_session_middleware, release_db_connections
+from app.db.sqlalchemy import CONNECTION_HOLD_TIME_KEY
+from app.db.task.repo import TaskRepo
+from app.schemas.tasks import Task, TaskInCreation
+
+HOLD_TIME = 0.05
+
+
+async def create_task(db_session: AsyncSession, user_huid: UUID) -> Task:
+    task = await TaskRepo(db_session).create_task(
+        TaskInCreation(user_huid=user_huid, title="Task", description="Description")
+    )
+    await db_session.commit()
+
+    return task
+
+
+async def get_transactions_at_sending(
+    bot: Bot, message: IncomingMessage, handler: IncomingMessageHandlerFunc
+) -> List[bool]:
+    """Run handler and check if its session holds connection at each BotX request."""
+
+    transactions_at_sending: List[bool] = []
+
+    def send(*args: Any, **kwargs: Any) -> UUID:
+        db_session = message.state.db_session
+        transactions_at_sending.append(db_session.in_transaction())
+        return uuid4()
+
+    bot.send.side_effect = send  # type: ignore
+    bot.answer_message.side_effect = send  # type: ignore
+
+    await db_session_middleware(message, bot, handler)
+
+    return transactions_at_sending
+
+
+async def test_reads_go_to_primary_after_user_write(
+    bot: Bot,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    # Replica sessions are opened to the same database, but they are different
+    bot.state.db_replica_session_factory = bot.state.db_session_factory
+    await bot.state.redis_repo.delete(("db_recent_write", user_huid))
+
+    reads_from_primary: List[bool] = []
+
+    async def handler(message: IncomingMessage, bot: Bot) -> None:
+        reads_from_primary.append(
+            message.state.db_read_session is message.state.db_session
+        )
+
+    # - Act -
+    await db_session_middleware(incoming_message_factory(), bot, handler)
+    await bot.state.tasks_cache.invalidate(user_huid)
+    await db_session_middleware(incoming_message_factory(), bot, handler)
+
+    # - Assert -
+    assert reads_from_primary == [False, True]
+
+
+async def test_connection_hold_time_is_counted_until_release(
+    bot: Bot,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    loguru_caplog: pytest.LogCaptureFixture,
+) -> None:
+    # - Arrange -
+    message = incoming_message_factory()
+
+    async def handler(message: IncomingMessage, bot: Bot) -> None:
+        await message.state.db_session.execute(text("SELECT 1"))
+        await asyncio.sleep(HOLD_TIME)
+
+        await release_db_connections(message)
+        await asyncio.sleep(HOLD_TIME)
+
+    # - Act -
+    with loguru_caplog.at_level(logging.INFO):
+        await db_session_middleware(message, bot, handler)
+
+    # - Assert -
+    hold_time = message.state.db_session.info[CONNECTION_HOLD_TIME_KEY]
+    assert HOLD_TIME <= hold_time < HOLD_TIME * 2
+    assert f"DB connections hold time of {message.sync_id}" in loguru_caplog.text
+
+
+async def test_get_tasks_releases_connection_before_sending(
+    bot: Bot,
+    db_session: AsyncSession,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    await create_task(db_session, user_huid)
+
+    # - Act -
+    transactions_at_sending = await get_transactions_at_sending(
+        bot, incoming_message_factory(), get_tasks
+    )
+
+    # - Assert -
+    assert transactions_at_sending
+    assert not any(transactions_at_sending)
+
+
+async def test_expand_task_releases_connection_before_sending(
+    bot: Bot,
+    db_session: AsyncSession,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    task = await create_task(db_session, user_huid)
+    message = incoming_message_factory(
+        data={"task_id": task.id}, source_sync_id=uuid4()
+    )
+
+    # - Act -
+    transactions_at_sending = await get_transactions_at_sending(
+        bot, message, expand_task
+    )
+
+    # - Assert -
+    assert transactions_at_sending
+    assert not any(transactions_at_sending)
+
+
+async def test_search_tasks_releases_connection_before_sending(
+    bot: Bot,
+    db_session: AsyncSession,
+    incoming_message_factory: Callable[..., IncomingMessage],
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    await create_task(db_session, user_huid)
+    message = incoming_message_factory(data={"query": "Task"})
+
+    # - Act -
+    transactions_at_sending = await get_transactions_at_sending(
+        bot, message, search_tasks
+    )
+
+    # - Assert -
+    assert transactions_at_sending
+    assert not any(transactions_at_sending)
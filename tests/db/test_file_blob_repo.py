@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.file_blob.repo import FileBlobRepo
+from app.services.file_storage import SavedFile
+
+
+async def test_file_is_unreferenced_after_last_release(
+    db_session: AsyncSession,
+) -> None:
+    # - Arrange -
+    file_blob_repo = FileBlobRepo(db_session)
+    saved_file = SavedFile(uuid=uuid4(), size=7, sha256="0" * 64)
+
+    await file_blob_repo.register(saved_file)
+    await file_blob_repo.register(saved_file)
+
+    # - Act -
+    refcounts = [
+        await file_blob_repo.acquire(saved_file.uuid),
+        await file_blob_repo.acquire(saved_file.uuid),
+    ]
+    releases = [
+        await file_blob_repo.release(saved_file.uuid),
+        await file_blob_repo.release(saved_file.uuid),
+    ]
+
+    # - Assert -
+    assert refcounts == [1, 2]
+    assert releases == [False, True]
+    assert await file_blob_repo.lock_unreferenced([saved_file.uuid]) == [
+        saved_file.uuid
+    ]
+
+
+async def test_file_is_referenced_while_other_upload_is_pending(
+    db_session: AsyncSession,
+) -> None:
+    # - Arrange -
+    file_blob_repo = FileBlobRepo(db_session)
+    saved_file = SavedFile(uuid=uuid4(), size=7, sha256="0" * 64)
+
+    await file_blob_repo.register(saved_file)
+    await file_blob_repo.register(saved_file)
+
+    # - Act -
+    releases = [await file_blob_repo.release_pending(saved_file.uuid)]
+    unreferenced_uuids = await file_blob_repo.lock_unreferenced([saved_file.uuid])
+    releases.append(await file_blob_repo.release_pending(saved_file.uuid))
+
+    # - Assert -
+    assert releases == [False, True]
+    assert not unreferenced_uuids
+
+
+async def test_pending_upload_is_abandoned_after_ttl(
+    db_session: AsyncSession,
+) -> None:
+    # - Arrange -
+    file_blob_repo = FileBlobRepo(db_session)
+    saved_file = SavedFile(uuid=uuid4(), size=7, sha256="0" * 64)
+
+    await file_blob_repo.register(saved_file)
+    now = datetime.now(timezone.utc)
+
+    # - Act -
+    abandoned_hour_ago = await file_blob_repo.lock_abandoned(
+        now - timedelta(hours=1), limit=10
+    )
+    abandoned_now = await file_blob_repo.lock_abandoned(now, limit=10)
+
+    # - Assert -
+    assert not abandoned_hour_ago
+    assert abandoned_now == [saved_file.uuid]
+
+
+async def test_untracked_file_is_acquired(db_session: AsyncSession) -> None:
+    # - Arrange -
+    file_blob_repo = FileBlobRepo(db_session)
+    file_storage_id = uuid4()
+
+    # - Act -
+    refcount = await file_blob_repo.acquire(file_storage_id)
+    is_file_unreferenced = await file_blob_repo.release(uuid4())
+
+    # - Assert -
+    assert refcount == 1
+    assert not is_file_unreferenced
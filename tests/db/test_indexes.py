@@ -0,0 +1,77 @@
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.db.task.repo import TaskRepo
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Executable) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return f"EXPLAIN {compiler.process(element.statement, **kw)}"
+
+
+async def explain(db_session: AsyncSession, query: Executable) -> str:
+    # Tables in tests are tiny, so the planner would prefer seq scans otherwise
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    rows = await db_session.execute(Explain(query))
+    return "\n".join(rows.scalars().all())
+
+
+async def test_user_tasks_page_query_uses_index(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    page_query = TaskRepo(db_session)._user_tasks_page_query(  # noqa: WPS437
+        user_huid, limit=3, cursor=0, backward=False
+    )
+
+    # - Act -
+    query_plan = await explain(db_session, page_query)
+
+    # - Assert -
+    assert "ix_tasks_user_huid_id" in query_plan
+
+
+async def test_task_attachment_query_uses_index(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    page_query = TaskRepo(db_session)._user_tasks_page_query(  # noqa: WPS437
+        user_huid, limit=3, cursor=None, backward=True
+    )
+
+    # - Act -
+    query_plan = await explain(db_session, page_query)
+
+    # - Assert -
+    assert "ix_attachments_task_id" in query_plan
+
+
+async def test_search_tasks_query_uses_index(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    search_query = TaskRepo(db_session)._search_tasks_query(  # noqa: WPS437
+        user_huid, "отчёт"
+    )
+
+    # - Act -
+    query_plan = await explain(db_session, search_query.limit(4))
+
+    # - Assert -
+    assert "ix_tasks_search_vector" in query_plan
@@ -0,0 +1,39 @@
+from uuid import UUID
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.query_stats import QUERY_START_TIME_KEY, collect_query_stats
+from app.db.task.repo import TaskRepo
+
+
+async def test_collect_query_stats_counts_repeated_statements(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+
+    # - Act -
+    with collect_query_stats() as query_stats:
+        for _ in range(3):
+            await task_repo.count_user_tasks(user_huid)
+
+    # - Assert -
+    assert query_stats.count == 3
+    assert list(query_stats.statements.values()) == [3]
+    assert query_stats.total_time >= query_stats.slowest_time > 0
+
+
+async def test_failed_query_start_time_is_dropped(db_session: AsyncSession) -> None:
+    # - Arrange -
+    connection = await db_session.connection()
+
+    # - Act -
+    with pytest.raises(DBAPIError):
+        await connection.execute(text("SELECT * FROM missing_table"))
+
+    # - Assert -
+    assert not connection.sync_connection.info[QUERY_START_TIME_KEY]
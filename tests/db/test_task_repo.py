@@ -0,0 +1,227 @@
+from typing import List
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.crud import CRUD
+from app.db.task.models import TaskModel
+from app.db.task.repo import TaskRepo
+from app.schemas.attachments import AttachmentInCreation
+from app.schemas.tasks import Task, TaskInCreation
+
+
+async def create_tasks(
+    task_repo: TaskRepo, user_huid: UUID, tasks_num: int
+) -> List[Task]:
+    return [
+        await task_repo.create_task(
+            TaskInCreation(
+                user_huid=user_huid,
+                title=f"Task {task_num}",
+                description="Description",
+            )
+        )
+        for task_num in range(tasks_num)
+    ]
+
+
+async def test_get_user_tasks_page_forward(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+    tasks = await create_tasks(task_repo, user_huid, 5)
+
+    # - Act -
+    first_page = await task_repo.get_user_tasks_page(user_huid, limit=2)
+    last_page = await task_repo.get_user_tasks_page(
+        user_huid, limit=2, cursor=tasks[3].id
+    )
+
+    # - Assert -
+    assert [task.id for task in first_page.tasks] == [tasks[0].id, tasks[1].id]
+    assert first_page.has_more
+
+    assert [task.id for task in last_page.tasks] == [tasks[4].id]
+    assert not last_page.has_more
+
+
+async def test_get_user_tasks_page_backward(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+    tasks = await create_tasks(task_repo, user_huid, 5)
+
+    # - Act -
+    middle_page = await task_repo.get_user_tasks_page(
+        user_huid, limit=2, cursor=tasks[4].id, backward=True
+    )
+    first_page = await task_repo.get_user_tasks_page(
+        user_huid, limit=2, cursor=tasks[2].id, backward=True
+    )
+
+    # - Assert -
+    assert [task.id for task in middle_page.tasks] == [tasks[2].id, tasks[3].id]
+    assert middle_page.has_more
+
+    assert [task.id for task in first_page.tasks] == [tasks[0].id, tasks[1].id]
+    assert not first_page.has_more
+
+
+async def test_count_user_tasks(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+    await create_tasks(task_repo, user_huid, 3)
+
+    # - Act -
+    tasks_num = await task_repo.count_user_tasks(user_huid)
+
+    # - Assert -
+    assert tasks_num == 3
+
+
+async def test_create_task_with_attachment(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+    file_storage_id = uuid4()
+
+    # - Act -
+    task = await task_repo.create_task(
+        TaskInCreation(user_huid=user_huid, title="Title", description="Text"),
+        AttachmentInCreation(file_storage_id=file_storage_id, filename="file.txt"),
+    )
+
+    # - Assert -
+    assert task.attachment
+    assert task.attachment.task_id == task.id
+    assert task.attachment.file_storage_id == file_storage_id
+
+    task_in_db = await task_repo.get_task(task.id)
+    assert task_in_db == task
+
+
+async def test_change_task_description_returns_nothing_for_missing_task(
+    db_session: AsyncSession,
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+
+    # - Act -
+    is_changed = await task_repo.change_task_description(1, "New description")
+
+    # - Assert -
+    assert not is_changed
+
+
+async def test_create_and_delete_tasks_in_bulk(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+    tasks_in_creation = [
+        TaskInCreation(user_huid=user_huid, title=f"Task {num}", description="Text")
+        for num in range(5)
+    ]
+
+    # - Act -
+    tasks = await task_repo.create_tasks(tasks_in_creation)
+    deleted_num = await task_repo.delete_tasks([task.id for task in tasks[:3]])
+
+    # - Assert -
+    assert [task.title for task in tasks] == [f"Task {num}" for num in range(5)]
+    assert deleted_num == 3
+    assert await task_repo.count_user_tasks(user_huid) == 2
+
+
+async def test_update_tasks_in_bulk(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+    tasks = await create_tasks(task_repo, user_huid, 5)
+    crud = CRUD(session=db_session, cls_model=TaskModel)
+
+    # - Act -
+    updated_num = await crud.update_many(
+        pkey_vals=[task.id for task in tasks[:3]],
+        model_data={"description": "Updated"},
+        chunk_size=2,
+    )
+
+    # - Assert -
+    assert updated_num == 3
+
+    tasks_in_db = [await task_repo.get_task(task.id) for task in tasks]
+    assert [task.description for task in tasks_in_db] == [
+        "Updated",
+        "Updated",
+        "Updated",
+        "Description",
+        "Description",
+    ]
+
+
+async def test_delete_task_returns_deleted_attachment(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+    task = await task_repo.create_task(
+        TaskInCreation(user_huid=user_huid, title="Title", description="Text"),
+        AttachmentInCreation(file_storage_id=uuid4(), filename="file.txt"),
+    )
+
+    # - Act -
+    deleted_task = await task_repo.delete_task(task.id)
+    missing_task = await task_repo.delete_task(task.id)
+
+    # - Assert -
+    assert deleted_task == task
+    assert missing_task is None
+
+
+async def test_search_tasks_ranks_title_matches_first(
+    db_session: AsyncSession,
+    user_huid: UUID,
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+    description_match, title_match, _ = await task_repo.create_tasks(
+        [
+            TaskInCreation(
+                user_huid=user_huid, title="Звонок", description="Обсудить отчёты"
+            ),
+            TaskInCreation(
+                user_huid=user_huid, title="Квартальный отчёт", description="Срочно"
+            ),
+            TaskInCreation(user_huid=user_huid, title="Обед", description="В 13:00"),
+        ]
+    )
+    await task_repo.create_tasks(
+        [TaskInCreation(user_huid=uuid4(), title="Отчёт", description="Чужой")]
+    )
+
+    # - Act -
+    tasks_page = await task_repo.search_tasks(user_huid, "отчёт", limit=1)
+    next_tasks_page = await task_repo.search_tasks(
+        user_huid, "отчёт", limit=1, offset=1
+    )
+
+    # - Assert -
+    assert [task.id for task in tasks_page.tasks] == [title_match.id]
+    assert tasks_page.has_more
+
+    assert [task.id for task in next_tasks_page.tasks] == [description_match.id]
+    assert not next_tasks_page.has_more
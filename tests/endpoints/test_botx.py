@@ -48,6 +48,11 @@ def test__web_app__bot_status_response_ok(
                     "description": "Посмотреть список задач",
                     "name": "/список",
                 },
+                {
+                    "body": "/поиск",
+                    "description": "Найти задачи по тексту",
+                    "name": "/поиск",
+                },
             ],
             "enabled": True,
             "status_message": "Bot is working",
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import tracemalloc
+from http import HTTPStatus
+from pathlib import Path
+from typing import List
+from uuid import UUID, uuid4
+
+import httpx
+from pybotx import Bot, BotAccountWithSecret, HandlerCollector, OutgoingAttachment
+from pybotx.client.events_api.edit_event import BotXAPIEditEventRequestPayload
+from pybotx.missing import Undefined
+
+from app.services.attachment_transfers import (
+    TRANSFER_MEMORY_FACTOR,
+    AttachmentTransferLimiter,
+)
+from app.services.botx_attachments import STREAM_CHUNK_SIZE, edit_message_file
+from app.services.file_storage import FileStorage
+
+FILE_SIZE = 100 * 1024 * 1024
+BOT_ID = UUID("3c5b9a1e-4f6d-4b8a-9e2c-1d7f0a6b5c4e")
+
+
+class BotXTransport(httpx.AsyncBaseTransport):
+    def __init__(self, keep_bodies: bool = False) -> None:
+        self.body_sizes: List[int] = []
+        self.declared_sizes: List[int] = []
+        self.bodies: List[bytes] = []
+        self._keep_bodies = keep_bodies
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/token"):
+            return httpx.Response(
+                HTTPStatus.OK, json={"status": "ok", "result": "token"}
+            )
+
+        body_size = 0
+        body_chunks = []
+        async for chunk in request.stream:  # type: ignore
+            body_size += len(chunk)
+            if self._keep_bodies:
+                body_chunks.append(chunk)
+
+        self.body_sizes.append(body_size)
+        self.declared_sizes.append(int(request.headers["Content-Length"]))
+        self.bodies.append(b"".join(body_chunks))
+
+        return httpx.Response(HTTPStatus.OK, json={"status": "ok"})
+
+
+def build_bot(transport: BotXTransport) -> Bot:
+    return Bot(
+        collectors=[HandlerCollector()],
+        bot_accounts=[
+            BotAccountWithSecret(id=BOT_ID, host="cts.example.com", secret_key="key")
+        ],
+        httpx_client=httpx.AsyncClient(transport=transport),
+    )
+
+
+async def transfer(
+    bot: Bot,
+    limiter: AttachmentTransferLimiter,
+    file_storage: FileStorage,
+    file_uuid: UUID,
+) -> None:
+    async with file_storage.file(file_uuid) as file:
+        async with limiter.reserve(FILE_SIZE):
+            await edit_message_file(bot, BOT_ID, uuid4(), file, "report.pdf", FILE_SIZE)
+
+
+async def test_attachment_is_sent_in_the_same_request_as_bot_edit(
+    tmp_path: Path,
+) -> None:
+    # - Arrange -
+    transport = BotXTransport(keep_bodies=True)
+    bot = build_bot(transport)
+
+    file_storage = FileStorage(tmp_path)
+    file_uuid = uuid4()
+    # Sizes, which are not multiple of 3, check base64 padding
+    content = bytes(range(256)) * 4000 + b"end"
+    tmp_path.joinpath(str(file_uuid)).write_bytes(content)
+    sync_id = uuid4()
+
+    # - Act -
+    async with file_storage.file(file_uuid) as file:
+        await edit_message_file(bot, BOT_ID, sync_id, file, "отчёт.pdf", len(content))
+
+    # - Assert -
+    payload = BotXAPIEditEventRequestPayload.from_domain(
+        sync_id=sync_id,
+        body="",
+        metadata=Undefined,
+        bubbles=Undefined,
+        keyboard=Undefined,
+        file=OutgoingAttachment(content=content, filename="отчёт.pdf"),
+        markup_auto_adjust=Undefined,
+    )
+    assert transport.body_sizes == transport.declared_sizes
+    assert json.loads(transport.bodies[0]) == payload.jsonable_dict()
+
+
+async def test_attachment_transfers_peak_memory_does_not_depend_on_file_size(
+    tmp_path: Path,
+) -> None:
+    # - Arrange -
+    transport = BotXTransport()
+    bot = build_bot(transport)
+
+    file_storage = FileStorage(tmp_path)
+    file_uuid = uuid4()
+    with open(tmp_path.joinpath(str(file_uuid)), "wb") as sparse_file:
+        sparse_file.truncate(FILE_SIZE)
+
+    limiter = AttachmentTransferLimiter(memory_budget=FILE_SIZE * 5, max_concurrency=5)
+
+    # - Act -
+    tracemalloc.start()
+    try:
+        await asyncio.gather(
+            *(transfer(bot, limiter, file_storage, file_uuid) for _ in range(5))
+        )
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # - Assert -
+    assert transport.body_sizes == transport.declared_sizes
+    assert min(transport.body_sizes) > FILE_SIZE
+    # Python allocations only, RSS also includes interpreter and libraries
+    assert peak_memory < 5 * STREAM_CHUNK_SIZE * TRANSFER_MEMORY_FACTOR
+
+
+async def test_attachment_transfers_sends_oversized_file_exclusively() -> None:
+    # - Arrange -
+    limiter = AttachmentTransferLimiter(memory_budget=600, max_concurrency=2)
+    events: List[str] = []
+
+    async def transfer_file(name: str, file_size: int) -> None:
+        async with limiter.reserve(file_size):
+            events.append(f"{name} started")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} finished")
+
+    # - Act -
+    await asyncio.gather(
+        transfer_file("small", 50),
+        transfer_file("oversized", 1000),
+        transfer_file("other", 50),
+    )
+
+    # - Assert -
+    assert events == [
+        "small started",
+        "small finished",
+        "oversized started",
+        "oversized finished",
+        "other started",
+        "other finished",
+    ]
+
+
+async def test_attachment_transfers_start_in_order_of_arrival() -> None:
+    # - Arrange -
+    limiter = AttachmentTransferLimiter(
+        memory_budget=100 * TRANSFER_MEMORY_FACTOR, max_concurrency=3
+    )
+    events: List[str] = []
+
+    async def transfer_file(name: str, file_size: int) -> None:
+        async with limiter.reserve(file_size):
+            events.append(f"{name} started")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} finished")
+
+    # - Act -
+    await asyncio.gather(
+        transfer_file("first", 60),
+        transfer_file("large", 100),
+        # Fits into memory left by the first one, but shouldn't overtake large
+        transfer_file("small", 30),
+    )
+
+    # - Assert -
+    assert events == [
+        "first started",
+        "first finished",
+        "large started",
+        "large finished",
+        "small started",
+        "small finished",
+    ]
+
+
+async def test_attachment_transfers_skip_cancelled_waiters() -> None:
+    # - Arrange -
+    limiter = AttachmentTransferLimiter(
+        memory_budget=100 * TRANSFER_MEMORY_FACTOR, max_concurrency=3
+    )
+    events: List[str] = []
+
+    async def transfer_file(name: str, file_size: int) -> None:
+        async with limiter.reserve(file_size):
+            events.append(f"{name} started")
+            await asyncio.sleep(0.01)
+
+    first_transfer = asyncio.create_task(transfer_file("first", 60))
+    await asyncio.sleep(0)
+    large_transfer = asyncio.create_task(transfer_file("large", 100))
+    await asyncio.sleep(0)
+
+    # - Act -
+    large_transfer.cancel()
+    await transfer_file("small", 30)
+    await first_transfer
+
+    # - Assert -
+    assert events == ["first started", "small started"]
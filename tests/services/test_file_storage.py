@@ -0,0 +1,120 @@
+import hashlib
+from pathlib import Path
+from typing import AsyncIterator
+from uuid import uuid4
+
+import pytest
+
+from app.services.file_storage import (
+    FileStorage,
+    describe_content,
+    iterate_chunks,
+    save_content,
+)
+from app.services.file_storage_migration import migrate_file_storage
+
+
+async def test_file_storage_reads_and_removes_flat_files(tmp_path: Path) -> None:
+    # - Arrange -
+    file_storage = FileStorage(tmp_path)
+    file_uuid = uuid4()
+    tmp_path.joinpath(str(file_uuid)).write_bytes(b"content")
+
+    # - Act -
+    async with file_storage.file(file_uuid) as fo:
+        content = await fo.read()
+
+    await file_storage.remove(file_uuid)
+
+    # - Assert -
+    assert content == b"content"
+    assert not list(tmp_path.iterdir())
+
+    with pytest.raises(FileNotFoundError):
+        await file_storage.remove(file_uuid)
+
+
+async def test_file_storage_migration_moves_flat_files(tmp_path: Path) -> None:
+    # - Arrange -
+    file_storage = FileStorage(tmp_path)
+    file_uuids = [uuid4() for _ in range(5)]
+    for file_uuid in file_uuids:
+        tmp_path.joinpath(str(file_uuid)).write_bytes(file_uuid.bytes)
+
+    tmp_path.joinpath("not-a-file-uuid").write_bytes(b"")
+
+    # - Act -
+    moved_count = await migrate_file_storage(file_storage, batch_size=2, pause=0)
+    moved_again_count = await migrate_file_storage(file_storage)
+
+    # - Assert -
+    assert (moved_count, moved_again_count) == (5, 0)
+
+    for file_uuid in file_uuids:
+        sharded_path = tmp_path.joinpath(
+            file_uuid.hex[:2], file_uuid.hex[2:4], str(file_uuid)
+        )
+        assert sharded_path.read_bytes() == file_uuid.bytes
+
+        async with file_storage.file(file_uuid) as fo:
+            assert await fo.read() == file_uuid.bytes
+
+
+async def test_file_storage_saves_file_from_chunks(tmp_path: Path) -> None:
+    # - Arrange -
+    file_storage = FileStorage(tmp_path)
+    content = b"content" * 1000
+
+    # - Act -
+    saved_file = await file_storage.save(iterate_chunks(content, chunk_size=100))
+
+    # - Assert -
+    assert saved_file.size == len(content)
+    assert saved_file.sha256 == hashlib.sha256(content).hexdigest()
+
+    async with file_storage.file(saved_file.uuid) as fo:
+        assert await fo.read() == content
+
+    stored_files = [path for path in tmp_path.rglob("*") if path.is_file()]
+    assert [path.name for path in stored_files] == [str(saved_file.uuid)]
+
+
+async def test_file_storage_removes_partially_saved_file(tmp_path: Path) -> None:
+    # - Arrange -
+    file_storage = FileStorage(tmp_path)
+
+    async def broken_stream() -> AsyncIterator[bytes]:
+        yield b"content"
+        raise ConnectionError
+
+    # - Act -
+    with pytest.raises(ConnectionError):
+        await file_storage.save(broken_stream())
+
+    # - Assert -
+    assert not [path for path in tmp_path.rglob("*") if path.is_file()]
+
+
+async def test_file_storage_saves_same_content_once(tmp_path: Path) -> None:
+    # - Arrange -
+    file_storage = FileStorage(tmp_path)
+
+    # - Act -
+    first_file = describe_content(b"content", deduplicate=True)
+    second_file = describe_content(b"content", deduplicate=True)
+    other_file = describe_content(b"other", deduplicate=True)
+
+    for saved_file, content in (
+        (first_file, b"content"),
+        (second_file, b"content"),
+        (other_file, b"other"),
+    ):
+        await save_content(file_storage, content, saved_file)
+
+    # - Assert -
+    assert first_file == second_file
+    assert first_file.sha256 == hashlib.sha256(b"content").hexdigest()
+    assert other_file.uuid != first_file.uuid
+
+    stored_files = [path for path in tmp_path.rglob("*") if path.is_file()]
+    assert len(stored_files) == 2
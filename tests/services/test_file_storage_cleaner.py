@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+from typing import List
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+from pybotx import Bot
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.file_blob.repo import FileBlobRepo
+from app.services.file_storage import SavedFile
+from app.services.file_storage_cleaner import FileStorageCleaner
+
+
+async def register_files(db_session: AsyncSession, files_num: int) -> List[UUID]:
+    file_blob_repo = FileBlobRepo(db_session)
+    saved_files = [
+        SavedFile(uuid=uuid4(), size=7, sha256="0" * 64) for _ in range(files_num)
+    ]
+
+    for saved_file in saved_files:
+        await file_blob_repo.register(saved_file)
+
+    return [saved_file.uuid for saved_file in saved_files]
+
+
+def get_removed_uuids(file_storage: AsyncMock) -> List[UUID]:
+    return sorted(
+        remove_call.args[0] for remove_call in file_storage.remove.await_args_list
+    )
+
+
+async def test_file_storage_cleaner_removes_scheduled_files(
+    bot: Bot, db_session: AsyncSession
+) -> None:
+    # - Arrange -
+    file_storage = AsyncMock()
+    file_storage.remove.side_effect = [FileNotFoundError("File not exists"), None]
+    cleaner = FileStorageCleaner(
+        file_storage,
+        bot.state.db_session_factory,
+        abandoned_ttl=3600,
+        sweep_interval=3600,
+        batch_size=10,
+    )
+
+    cancelled_uuids = await register_files(db_session, files_num=2)
+    attached_uuid, pending_uuid = await register_files(db_session, files_num=2)
+
+    file_blob_repo = FileBlobRepo(db_session)
+    await file_blob_repo.acquire(attached_uuid)
+    for file_uuid in cancelled_uuids:
+        await file_blob_repo.release_pending(file_uuid)
+
+    await db_session.commit()
+
+    cleaner.start()
+
+    # - Act -
+    for file_uuid in (*cancelled_uuids, attached_uuid, pending_uuid):
+        cleaner.schedule_removal(file_uuid)
+
+    await cleaner.stop()
+
+    # - Assert -
+    assert get_removed_uuids(file_storage) == sorted(cancelled_uuids)
+    assert not await file_blob_repo.lock_unreferenced(cancelled_uuids)
+
+
+async def test_file_storage_cleaner_removes_abandoned_files(
+    bot: Bot, db_session: AsyncSession
+) -> None:
+    # - Arrange -
+    file_storage = AsyncMock()
+    cleaner = FileStorageCleaner(
+        file_storage,
+        bot.state.db_session_factory,
+        abandoned_ttl=0,
+        sweep_interval=3600,
+        batch_size=2,
+    )
+
+    *abandoned_uuids, attached_uuid = await register_files(db_session, files_num=4)
+    await FileBlobRepo(db_session).acquire(attached_uuid)
+    await db_session.commit()
+
+    # - Act -
+    await cleaner.sweep()
+
+    # - Assert -
+    assert get_removed_uuids(file_storage) == sorted(abandoned_uuids)
+
+
+async def test_file_storage_cleaner_keeps_rows_of_files_failed_to_remove(
+    bot: Bot, db_session: AsyncSession
+) -> None:
+    # - Arrange -
+    file_storage = AsyncMock()
+    file_storage.remove.side_effect = OSError("Storage is not available")
+    cleaner = FileStorageCleaner(
+        file_storage,
+        bot.state.db_session_factory,
+        abandoned_ttl=0,
+        sweep_interval=3600,
+    )
+
+    abandoned_uuids = await register_files(db_session, files_num=1)
+    await db_session.commit()
+
+    # - Act -
+    await cleaner.sweep()
+
+    # - Assert -
+    assert (
+        await FileBlobRepo(db_session).lock_abandoned(
+            datetime.now(timezone.utc), limit=10
+        )
+        == abandoned_uuids
+    )
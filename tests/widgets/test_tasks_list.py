@@ -0,0 +1,95 @@
+import json
+from typing import Callable, List
+from uuid import UUID
+
+from pybotx import Bot, IncomingMessage
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bot.widgets.tasks_list import TasksListWidget
+from app.db.task.repo import TaskRepo
+from app.schemas.tasks import Task, TaskInCreation
+
+
+async def create_tasks(
+    task_repo: TaskRepo,
+    user_huid: UUID,
+    tasks_num: int,
+    description: str = "Description",
+) -> List[Task]:
+    return [
+        await task_repo.create_task(
+            TaskInCreation(
+                user_huid=user_huid,
+                title=f"Task {task_num}",
+                description=description,
+            )
+        )
+        for task_num in range(tasks_num)
+    ]
+
+
+async def get_sent_payload_size(
+    bot: Bot,
+    message: IncomingMessage,
+    task_repo: TaskRepo,
+) -> int:
+    bot.send.reset_mock()  # type: ignore
+
+    widget = TasksListWidget(message, task_repo)
+    await widget.fetch_tasks()
+    await widget.send(bot)
+
+    payload = []
+    for call in bot.send.call_args_list:  # type: ignore
+        outgoing_message = call.kwargs["message"]
+        buttons_data = [
+            button.data for row in outgoing_message.bubbles or [] for button in row
+        ]
+        payload.append([outgoing_message.metadata, buttons_data])
+
+    return len(json.dumps(payload, default=str))
+
+
+async def test_tasks_list_widget_payload_size_does_not_depend_on_tasks_num(
+    bot: Bot,
+    db_session: AsyncSession,
+    user_huid: UUID,
+    incoming_message_factory: Callable[..., IncomingMessage],
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+    message = incoming_message_factory(body="/список")
+
+    await create_tasks(task_repo, user_huid, 3)
+    small_list_payload_size = await get_sent_payload_size(bot, message, task_repo)
+
+    await create_tasks(task_repo, user_huid, 97)
+
+    # - Act -
+    big_list_payload_size = await get_sent_payload_size(bot, message, task_repo)
+
+    # - Assert -
+    assert big_list_payload_size == small_list_payload_size
+
+
+async def test_tasks_list_widget_payload_size_does_not_depend_on_tasks_content(
+    bot: Bot,
+    db_session: AsyncSession,
+    user_huid: UUID,
+    incoming_message_factory: Callable[..., IncomingMessage],
+) -> None:
+    # - Arrange -
+    task_repo = TaskRepo(db_session)
+    message = incoming_message_factory(body="/список")
+
+    short_tasks = await create_tasks(task_repo, user_huid, 2)
+    short_tasks_payload_size = await get_sent_payload_size(bot, message, task_repo)
+
+    await task_repo.delete_tasks([task.id for task in short_tasks])
+    await create_tasks(task_repo, user_huid, 2, description="Description" * 100)
+
+    # - Act -
+    long_tasks_payload_size = await get_sent_payload_size(bot, message, task_repo)
+
+    # - Assert -
+    assert long_tasks_payload_size == short_tasks_payload_size